@@ -0,0 +1,32 @@
+"""Add aggregation watermarks and aggregate record counts."""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: str | None = "002"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "aggregation_watermarks",
+        sa.Column("period_type", sa.String(length=20), nullable=False),
+        sa.Column("last_performance_data_id", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("period_type"),
+    )
+
+    op.add_column(
+        "performance_aggregates",
+        sa.Column("record_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("performance_aggregates", "record_count")
+    op.drop_table("aggregation_watermarks")
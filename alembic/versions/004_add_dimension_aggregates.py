@@ -0,0 +1,81 @@
+"""Add ad group, keyword, ASIN and profile aggregates."""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: str | None = "003"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    stream_enum = postgresql.ENUM(
+        "SP", "SB", "SD", name="streamdatasettype", create_type=False
+    )
+    op.create_table(
+        "dimension_aggregates",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("dimension", sa.String(length=20), nullable=False),
+        sa.Column("dimension_id", sa.String(length=255), nullable=False),
+        sa.Column("dataset_type", stream_enum, nullable=False),
+        sa.Column("profile_id", sa.String(length=255), nullable=False),
+        sa.Column("campaign_id", sa.String(length=255), nullable=True),
+        sa.Column("period_type", sa.String(length=20), nullable=False),
+        sa.Column("period_start", sa.DateTime(), nullable=False),
+        sa.Column("period_end", sa.DateTime(), nullable=False),
+        sa.Column("total_impressions", sa.Integer(), nullable=True),
+        sa.Column("total_clicks", sa.Integer(), nullable=True),
+        sa.Column("total_cost", sa.Numeric(10, 2), nullable=True),
+        sa.Column("total_sales", sa.Numeric(10, 2), nullable=True),
+        sa.Column("total_orders", sa.Integer(), nullable=True),
+        sa.Column("total_units_sold", sa.Integer(), nullable=True),
+        sa.Column("record_count", sa.Integer(), nullable=False),
+        sa.Column("avg_ctr", sa.Numeric(5, 4), nullable=True),
+        sa.Column("avg_cpc", sa.Numeric(10, 4), nullable=True),
+        sa.Column("avg_acos", sa.Numeric(5, 4), nullable=True),
+        sa.Column("avg_roas", sa.Numeric(10, 4), nullable=True),
+        sa.Column("avg_conversion_rate", sa.Numeric(5, 4), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_dimension_aggregates_id"), "dimension_aggregates", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_dimension_aggregates_profile_id"),
+        "dimension_aggregates",
+        ["profile_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_dimension_aggregates_campaign_id"),
+        "dimension_aggregates",
+        ["campaign_id"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_dimension_aggregate_unique",
+        "dimension_aggregates",
+        ["dimension", "dimension_id", "dataset_type", "period_type", "period_start"],
+        unique=True,
+    )
+    op.create_index(
+        "idx_dimension_aggregate_period",
+        "dimension_aggregates",
+        ["dimension", "period_type", "period_start"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_dimension_aggregate_period", table_name="dimension_aggregates")
+    op.drop_index("idx_dimension_aggregate_unique", table_name="dimension_aggregates")
+    op.drop_index(op.f("ix_dimension_aggregates_campaign_id"), table_name="dimension_aggregates")
+    op.drop_index(op.f("ix_dimension_aggregates_profile_id"), table_name="dimension_aggregates")
+    op.drop_index(op.f("ix_dimension_aggregates_id"), table_name="dimension_aggregates")
+    op.drop_table("dimension_aggregates")
@@ -0,0 +1,156 @@
+"""Range-partition stream_messages and performance_data by date.
+
+Existing rows are not copied: each table is renamed to ``<table>_legacy`` and
+attached to the new partitioned parent as one partition covering everything
+up to the end of the current (or latest used) period. The scheduler's
+partition maintenance job creates the partitions after it, and retention
+drops the legacy partition whole once it has aged out.
+"""
+from collections.abc import Sequence
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str | None = "004"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+# table -> (partition column, date_trunc unit)
+PARTITIONS = {
+    "stream_messages": ("created_at", "day"),
+    "performance_data": ("start_date", "month"),
+}
+
+# table -> [(index name, columns)] recreated on the partitioned parent
+INDEXES = {
+    "stream_messages": [
+        ("ix_stream_messages_message_id", ["message_id"]),
+        ("ix_stream_messages_dataset_type", ["dataset_type"]),
+        ("ix_stream_messages_dataset_name", ["dataset_name"]),
+        ("ix_stream_messages_profile_id", ["profile_id"]),
+        ("ix_stream_messages_processed", ["processed"]),
+        ("ix_stream_messages_created_at", ["created_at"]),
+    ],
+    "performance_data": [
+        ("ix_performance_data_stream_message_id", ["stream_message_id"]),
+        ("ix_performance_data_dataset_type", ["dataset_type"]),
+        ("ix_performance_data_dataset_name", ["dataset_name"]),
+        ("ix_performance_data_profile_id", ["profile_id"]),
+        ("ix_performance_data_campaign_id", ["campaign_id"]),
+        ("ix_performance_data_ad_group_id", ["ad_group_id"]),
+        ("ix_performance_data_keyword_id", ["keyword_id"]),
+        ("ix_performance_data_asin", ["asin"]),
+        ("ix_performance_data_start_date", ["start_date"]),
+        ("idx_performance_campaign_date", ["campaign_id", "start_date"]),
+        ("idx_performance_profile_date", ["profile_id", "start_date"]),
+    ],
+}
+
+# (table, constraint, column, referenced table) dropped because a foreign key
+# must reference a unique key that includes the partition column
+FOREIGN_KEYS = [
+    (
+        "performance_aggregates",
+        "performance_aggregates_performance_data_id_fkey",
+        "performance_data_id",
+        "performance_data",
+    ),
+    (
+        "performance_data",
+        "performance_data_stream_message_id_fkey",
+        "stream_message_id",
+        "stream_messages",
+    ),
+    (
+        "budget_usage_events",
+        "budget_usage_events_stream_message_id_fkey",
+        "stream_message_id",
+        "stream_messages",
+    ),
+]
+
+
+def upgrade() -> None:
+    for table, constraint, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(constraint, table, type_="foreignkey")
+
+    # message_id uniqueness can no longer be enforced on stream_messages
+    op.create_table(
+        "stream_message_keys",
+        sa.Column("message_id", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("message_id"),
+    )
+    op.create_index(
+        op.f("ix_stream_message_keys_created_at"),
+        "stream_message_keys",
+        ["created_at"],
+        unique=False,
+    )
+    op.execute(
+        "INSERT INTO stream_message_keys (message_id, created_at) "
+        "SELECT message_id, created_at FROM stream_messages"
+    )
+
+    bind = op.get_bind()
+    for table, (column, unit) in PARTITIONS.items():
+        legacy = f"{table}_legacy"
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        # ATTACH needs a key matching the parent's, which includes the column
+        op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey")
+        op.execute(
+            f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_pkey PRIMARY KEY (id, {column})"
+        )
+        for name, _ in INDEXES[table]:
+            op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_legacy")
+
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})")
+        # Keep the id sequence alive when the legacy partition is dropped
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        for name, columns in INDEXES[table]:
+            op.create_index(name, table, columns, unique=False)
+
+        upper: datetime = bind.execute(
+            sa.text(
+                f"SELECT date_trunc('{unit}', greatest(max({column}), now()::timestamp)) "
+                f"+ interval '1 {unit}' FROM {legacy}"
+            )
+        ).scalar()
+        op.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{upper.isoformat(' ')}')"
+        )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade() -> None:
+    # Rows are copied back into unpartitioned tables; foreign keys are only
+    # restorable if retention has not dropped referenced rows
+    for table, (column, _) in reversed(list(PARTITIONS.items())):
+        partitioned = f"{table}_partitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"DROP TABLE {partitioned}")
+
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        for name, columns in INDEXES[table]:
+            op.create_index(
+                name, table, columns, unique=name == "ix_stream_messages_message_id"
+            )
+
+    op.drop_index(op.f("ix_stream_message_keys_created_at"), table_name="stream_message_keys")
+    op.drop_table("stream_message_keys")
+
+    for table, constraint, column, referenced in reversed(FOREIGN_KEYS):
+        op.create_foreign_key(constraint, table, referenced, [column], ["id"])
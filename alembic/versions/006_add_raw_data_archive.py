@@ -0,0 +1,31 @@
+"""Add raw payload archive pointers to stream_messages."""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: str | None = "005"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column("stream_messages", "raw_data", existing_type=sa.Text(), nullable=True)
+    op.add_column(
+        "stream_messages",
+        sa.Column("raw_data_uri", sa.String(length=1024), nullable=True),
+    )
+    op.add_column(
+        "stream_messages",
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    # Archived payloads must be restored before raw_data can be NOT NULL again
+    op.drop_column("stream_messages", "archived_at")
+    op.drop_column("stream_messages", "raw_data_uri")
+    op.alter_column("stream_messages", "raw_data", existing_type=sa.Text(), nullable=False)
@@ -0,0 +1,22 @@
+"""Add delivery lease and rejection columns to alerts."""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: str | None = "006"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("alerts", sa.Column("claimed_until", sa.DateTime(), nullable=True))
+    op.add_column("alerts", sa.Column("delivery_failed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("alerts", "delivery_failed_at")
+    op.drop_column("alerts", "claimed_until")
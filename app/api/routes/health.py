@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.workers.scheduler import get_worker_stats
 
 router = APIRouter()
 
@@ -44,3 +45,12 @@ async def config_health_check():
         },
     }
 
+
+@router.get("/health/worker")
+async def worker_health_check():
+    """SQS worker concurrency, backlog and acknowledgement counters."""
+    return {
+        "status": "healthy",
+        "worker_enabled": settings.worker_enabled,
+        "stats": get_worker_stats(),
+    }
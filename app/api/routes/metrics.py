@@ -2,15 +2,21 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Path, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.models.stream_data import PerformanceData, PerformanceAggregate, Alert
+from app.models.stream_data import (
+    PerformanceData,
+    PerformanceAggregate,
+    DimensionAggregate,
+    Alert,
+)
 from app.schemas.stream_data import (
     PerformanceDataResponse,
     PerformanceAggregateResponse,
+    DimensionAggregateResponse,
     AlertResponse,
 )
 
@@ -36,21 +42,48 @@ async def get_campaign_metrics(
     return results
 
 
+# Rollup grains above daily from coarsest to finest with their nominal length in days
+_GRAINS = (("monthly", 30), ("weekly", 7))
+
+# Fewest buckets a trend query should return when the grain is chosen for it
+_MIN_POINTS = 7
+
+
+def _choose_period_type(days: int) -> str:
+    """Pick the coarsest grain that still gives at least ``_MIN_POINTS`` buckets.
+
+    Falls back to daily, the original default; hourly rows are only returned
+    when requested.
+    """
+    for period_type, grain_days in _GRAINS:
+        if days / grain_days >= _MIN_POINTS:
+            return period_type
+    return "daily"
+
+
 @router.get("/metrics/aggregates", response_model=list[PerformanceAggregateResponse])
 async def get_aggregates(
     campaign_id: Optional[str] = Query(None),
-    period_type: str = Query("daily", regex="^(hourly|daily)$"),
-    days: int = Query(7, ge=1, le=30),
+    period_type: Optional[str] = Query(None, regex="^(hourly|daily|weekly|monthly)$"),
+    days: int = Query(7, ge=1, le=90),
     db: Session = Depends(get_db),
 ):
-    """Get aggregated performance metrics."""
+    """Get aggregated performance metrics.
+
+    Without ``period_type`` the coarsest rollup grain that still resolves the
+    window is used, e.g. daily for a week and weekly for 90 days. The current,
+    still filling bucket is included.
+    """
+    if period_type is None:
+        period_type = _choose_period_type(days)
+
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
 
     query = db.query(PerformanceAggregate).filter(
         PerformanceAggregate.period_type == period_type,
         PerformanceAggregate.period_start >= start_date,
-        PerformanceAggregate.period_end <= end_date,
+        PerformanceAggregate.period_start < end_date,
     )
 
     if campaign_id:
@@ -60,6 +93,42 @@ async def get_aggregates(
     return results
 
 
+@router.get(
+    "/metrics/dimensions/{dimension}",
+    response_model=list[DimensionAggregateResponse],
+)
+async def get_dimension_aggregates(
+    dimension: str = Path(..., regex="^(ad_group|keyword|asin|profile)$"),
+    dimension_id: Optional[str] = Query(None),
+    campaign_id: Optional[str] = Query(None),
+    period_type: Optional[str] = Query(None, regex="^(hourly|daily|weekly|monthly)$"),
+    days: int = Query(7, ge=1, le=90),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Get aggregated metrics per ad group, keyword, ASIN or profile."""
+    if period_type is None:
+        period_type = _choose_period_type(days)
+
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    query = db.query(DimensionAggregate).filter(
+        DimensionAggregate.dimension == dimension,
+        DimensionAggregate.period_type == period_type,
+        DimensionAggregate.period_start >= start_date,
+        DimensionAggregate.period_start < end_date,
+    )
+
+    if dimension_id:
+        query = query.filter(DimensionAggregate.dimension_id == dimension_id)
+    if campaign_id:
+        query = query.filter(DimensionAggregate.campaign_id == campaign_id)
+
+    results = query.order_by(DimensionAggregate.period_start.desc()).limit(limit).all()
+    return results
+
+
 @router.get("/alerts", response_model=list[AlertResponse])
 async def get_alerts(
     campaign_id: Optional[str] = Query(None),
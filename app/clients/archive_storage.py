@@ -0,0 +1,119 @@
+"""Storage backends for archived raw stream messages."""
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import boto3
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveStorage(ABC):
+    """Write, read and list archive files by key relative to the archive root."""
+
+    @abstractmethod
+    def write(self, key: str, data: bytes) -> str:
+        """Store ``data`` under ``key`` and return the file's URI."""
+        pass
+
+    @abstractmethod
+    def read(self, uri: str) -> bytes:
+        """Return the contents of a file previously returned by ``write``."""
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str) -> List[str]:
+        """Return URIs of files whose key starts with ``prefix``, sorted."""
+        pass
+
+
+class LocalArchiveStorage(ArchiveStorage):
+    """Archive files in a local (or mounted) directory."""
+
+    def __init__(self, root: str):
+        """Initialize local archive storage."""
+        self.root = Path(root).resolve()
+
+    def write(self, key: str, data: bytes) -> str:
+        """Write the file atomically so readers never see a partial archive."""
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        return str(path)
+
+    def read(self, uri: str) -> bytes:
+        """Read an archive file by path."""
+        return Path(uri).read_bytes()
+
+    def list(self, prefix: str) -> List[str]:
+        """List archive files under a key prefix."""
+        directory = self.root / prefix
+        if not directory.is_dir():
+            return []
+        return sorted(
+            str(path)
+            for path in directory.rglob("*")
+            if path.is_file() and path.suffix != ".tmp"
+        )
+
+
+class S3ArchiveStorage(ArchiveStorage):
+    """Archive files in an S3 bucket under an optional key prefix."""
+
+    def __init__(self, bucket: str, prefix: str = ""):
+        """Initialize S3 archive storage."""
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = boto3.client(
+            "s3",
+            region_name=settings.aws_region,
+            aws_access_key_id=settings.aws_access_key_id,
+            aws_secret_access_key=settings.aws_secret_access_key,
+        )
+
+    def write(self, key: str, data: bytes) -> str:
+        """Upload an archive file."""
+        object_key = self._object_key(key)
+        self._client.put_object(Bucket=self.bucket, Key=object_key, Body=data)
+        return f"s3://{self.bucket}/{object_key}"
+
+    def read(self, uri: str) -> bytes:
+        """Download an archive file by ``s3://`` URI."""
+        bucket, object_key = _split_s3_uri(uri)
+        response = self._client.get_object(Bucket=bucket, Key=object_key)
+        return response["Body"].read()
+
+    def list(self, prefix: str) -> List[str]:
+        """List archive files under a key prefix."""
+        uris = []
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+            for item in page.get("Contents", []):
+                uris.append(f"s3://{self.bucket}/{item['Key']}")
+        return sorted(uris)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+
+def _split_s3_uri(uri: str) -> Tuple[str, str]:
+    """Split ``s3://bucket/key`` into (bucket, key)."""
+    bucket, _, object_key = uri[len("s3://"):].partition("/")
+    return bucket, object_key
+
+
+def get_archive_storage(uri: Optional[str] = None) -> ArchiveStorage:
+    """Return the storage backend for an archive root or file URI.
+
+    Defaults to the configured ``RAW_ARCHIVE_URI``.
+    """
+    uri = uri or settings.raw_archive_uri
+    if uri.startswith("s3://"):
+        bucket, prefix = _split_s3_uri(uri)
+        return S3ArchiveStorage(bucket, prefix)
+    return LocalArchiveStorage(uri)
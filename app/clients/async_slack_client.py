@@ -0,0 +1,121 @@
+"""Asyncio-native Slack webhook client."""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.clients.base import AsyncSlackClientInterface
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses Slack returns for a malformed payload; other 4xx mean the webhook
+# itself is unusable (revoked, archived channel), which no payload will fix
+REJECTED_PAYLOAD_STATUSES = (400, 413, 422)
+
+
+class SlackRejectedError(Exception):
+    """Raised when Slack refuses a payload that retrying will not fix."""
+
+
+class AsyncSlackClient(AsyncSlackClientInterface):
+    """Slack webhook client over one pooled httpx.AsyncClient.
+
+    Rate-limited posts (429) wait for the ``Retry-After`` Slack sends; server
+    errors and network failures back off exponentially. Other client errors
+    are not retried: a malformed payload raises ``SlackRejectedError``, a
+    refused webhook fails the post. Each request is cut off after
+    ``SLACK_TIMEOUT_SECONDS`` and no wait exceeds the longest backoff, so a
+    post never takes longer than ``settings.slack_max_post_seconds``.
+    """
+
+    def __init__(self, webhook_url: Optional[str] = None):
+        """Initialize async Slack client."""
+        self.webhook_url = webhook_url or settings.slack_webhook_url
+        self.enabled = bool(self.webhook_url)
+        self.max_retries = settings.slack_max_retries
+        self.retry_base_seconds = settings.slack_retry_base_seconds
+        self.timeout_seconds = settings.slack_timeout_seconds
+        self.max_delay = self.retry_base_seconds * 2**self.max_retries
+        self._http = (
+            httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout_seconds),
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            )
+            if self.enabled
+            else None
+        )
+
+        self.sent_count = 0
+        self.failed_count = 0
+        self.rate_limited_count = 0
+
+    async def send_payload(self, payload: Dict[str, Any]) -> bool:
+        """Post a payload, retrying rate limits and transient failures.
+
+        Returns False when the post failed and may succeed later; raises
+        ``SlackRejectedError`` when Slack refuses this payload.
+        """
+        if not self.enabled:
+            logger.info(f"[MOCK SLACK ALERT]\n{json.dumps(payload, indent=2)}")
+            self.sent_count += 1
+            return True
+
+        for attempt in range(self.max_retries + 1):
+            delay = self.retry_base_seconds * 2**attempt
+            try:
+                response = await asyncio.wait_for(
+                    self._http.post(self.webhook_url, json=payload), self.timeout_seconds
+                )
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                logger.warning(f"Error posting to Slack: {e!r}")
+            else:
+                if response.is_success:
+                    self.sent_count += 1
+                    return True
+                if response.status_code == 429:
+                    self.rate_limited_count += 1
+                    delay = _retry_after(response, delay)
+                    if delay > self.max_delay:
+                        logger.error(f"Slack rate limited for {delay:.0f}s; giving up on post")
+                        break
+                    logger.warning(f"Slack rate limited; retrying in {delay:.0f}s")
+                elif response.status_code in REJECTED_PAYLOAD_STATUSES:
+                    self.failed_count += 1
+                    raise SlackRejectedError(f"{response.status_code} {response.text}")
+                elif response.status_code < 500:
+                    logger.error(
+                        f"Slack refused webhook: {response.status_code} {response.text}"
+                    )
+                    break
+                else:
+                    logger.warning(f"Slack returned {response.status_code}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+
+        self.failed_count += 1
+        return False
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._http:
+            await self._http.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """Return delivery counters."""
+        return {
+            "sent": self.sent_count,
+            "failed": self.failed_count,
+            "rate_limited": self.rate_limited_count,
+        }
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    """Seconds to wait from a ``Retry-After`` header, or ``default``."""
+    try:
+        return max(float(response.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return default
@@ -0,0 +1,296 @@
+"""Asyncio-native SQS client implementation."""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+
+from app.clients.base import AsyncSQSClientInterface
+from app.clients.mock_sqs import MockSQSClient
+from app.clients.sqs_client import (
+    MAX_BATCH_ENTRIES,
+    batch_failures,
+    parse_sqs_messages,
+)
+from app.core.config import settings
+from app.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class SQSRequestError(Exception):
+    """Raised when SQS returns an error response."""
+
+
+class AsyncSQSClient(AsyncSQSClientInterface):
+    """SQS client speaking the AWS JSON protocol over a pooled httpx.AsyncClient.
+
+    Requests are signed with botocore's SigV4 signer, so no extra dependency
+    is needed beyond boto3 and httpx which the project already uses.
+    """
+
+    def __init__(self):
+        """Initialize async SQS client."""
+        if not settings.has_aws_credentials or not settings.has_sqs_queue:
+            logger.warning(
+                "AWS credentials or SQS queue URL not configured. Using mock client."
+            )
+            self._http = None
+            self._mock_client = MockSQSClient()
+        else:
+            self._credentials = Credentials(
+                settings.aws_access_key_id, settings.aws_secret_access_key
+            )
+            self._region = settings.aws_region
+            self._endpoint = f"https://sqs.{self._region}.amazonaws.com/"
+            self._queue_url = settings.sqs_queue_url
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            )
+            self._mock_client = None
+
+    async def receive_messages(
+        self, max_messages: int = 10, wait_time_seconds: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Receive messages from SQS queue; request errors propagate."""
+        if self._mock_client:
+            return await asyncio.to_thread(
+                self._mock_client.receive_messages, max_messages, wait_time_seconds
+            )
+
+        try:
+            response = await self._call(
+                "ReceiveMessage",
+                {
+                    "QueueUrl": self._queue_url,
+                    "MaxNumberOfMessages": min(max_messages, MAX_BATCH_ENTRIES),
+                    "WaitTimeSeconds": wait_time_seconds,
+                    "MessageAttributeNames": ["All"],
+                },
+                # Long polls hold the connection open for up to WaitTimeSeconds
+                timeout=wait_time_seconds + 10.0,
+            )
+            return parse_sqs_messages(response.get("Messages", []))
+        except (httpx.HTTPError, SQSRequestError) as e:
+            logger.error(f"Error receiving messages from SQS: {e}")
+            raise
+
+    async def delete_message(self, receipt_handle: str) -> None:
+        """Delete a message from the queue."""
+        if self._mock_client:
+            return self._mock_client.delete_message(receipt_handle)
+
+        try:
+            await self._call(
+                "DeleteMessage",
+                {"QueueUrl": self._queue_url, "ReceiptHandle": receipt_handle},
+            )
+        except (httpx.HTTPError, SQSRequestError) as e:
+            logger.error(f"Error deleting message from SQS: {e}")
+
+    async def delete_message_batch(
+        self, receipt_handles: List[str]
+    ) -> Tuple[List[str], List[str]]:
+        """Delete up to 10 messages; return retryable and permanently failed handles."""
+        if self._mock_client:
+            return self._mock_client.delete_message_batch(receipt_handles)
+
+        entries = [
+            {"Id": str(i), "ReceiptHandle": handle}
+            for i, handle in enumerate(receipt_handles[:MAX_BATCH_ENTRIES])
+        ]
+        try:
+            response = await self._call(
+                "DeleteMessageBatch", {"QueueUrl": self._queue_url, "Entries": entries}
+            )
+        except (httpx.HTTPError, SQSRequestError) as e:
+            logger.error(f"Error batch deleting messages from SQS: {e}")
+            return list(receipt_handles), []
+
+        return batch_failures(response, receipt_handles)
+
+    async def change_message_visibility_batch(
+        self, receipt_handles: List[str], visibility_timeout: int
+    ) -> List[str]:
+        """Change visibility of up to 10 messages with one call."""
+        if self._mock_client:
+            return self._mock_client.change_message_visibility_batch(
+                receipt_handles, visibility_timeout
+            )
+
+        entries = [
+            {"Id": str(i), "ReceiptHandle": handle, "VisibilityTimeout": visibility_timeout}
+            for i, handle in enumerate(receipt_handles[:MAX_BATCH_ENTRIES])
+        ]
+        try:
+            response = await self._call(
+                "ChangeMessageVisibilityBatch",
+                {"QueueUrl": self._queue_url, "Entries": entries},
+            )
+        except (httpx.HTTPError, SQSRequestError) as e:
+            logger.error(f"Error changing SQS message visibility: {e}")
+            return list(receipt_handles)
+
+        return [receipt_handles[int(entry["Id"])] for entry in response.get("Failed", [])]
+
+    async def send_message(
+        self, message_body: str, message_attributes: Optional[Dict] = None
+    ) -> None:
+        """Send a message to the queue."""
+        if self._mock_client:
+            return self._mock_client.send_message(message_body, message_attributes)
+
+        try:
+            params = {"QueueUrl": self._queue_url, "MessageBody": message_body}
+            if message_attributes:
+                params["MessageAttributes"] = message_attributes
+
+            await self._call("SendMessage", params)
+        except (httpx.HTTPError, SQSRequestError) as e:
+            logger.error(f"Error sending message to SQS: {e}")
+
+    async def close(self) -> None:
+        """Close pooled HTTP connections."""
+        if self._http:
+            await self._http.aclose()
+
+    async def _call(
+        self, action: str, payload: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Sign and send an SQS JSON-protocol request."""
+        body = json_codec.dumps(payload)
+        request = AWSRequest(
+            method="POST",
+            url=self._endpoint,
+            data=body,
+            headers={
+                "Content-Type": "application/x-amz-json-1.0",
+                "X-Amz-Target": f"AmazonSQS.{action}",
+            },
+        )
+        SigV4Auth(self._credentials, "sqs", self._region).add_auth(request)
+
+        response = await self._http.post(
+            self._endpoint,
+            content=body,
+            headers=dict(request.headers.items()),
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        if response.status_code >= 400:
+            raise SQSRequestError(f"{action} failed ({response.status_code}): {response.text}")
+        return json_codec.loads(response.content) if response.content else {}
+
+
+class AsyncVisibilityTracker:
+    """Asyncio counterpart of ``SQSVisibilityTracker``.
+
+    Tracks received receipt handles until they are acknowledged or released
+    and extends their visibility timeout from a heartbeat task on the running
+    loop. Released messages get a timeout of 0 and are retried immediately.
+    """
+
+    def __init__(
+        self,
+        client: AsyncSQSClientInterface,
+        visibility_timeout_seconds: int = 60,
+        heartbeat_seconds: float = 20.0,
+        max_extension_seconds: float = 900.0,
+    ):
+        """Initialize visibility tracker."""
+        self._client = client
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_extension_seconds = max_extension_seconds
+
+        # receipt handle -> (received_at, last_extended_at)
+        self._in_flight: Dict[str, Tuple[float, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.extended_count = 0
+        self.released_count = 0
+        self.expired_count = 0
+
+    def track(self, receipt_handles: List[str]) -> None:
+        """Start heartbeating freshly received messages."""
+        if not receipt_handles:
+            return
+        now = time.monotonic()
+        for handle in receipt_handles:
+            self._in_flight[handle] = (now, now)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(
+                self._heartbeat_loop(), name="sqs-visibility-heartbeat"
+            )
+
+    def untrack(self, receipt_handles: List[str]) -> None:
+        """Stop heartbeating messages that have been acknowledged."""
+        for handle in receipt_handles:
+            self._in_flight.pop(handle, None)
+
+    async def release(self, receipt_handles: List[str]) -> None:
+        """Make messages visible again immediately so they can be retried."""
+        self.untrack(receipt_handles)
+        for i in range(0, len(receipt_handles), MAX_BATCH_ENTRIES):
+            chunk = receipt_handles[i : i + MAX_BATCH_ENTRIES]
+            failed = await self._client.change_message_visibility_batch(chunk, 0)
+            self.released_count += len(chunk) - len(failed)
+
+    async def close(self) -> None:
+        """Stop the heartbeat and release anything still in flight."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.release(list(self._in_flight))
+
+    def stats(self) -> Dict[str, int]:
+        """Return visibility counters."""
+        return {
+            "in_flight": len(self._in_flight),
+            "extended": self.extended_count,
+            "released": self.released_count,
+            "expired": self.expired_count,
+        }
+
+    async def heartbeat(self) -> None:
+        """Extend visibility of messages whose last extension is due."""
+        now = time.monotonic()
+        due: List[str] = []
+        for handle, (received_at, extended_at) in list(self._in_flight.items()):
+            if now - received_at >= self.max_extension_seconds:
+                # Give up on messages stuck far beyond any sane batch time
+                del self._in_flight[handle]
+                self.expired_count += 1
+            elif now - extended_at >= self.heartbeat_seconds:
+                due.append(handle)
+
+        for i in range(0, len(due), MAX_BATCH_ENTRIES):
+            chunk = due[i : i + MAX_BATCH_ENTRIES]
+            failed = set(
+                await self._client.change_message_visibility_batch(
+                    chunk, self.visibility_timeout_seconds
+                )
+            )
+            for handle in chunk:
+                # Acknowledged or released while the call was in flight
+                if handle not in self._in_flight:
+                    continue
+                if handle in failed:
+                    del self._in_flight[handle]
+                else:
+                    self._in_flight[handle] = (self._in_flight[handle][0], now)
+                    self.extended_count += 1
+
+    async def _heartbeat_loop(self) -> None:
+        """Run heartbeats until closed."""
+        while True:
+            await asyncio.sleep(min(self.heartbeat_seconds / 2, 5.0))
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"Error extending SQS message visibility: {e}", exc_info=True)
@@ -1,6 +1,6 @@
 """Base client interface for external services."""
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class SQSClientInterface(ABC):
@@ -18,12 +18,73 @@ class SQSClientInterface(ABC):
         """Delete a message from the queue."""
         pass
 
+    @abstractmethod
+    def delete_message_batch(
+        self, receipt_handles: List[str]
+    ) -> Tuple[List[str], List[str]]:
+        """Delete up to 10 messages; return retryable and permanently failed handles."""
+        pass
+
+    @abstractmethod
+    def change_message_visibility_batch(
+        self, receipt_handles: List[str], visibility_timeout: int
+    ) -> List[str]:
+        """Set visibility of up to 10 messages in one call; return handles that failed."""
+        pass
+
+    @abstractmethod
+    def get_queue_depth(self) -> Optional[int]:
+        """Return ApproximateNumberOfMessages, or None if unavailable."""
+        pass
+
     @abstractmethod
     def send_message(self, message_body: str, message_attributes: Optional[Dict] = None) -> None:
         """Send a message to the queue."""
         pass
 
 
+class AsyncSQSClientInterface(ABC):
+    """Interface for asyncio-native SQS client operations."""
+
+    @abstractmethod
+    async def receive_messages(
+        self, max_messages: int = 10, wait_time_seconds: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Receive messages from SQS queue."""
+        pass
+
+    @abstractmethod
+    async def delete_message(self, receipt_handle: str) -> None:
+        """Delete a message from the queue."""
+        pass
+
+    @abstractmethod
+    async def delete_message_batch(
+        self, receipt_handles: List[str]
+    ) -> Tuple[List[str], List[str]]:
+        """Delete up to 10 messages; return retryable and permanently failed handles."""
+        pass
+
+    @abstractmethod
+    async def change_message_visibility_batch(
+        self, receipt_handles: List[str], visibility_timeout: int
+    ) -> List[str]:
+        """Set visibility of up to 10 messages in one call; return handles that failed."""
+        pass
+
+    @abstractmethod
+    async def send_message(
+        self, message_body: str, message_attributes: Optional[Dict] = None
+    ) -> None:
+        """Send a message to the queue."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release network resources."""
+        pass
+
+
 class SlackClientInterface(ABC):
     """Interface for Slack client operations."""
 
@@ -45,3 +106,16 @@ class SlackClientInterface(ABC):
         """Send an alert to Slack."""
         pass
 
+
+class AsyncSlackClientInterface(ABC):
+    """Interface for asyncio Slack client operations."""
+
+    @abstractmethod
+    async def send_payload(self, payload: Dict[str, Any]) -> bool:
+        """Post a webhook payload to Slack; return False if it may succeed later."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release network resources."""
+        pass
@@ -1,11 +1,12 @@
 """Mock SQS client for local development."""
-import json
+import itertools
 import logging
 import time
 from collections import deque
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.clients.base import SQSClientInterface
+from app.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,9 @@ class MockSQSClient(SQSClientInterface):
     def __init__(self):
         """Initialize mock SQS client."""
         self._queue: deque = deque()
-        self._processed_messages: set = set()
+        # receipt handle -> queued message, while it is in flight
+        self._processed_messages: Dict[str, Dict[str, Any]] = {}
+        self._receipt_counter = itertools.count()
 
     def receive_messages(
         self, max_messages: int = 10, wait_time_seconds: int = 5
@@ -28,16 +31,17 @@ class MockSQSClient(SQSClientInterface):
         while len(messages) < max_messages:
             if self._queue:
                 msg = self._queue.popleft()
-                receipt_handle = f"mock_receipt_{len(self._processed_messages)}"
+                receipt_handle = f"mock_receipt_{next(self._receipt_counter)}"
                 messages.append(
                     {
                         "receipt_handle": receipt_handle,
                         "message_id": msg.get("message_id", f"mock_msg_{len(messages)}"),
                         "body": msg.get("body", {}),
+                        "raw_body": msg.get("raw_body"),
                         "attributes": msg.get("attributes", {}),
                     }
                 )
-                self._processed_messages.add(receipt_handle)
+                self._processed_messages[receipt_handle] = msg
             elif time.time() - start_time < wait_time_seconds:
                 time.sleep(0.1)  # Small delay to simulate waiting
             else:
@@ -47,28 +51,75 @@ class MockSQSClient(SQSClientInterface):
 
     def delete_message(self, receipt_handle: str) -> None:
         """Delete a message from mock queue."""
-        if receipt_handle in self._processed_messages:
-            self._processed_messages.remove(receipt_handle)
+        if self._processed_messages.pop(receipt_handle, None) is not None:
             logger.debug(f"Deleted mock message: {receipt_handle}")
 
+    def delete_message_batch(
+        self, receipt_handles: List[str]
+    ) -> Tuple[List[str], List[str]]:
+        """Delete several messages from mock queue.
+
+        Unknown handles are permanent failures; none are returned for retry.
+        """
+        unknown = [
+            receipt_handle
+            for receipt_handle in receipt_handles
+            if self._processed_messages.pop(receipt_handle, None) is None
+        ]
+        logger.debug(
+            f"Deleted {len(receipt_handles) - len(unknown)} of {len(receipt_handles)} "
+            "mock messages"
+        )
+        return [], unknown
+
+    def change_message_visibility_batch(
+        self, receipt_handles: List[str], visibility_timeout: int
+    ) -> List[str]:
+        """Change visibility of in-flight mock messages.
+
+        A timeout of 0 puts the messages back on the queue for redelivery;
+        other timeouts are no-ops since mock messages never expire.
+        """
+        failed = [h for h in receipt_handles if h not in self._processed_messages]
+        if visibility_timeout == 0:
+            for receipt_handle in receipt_handles:
+                msg = self._processed_messages.pop(receipt_handle, None)
+                if msg is not None:
+                    self._queue.append(msg)
+        logger.debug(
+            f"Set visibility of {len(receipt_handles) - len(failed)} mock messages "
+            f"to {visibility_timeout}s"
+        )
+        return failed
+
+    def get_queue_depth(self) -> Optional[int]:
+        """Return number of messages waiting in mock queue."""
+        return len(self._queue)
+
     def send_message(
         self, message_body: str, message_attributes: Optional[Dict] = None
     ) -> None:
         """Add a message to mock queue."""
         try:
-            body = json.loads(message_body) if isinstance(message_body, str) else message_body
+            if isinstance(message_body, (str, bytes)):
+                body = json_codec.loads(message_body)
+                raw_body = message_body
+            else:
+                body = message_body
+                raw_body = json_codec.dumps(message_body)
             self._queue.append(
                 {
                     "body": body,
+                    "raw_body": raw_body,
                     "attributes": message_attributes or {},
                     "message_id": f"mock_{int(time.time() * 1000)}",
                 }
             )
             logger.debug(f"Added message to mock queue: {len(self._queue)} messages")
-        except json.JSONDecodeError:
+        except json_codec.DecodeError:
             logger.error(f"Failed to parse message body: {message_body}")
 
     def add_sample_message(self, message: Dict[str, Any]) -> None:
         """Helper method to add sample messages for testing."""
-        self.send_message(json.dumps(message))
+        self.send_message(json_codec.dumps(message))
 
@@ -1,7 +1,7 @@
 """Slack client implementation."""
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import httpx
 
@@ -10,6 +10,127 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Slack rejects messages with more blocks than this
+MAX_BLOCKS = 50
+
+SEVERITY_COLORS = {
+    "low": "#36a64f",  # Green
+    "medium": "#ff9900",  # Orange
+    "high": "#ff0000",  # Red
+}
+
+
+def alert_payload(
+    alert_type: str,
+    severity: str,
+    message: str,
+    campaign_id: str,
+    campaign_name: Optional[str] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Build the webhook payload for one alert."""
+    color = SEVERITY_COLORS.get(severity.lower(), "#808080")
+
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"🚨 Campaign Alert: {alert_type.upper()}",
+            },
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": f"*Severity:*\n{severity.upper()}"},
+                {
+                    "type": "mrkdwn",
+                    "text": f"*Campaign ID:*\n`{campaign_id}`",
+                },
+            ],
+        },
+    ]
+
+    if campaign_name:
+        blocks.append(
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"*Campaign:* {campaign_name}",
+                },
+            }
+        )
+
+    blocks.append(
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": f"*Message:*\n{message}"},
+        }
+    )
+
+    if metrics:
+        metrics_text = "\n".join(
+            [f"• *{k}:* {v}" for k, v in metrics.items()]
+        )
+        blocks.append(
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*Metrics:*\n{metrics_text}"},
+            }
+        )
+
+    blocks.append({"type": "divider"})
+
+    payload = {
+        "text": f"Campaign Alert: {alert_type}",
+        "blocks": blocks,
+        "attachments": [{"color": color}],
+    }
+
+    return payload
+
+
+def digest_payload(alerts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build one webhook payload for several alerts.
+
+    Each item holds ``alert_payload`` arguments. A single alert keeps the
+    detailed layout; more are listed one section each, so at most
+    ``MAX_BLOCKS - 2`` fit in one message.
+    """
+    if len(alerts) == 1:
+        return alert_payload(**alerts[0])
+
+    blocks: List[Dict[str, Any]] = [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"🚨 {len(alerts)} Campaign Alerts"},
+        }
+    ]
+    for alert in alerts:
+        campaign = f"`{alert['campaign_id']}`"
+        if alert.get("campaign_name"):
+            campaign += f" {alert['campaign_name']}"
+        text = (
+            f"*{alert['severity'].upper()}* {alert['alert_type'].upper()} {campaign}\n"
+            f"{alert['message']}"
+        )
+        if alert.get("metrics"):
+            text += "\n" + " ".join(f"*{k}:* {v}" for k, v in alert["metrics"].items())
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
+    blocks.append({"type": "divider"})
+
+    severities = list(SEVERITY_COLORS)
+    worst = max(
+        (alert["severity"].lower() for alert in alerts),
+        key=lambda severity: severities.index(severity) if severity in severities else -1,
+    )
+    return {
+        "text": f"{len(alerts)} campaign alerts",
+        "blocks": blocks,
+        "attachments": [{"color": SEVERITY_COLORS.get(worst, "#808080")}],
+    }
+
 
 class SlackClient(SlackClientInterface):
     """Slack client using webhook URL."""
@@ -48,71 +169,15 @@ class SlackClient(SlackClientInterface):
         metrics: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """Send an alert to Slack with formatted blocks."""
-        severity_colors = {
-            "low": "#36a64f",  # Green
-            "medium": "#ff9900",  # Orange
-            "high": "#ff0000",  # Red
-        }
-
-        color = severity_colors.get(severity.lower(), "#808080")
-
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"🚨 Campaign Alert: {alert_type.upper()}",
-                },
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {"type": "mrkdwn", "text": f"*Severity:*\n{severity.upper()}"},
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Campaign ID:*\n`{campaign_id}`",
-                    },
-                ],
-            },
-        ]
-
-        if campaign_name:
-            blocks.append(
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Campaign:* {campaign_name}",
-                    },
-                }
-            )
-
-        blocks.append(
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": f"*Message:*\n{message}"},
-            }
+        payload = alert_payload(
+            alert_type=alert_type,
+            severity=severity,
+            message=message,
+            campaign_id=campaign_id,
+            campaign_name=campaign_name,
+            metrics=metrics,
         )
 
-        if metrics:
-            metrics_text = "\n".join(
-                [f"• *{k}:* {v}" for k, v in metrics.items()]
-            )
-            blocks.append(
-                {
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": f"*Metrics:*\n{metrics_text}"},
-                }
-            )
-
-        blocks.append({"type": "divider"})
-
-        payload = {
-            "text": f"Campaign Alert: {alert_type}",
-            "blocks": blocks,
-            "attachments": [{"color": color}],
-        }
-
         if not self.enabled:
             logger.info(f"[MOCK SLACK ALERT]\n{json.dumps(payload, indent=2)}")
             return True
@@ -1,7 +1,8 @@
 """SQS client implementation."""
-import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
 from botocore.exceptions import ClientError
@@ -9,9 +10,318 @@ from botocore.exceptions import ClientError
 from app.clients.base import SQSClientInterface
 from app.clients.mock_sqs import MockSQSClient
 from app.core.config import settings
+from app.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
+# SQS DeleteMessageBatch accepts at most 10 entries per call
+MAX_BATCH_ENTRIES = 10
+
+
+def parse_sqs_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert raw SQS ReceiveMessage entries into worker message dicts."""
+    result = []
+    for msg in messages:
+        try:
+            body = json_codec.loads(msg["Body"])
+            result.append(
+                {
+                    "receipt_handle": msg["ReceiptHandle"],
+                    "message_id": msg["MessageId"],
+                    "body": body,
+                    "raw_body": msg["Body"],
+                    "attributes": msg.get("MessageAttributes", {}),
+                }
+            )
+        except json_codec.DecodeError:
+            logger.error(f"Failed to parse message body: {msg.get('Body')}")
+            continue
+
+    return result
+
+
+def batch_failures(
+    response: Dict[str, Any], receipt_handles: List[str]
+) -> Tuple[List[str], List[str]]:
+    """Split failed batch entries into (retryable, permanent) handles.
+
+    SQS flags permanent errors such as ``ReceiptHandleIsInvalid`` with
+    ``SenderFault``; retrying those can never succeed.
+    """
+    retryable, permanent = [], []
+    for entry in response.get("Failed", []):
+        handle = receipt_handles[int(entry["Id"])]
+        if entry.get("SenderFault"):
+            logger.warning(
+                f"Dropping SQS acknowledgement: {entry.get('Code')} {entry.get('Message')}"
+            )
+            permanent.append(handle)
+            continue
+        logger.warning(
+            f"Failed to delete SQS message: {entry.get('Code')} {entry.get('Message')}"
+        )
+        retryable.append(handle)
+    return retryable, permanent
+
+
+class SQSAckBuffer:
+    """Collects receipt handles and deletes them with DeleteMessageBatch.
+
+    A flush happens as soon as ``MAX_BATCH_ENTRIES`` handles are buffered, or
+    once the oldest buffered handle has waited ``flush_interval_seconds``.
+    Entries that fail server-side are retried on their own up to
+    ``max_retries`` times; the client drops permanent (sender) failures.
+    """
+
+    def __init__(
+        self,
+        client: SQSClientInterface,
+        flush_interval_seconds: float = 1.0,
+        max_retries: int = 3,
+    ):
+        """Initialize acknowledgement buffer."""
+        self._client = client
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+
+        self._pending: List[str] = []
+        self._oldest_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+
+        self.acked_count = 0
+        self.failed_count = 0
+        self.retried_count = 0
+        self.batch_calls = 0
+
+    def add(self, receipt_handle: str) -> None:
+        """Buffer a receipt handle, flushing when a full batch is ready."""
+        with self._lock:
+            self._pending.append(receipt_handle)
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+            full = len(self._pending) >= MAX_BATCH_ENTRIES
+
+        self._ensure_timer()
+        if full:
+            self.flush(only_full_batches=True)
+
+    def flush(self, only_full_batches: bool = False) -> None:
+        """Delete buffered handles in batches of up to 10."""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._oldest_at = None
+                        return
+                    if only_full_batches and len(self._pending) < MAX_BATCH_ENTRIES:
+                        return
+                    batch = self._pending[:MAX_BATCH_ENTRIES]
+                    del self._pending[:MAX_BATCH_ENTRIES]
+                    self._oldest_at = time.monotonic() if self._pending else None
+
+                self._delete_with_retry(batch)
+
+    def close(self) -> None:
+        """Flush remaining handles and stop the background timer."""
+        self._stop.set()
+        if self._timer:
+            self._timer.join()
+            self._timer = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Return acknowledgement counters."""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "acked": self.acked_count,
+            "failed": self.failed_count,
+            "retried": self.retried_count,
+            "batch_calls": self.batch_calls,
+        }
+
+    def _delete_with_retry(self, receipt_handles: List[str]) -> None:
+        """Delete a batch, retrying only the entries that failed."""
+        remaining = receipt_handles
+        attempt = 0
+        while remaining:
+            self.batch_calls += 1
+            failed, dropped = self._client.delete_message_batch(remaining)
+            self.acked_count += len(remaining) - len(failed) - len(dropped)
+            # Permanent failures were never deleted and are not retried
+            self.failed_count += len(dropped)
+            if not failed:
+                return
+            if attempt >= self.max_retries:
+                self.failed_count += len(failed)
+                logger.error(f"Giving up on {len(failed)} SQS acknowledgements")
+                return
+            attempt += 1
+            self.retried_count += len(failed)
+            time.sleep(0.1 * 2 ** (attempt - 1))
+            remaining = failed
+
+    def _ensure_timer(self) -> None:
+        """Start the time-based flusher on first use."""
+        if self._timer and self._timer.is_alive():
+            return
+        with self._lock:
+            if self._timer and self._timer.is_alive():
+                return
+            self._stop.clear()
+            self._timer = threading.Thread(
+                target=self._timer_loop, name="sqs-ack-flusher", daemon=True
+            )
+            self._timer.start()
+
+    def _timer_loop(self) -> None:
+        """Flush handles that have waited longer than the flush interval."""
+        while not self._stop.wait(self.flush_interval_seconds / 2):
+            with self._lock:
+                due = (
+                    self._oldest_at is not None
+                    and time.monotonic() - self._oldest_at >= self.flush_interval_seconds
+                )
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing SQS acknowledgements: {e}", exc_info=True)
+
+
+class SQSVisibilityTracker:
+    """Keeps in-flight messages invisible while they are being processed.
+
+    Received receipt handles are tracked until they are acknowledged or
+    released. A background heartbeat extends the visibility timeout of every
+    tracked message with ChangeMessageVisibilityBatch, so slow batches are not
+    redelivered to another consumer. Released messages get a timeout of 0 and
+    become visible for retry immediately.
+    """
+
+    def __init__(
+        self,
+        client: SQSClientInterface,
+        visibility_timeout_seconds: int = 60,
+        heartbeat_seconds: float = 20.0,
+        max_extension_seconds: float = 900.0,
+    ):
+        """Initialize visibility tracker."""
+        self._client = client
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_extension_seconds = max_extension_seconds
+
+        # receipt handle -> (received_at, last_extended_at)
+        self._in_flight: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.extended_count = 0
+        self.released_count = 0
+        self.expired_count = 0
+
+    def track(self, receipt_handles: List[str]) -> None:
+        """Start heartbeating freshly received messages."""
+        if not receipt_handles:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for handle in receipt_handles:
+                self._in_flight[handle] = (now, now)
+        self._ensure_thread()
+
+    def untrack(self, receipt_handle: str) -> None:
+        """Stop heartbeating a message that has been acknowledged."""
+        with self._lock:
+            self._in_flight.pop(receipt_handle, None)
+
+    def release(self, receipt_handles: List[str]) -> None:
+        """Make messages visible again immediately so they can be retried."""
+        with self._lock:
+            for handle in receipt_handles:
+                self._in_flight.pop(handle, None)
+        for i in range(0, len(receipt_handles), MAX_BATCH_ENTRIES):
+            chunk = receipt_handles[i : i + MAX_BATCH_ENTRIES]
+            failed = self._client.change_message_visibility_batch(chunk, 0)
+            self.released_count += len(chunk) - len(failed)
+
+    def close(self) -> None:
+        """Stop the heartbeat and release anything still in flight."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            remaining = list(self._in_flight)
+        self.release(remaining)
+
+    def stats(self) -> Dict[str, int]:
+        """Return visibility counters."""
+        with self._lock:
+            in_flight = len(self._in_flight)
+        return {
+            "in_flight": in_flight,
+            "extended": self.extended_count,
+            "released": self.released_count,
+            "expired": self.expired_count,
+        }
+
+    def heartbeat(self) -> None:
+        """Extend visibility of messages whose last extension is due."""
+        now = time.monotonic()
+        due: List[str] = []
+        with self._lock:
+            for handle, (received_at, extended_at) in list(self._in_flight.items()):
+                if now - received_at >= self.max_extension_seconds:
+                    # Give up on messages stuck far beyond any sane batch time
+                    del self._in_flight[handle]
+                    self.expired_count += 1
+                elif now - extended_at >= self.heartbeat_seconds:
+                    due.append(handle)
+
+        for i in range(0, len(due), MAX_BATCH_ENTRIES):
+            chunk = due[i : i + MAX_BATCH_ENTRIES]
+            failed = set(
+                self._client.change_message_visibility_batch(
+                    chunk, self.visibility_timeout_seconds
+                )
+            )
+            with self._lock:
+                for handle in chunk:
+                    if handle not in self._in_flight:
+                        continue
+                    if handle in failed:
+                        # Handle is no longer valid (deleted or already expired)
+                        del self._in_flight[handle]
+                    else:
+                        self._in_flight[handle] = (self._in_flight[handle][0], now)
+                        self.extended_count += 1
+
+    def _ensure_thread(self) -> None:
+        """Start the heartbeat thread on first use."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._heartbeat_loop, name="sqs-visibility-heartbeat", daemon=True
+            )
+            self._thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        """Run heartbeats until closed."""
+        while not self._stop.wait(min(self.heartbeat_seconds / 2, 5.0)):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error(f"Error extending SQS message visibility: {e}", exc_info=True)
+
 
 class SQSClient(SQSClientInterface):
     """Real SQS client using boto3."""
@@ -34,10 +344,28 @@ class SQSClient(SQSClientInterface):
             self._queue_url = settings.sqs_queue_url
             self._mock_client = None
 
+        self.ack_buffer = SQSAckBuffer(
+            self,
+            flush_interval_seconds=settings.sqs_ack_flush_interval_seconds,
+            max_retries=settings.sqs_ack_max_retries,
+        )
+        self.visibility_tracker = SQSVisibilityTracker(
+            self,
+            visibility_timeout_seconds=settings.sqs_visibility_timeout_seconds,
+            heartbeat_seconds=settings.sqs_visibility_heartbeat_seconds,
+            max_extension_seconds=settings.sqs_visibility_max_extension_seconds,
+        )
+
     def receive_messages(
         self, max_messages: int = 10, wait_time_seconds: int = 5
     ) -> List[Dict[str, Any]]:
-        """Receive messages from SQS queue."""
+        """Receive messages from SQS queue and track them as in flight."""
+        messages = self._receive(max_messages, wait_time_seconds)
+        self.visibility_tracker.track([m["receipt_handle"] for m in messages])
+        return messages
+
+    def _receive(self, max_messages: int, wait_time_seconds: int) -> List[Dict[str, Any]]:
+        """Receive and parse messages; SQS errors propagate to the caller."""
         if self._mock_client:
             return self._mock_client.receive_messages(max_messages, wait_time_seconds)
 
@@ -49,27 +377,10 @@ class SQSClient(SQSClientInterface):
                 MessageAttributeNames=["All"],
             )
 
-            messages = response.get("Messages", [])
-            result = []
-            for msg in messages:
-                try:
-                    body = json.loads(msg["Body"])
-                    result.append(
-                        {
-                            "receipt_handle": msg["ReceiptHandle"],
-                            "message_id": msg["MessageId"],
-                            "body": body,
-                            "attributes": msg.get("MessageAttributes", {}),
-                        }
-                    )
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse message body: {msg.get('Body')}")
-                    continue
-
-            return result
+            return parse_sqs_messages(response.get("Messages", []))
         except ClientError as e:
             logger.error(f"Error receiving messages from SQS: {e}")
-            return []
+            raise
 
     def delete_message(self, receipt_handle: str) -> None:
         """Delete a message from the queue."""
@@ -83,6 +394,82 @@ class SQSClient(SQSClientInterface):
         except ClientError as e:
             logger.error(f"Error deleting message from SQS: {e}")
 
+    def delete_message_batch(
+        self, receipt_handles: List[str]
+    ) -> Tuple[List[str], List[str]]:
+        """Delete up to 10 messages with one DeleteMessageBatch call.
+
+        Returns the handles worth retrying and the handles rejected as the
+        sender's fault (e.g. an expired receipt handle), which never will be.
+        """
+        if self._mock_client:
+            return self._mock_client.delete_message_batch(receipt_handles)
+
+        entries = [
+            {"Id": str(i), "ReceiptHandle": handle}
+            for i, handle in enumerate(receipt_handles[:MAX_BATCH_ENTRIES])
+        ]
+        try:
+            response = self._client.delete_message_batch(
+                QueueUrl=self._queue_url, Entries=entries
+            )
+        except ClientError as e:
+            logger.error(f"Error batch deleting messages from SQS: {e}")
+            return list(receipt_handles), []
+
+        return batch_failures(response, receipt_handles)
+
+    def change_message_visibility_batch(
+        self, receipt_handles: List[str], visibility_timeout: int
+    ) -> List[str]:
+        """Change visibility of up to 10 messages with one call."""
+        if self._mock_client:
+            return self._mock_client.change_message_visibility_batch(
+                receipt_handles, visibility_timeout
+            )
+
+        entries = [
+            {"Id": str(i), "ReceiptHandle": handle, "VisibilityTimeout": visibility_timeout}
+            for i, handle in enumerate(receipt_handles[:MAX_BATCH_ENTRIES])
+        ]
+        try:
+            response = self._client.change_message_visibility_batch(
+                QueueUrl=self._queue_url, Entries=entries
+            )
+        except ClientError as e:
+            logger.error(f"Error changing SQS message visibility: {e}")
+            return list(receipt_handles)
+
+        return [receipt_handles[int(entry["Id"])] for entry in response.get("Failed", [])]
+
+    def get_queue_depth(self) -> Optional[int]:
+        """Return the approximate number of visible messages in the queue."""
+        if self._mock_client:
+            return self._mock_client.get_queue_depth()
+
+        try:
+            response = self._client.get_queue_attributes(
+                QueueUrl=self._queue_url,
+                AttributeNames=["ApproximateNumberOfMessages"],
+            )
+            return int(response["Attributes"].get("ApproximateNumberOfMessages", 0))
+        except (ClientError, KeyError, ValueError) as e:
+            logger.error(f"Error reading SQS queue depth: {e}")
+            return None
+
+    def acknowledge(self, receipt_handle: str) -> None:
+        """Queue a processed message for batched deletion."""
+        self.visibility_tracker.untrack(receipt_handle)
+        self.ack_buffer.add(receipt_handle)
+
+    def release(self, receipt_handles: List[str]) -> None:
+        """Return messages to the queue for immediate retry."""
+        self.visibility_tracker.release(receipt_handles)
+
+    def flush_acks(self) -> None:
+        """Delete all buffered acknowledgements now."""
+        self.ack_buffer.flush()
+
     def send_message(
         self, message_body: str, message_attributes: Optional[Dict] = None
     ) -> None:
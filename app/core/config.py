@@ -1,6 +1,7 @@
 """Application configuration using Pydantic Settings."""
-from typing import Optional
+from typing import List, Optional
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -36,18 +37,96 @@ class Settings(BaseSettings):
 
     # Slack
     slack_webhook_url: Optional[str] = None
+    slack_digest_max_alerts: int = 20  # alerts coalesced into one message (max 48)
+    slack_max_retries: int = 5  # per message; rate limits wait for Retry-After
+    slack_retry_base_seconds: float = 1.0  # exponential backoff base for failed posts
+    slack_timeout_seconds: float = 10.0  # per webhook request
 
     # Worker Configuration
     sqs_poll_interval_seconds: int = 5
     max_messages_per_poll: int = 10
     worker_enabled: bool = True
 
+    # SQS consumer engine
+    sqs_receiver_count: int = 2  # concurrent long-polling receivers (max when adaptive)
+    sqs_processor_count: int = 4  # threads processing buffered messages
+    sqs_buffer_size: int = 200  # bounded in-process message buffer
+    sqs_wait_time_seconds: int = 20  # SQS long-poll WaitTimeSeconds (max 20)
+    sqs_shutdown_timeout_seconds: float = 30.0
+    sqs_ack_flush_interval_seconds: float = 1.0  # max wait before batch delete
+    sqs_ack_max_retries: int = 3  # retries for failed DeleteMessageBatch entries
+    sqs_visibility_timeout_seconds: int = 60  # timeout applied on each heartbeat
+    sqs_visibility_heartbeat_seconds: float = 20.0  # how often in-flight messages are extended
+    sqs_visibility_max_extension_seconds: float = 900.0  # stop extending after this long
+    sqs_adaptive_polling_enabled: bool = True  # scale receivers with queue depth
+    sqs_min_receivers: int = 1
+    sqs_backlog_per_receiver: int = 100  # visible messages per active receiver
+    sqs_depth_check_seconds: float = 15.0
+    sqs_async_pipeline_enabled: bool = False  # run ingestion on the FastAPI event loop
+
+    # Payload encoding
+    json_codec: str = "auto"  # auto, orjson, msgspec or json
+    store_raw_sqs_body: bool = True  # keep SQS body verbatim instead of re-encoding
+
+    # Bulk writes
+    bulk_copy_min_rows: int = 1000  # batches at least this large use COPY; 0 disables
+
+    # Message deduplication
+    dedup_cache_size: int = 100_000  # recently committed message ids kept in memory
+    dedup_cache_ttl_seconds: float = 3600.0
+
+    # Aggregation
+    aggregation_watermark_lag_seconds: int = 60  # skip rows newer than this (open transactions)
+    aggregation_dimensions: str = "ad_group,keyword,asin,profile"  # comma-separated, empty to disable
+    aggregate_metric_mode: str = "weighted"  # weighted (ratio of sums) or mean_of_ratios
+    streaming_rollup_enabled: bool = False  # maintain hourly and daily aggregates at ingest time
+    streaming_rollup_flush_seconds: float = 10.0  # keep below the watermark lag
+
+    # Partitioning and retention
+    partition_premake_days: int = 7  # create partitions this far ahead of today
+    performance_data_retention_days: int = 0  # drop older partitions; 0 keeps everything
+    stream_message_retention_days: int = 0  # drop older partitions; 0 keeps everything
+
+    # Raw message archive
+    raw_archive_enabled: bool = False
+    raw_archive_after_days: int = 7  # archive processed raw payloads older than this
+    raw_archive_uri: str = "./data/raw_archive"  # local directory or s3://bucket/prefix
+    raw_archive_compression: str = "gzip"  # gzip or zstd (requires zstandard)
+    raw_archive_batch_size: int = 5000  # messages moved per transaction
+
+    # Alert evaluation
+    alert_baseline_cache_enabled: bool = False  # CTR/spend baselines from memory; one ingest process only
+    alert_rules_path: Optional[str] = None  # JSON rules file with per-profile/campaign overrides
+    alert_cooldown_minutes: int = 360  # suppress repeats per campaign and type unless escalating; 0 disables
+    alert_suppression_refresh_seconds: int = 300  # reload the suppression index from unacknowledged alerts
+    alert_dispatch_interval_seconds: float = 2.0  # how often unsent alerts are delivered
+    alert_dispatch_batch_size: int = 100  # alerts claimed per delivery round
+    alert_dispatch_lease_seconds: int = 300  # renewed per post; must outlast slack_max_post_seconds
+    alert_delivery_max_age_minutes: int = 1440  # older unsent alerts are not delivered
+
     # Alert Thresholds
     alert_ctr_drop_threshold: float = 0.2  # 20% drop
     alert_spend_spike_threshold: float = 1.5  # 50% increase
     alert_acos_threshold: float = 0.3  # 30% ACOS
     alert_roas_threshold: float = 2.0  # Minimum ROAS
 
+    @model_validator(mode="after")
+    def check_alert_dispatch_lease(self) -> "Settings":
+        """Reject leases that can expire while one Slack post is still retrying."""
+        if self.alert_dispatch_lease_seconds <= self.slack_max_post_seconds:
+            raise ValueError(
+                f"alert_dispatch_lease_seconds must exceed {self.slack_max_post_seconds:.0f}s, "
+                "the longest one Slack post can take with retries"
+            )
+        return self
+
+    @property
+    def slack_max_post_seconds(self) -> float:
+        """Worst-case duration of one Slack post, including retries and waits."""
+        attempts = self.slack_max_retries + 1
+        max_delay = self.slack_retry_base_seconds * 2**self.slack_max_retries
+        return attempts * self.slack_timeout_seconds + self.slack_max_retries * max_delay
+
     @property
     def has_aws_credentials(self) -> bool:
         """Check if AWS credentials are configured."""
@@ -58,6 +137,11 @@ class Settings(BaseSettings):
         """Check if SQS queue URL is configured."""
         return bool(self.sqs_queue_url)
 
+    @property
+    def enabled_aggregation_dimensions(self) -> List[str]:
+        """Rollup dimensions aggregated alongside campaigns."""
+        return [d.strip() for d in self.aggregation_dimensions.split(",") if d.strip()]
+
     @property
     def has_slack_webhook(self) -> bool:
         """Check if Slack webhook is configured."""
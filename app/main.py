@@ -6,6 +6,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.routes import health, metrics
+from app.workers.alert_dispatcher import AlertDispatcher
+from app.workers.async_pipeline import AsyncSQSPipeline
 from app.workers.scheduler import start_scheduler, stop_scheduler
 
 
@@ -13,10 +15,21 @@ from app.workers.scheduler import start_scheduler, stop_scheduler
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
+    pipeline = None
+    dispatcher = None
     if settings.worker_enabled:
         start_scheduler()
+        if settings.sqs_async_pipeline_enabled:
+            pipeline = AsyncSQSPipeline()
+            await pipeline.start()
+        dispatcher = AlertDispatcher()
+        await dispatcher.start()
     yield
     # Shutdown
+    if pipeline:
+        await pipeline.stop()
+    if dispatcher:
+        await dispatcher.stop()
     if settings.worker_enabled:
         stop_scheduler()
 
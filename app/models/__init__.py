@@ -1,8 +1,11 @@
 """Database models."""
 from app.models.stream_data import (
     StreamMessage,
+    StreamMessageKey,
     PerformanceData,
     PerformanceAggregate,
+    DimensionAggregate,
+    AggregationWatermark,
     Alert,
     StreamDatasetType,
     BudgetUsageEvent,
@@ -10,8 +13,11 @@ from app.models.stream_data import (
 
 __all__ = [
     "StreamMessage",
+    "StreamMessageKey",
     "PerformanceData",
     "PerformanceAggregate",
+    "DimensionAggregate",
+    "AggregationWatermark",
     "Alert",
     "StreamDatasetType",
     "BudgetUsageEvent",
@@ -9,7 +9,6 @@ from sqlalchemy import (
     Column,
     DateTime,
     Enum,
-    ForeignKey,
     Index,
     Integer,
     Numeric,
@@ -30,33 +29,58 @@ class StreamDatasetType(str, PyEnum):
 
 
 class StreamMessage(Base):
-    """Raw stream message from Amazon Marketing Stream."""
+    """Raw stream message from Amazon Marketing Stream.
+
+    Range-partitioned by day on ``created_at``; ``message_id`` uniqueness is
+    enforced by ``StreamMessageKey`` since a partitioned unique index would
+    have to include the partition key.
+    """
 
     __tablename__ = "stream_messages"
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    message_id = Column(String(255), unique=True, nullable=False, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
+    message_id = Column(String(255), nullable=False, index=True)
     dataset_type = Column(Enum(StreamDatasetType), nullable=False, index=True)
     dataset_name = Column(String(255), nullable=True, index=True)
     profile_id = Column(String(255), nullable=False, index=True)
-    raw_data = Column(Text, nullable=False)  # JSON string
+    raw_data = Column(Text, nullable=True)  # JSON string; NULL once archived
+    raw_data_uri = Column(String(1024), nullable=True)  # archive file holding raw_data
     processed = Column(Boolean, default=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(
+        DateTime, default=datetime.utcnow, primary_key=True, nullable=False, index=True
+    )
     processed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=True)
 
     # Relationships
-    performance_data = relationship("PerformanceData", back_populates="stream_message")
+    performance_data = relationship(
+        "PerformanceData",
+        primaryjoin="StreamMessage.id == foreign(PerformanceData.stream_message_id)",
+        back_populates="stream_message",
+    )
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+
+class StreamMessageKey(Base):
+    """Message ids of stored stream messages, the authoritative dedup guard."""
+
+    __tablename__ = "stream_message_keys"
+
+    message_id = Column(String(255), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
 
 class PerformanceData(Base):
-    """Processed performance metrics from stream messages."""
+    """Processed performance metrics from stream messages.
+
+    Range-partitioned by month on ``start_date``.
+    """
 
     __tablename__ = "performance_data"
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    stream_message_id = Column(
-        BigInteger, ForeignKey("stream_messages.id"), nullable=False, index=True
-    )
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
+    stream_message_id = Column(BigInteger, nullable=False, index=True)
     dataset_type = Column(Enum(StreamDatasetType), nullable=False, index=True)
     dataset_name = Column(String(255), nullable=True, index=True)
     profile_id = Column(String(255), nullable=False, index=True)
@@ -84,36 +108,43 @@ class PerformanceData(Base):
     conversion_rate = Column(Numeric(5, 4), nullable=True)
 
     # Time period
-    start_date = Column(DateTime, nullable=False, index=True)
+    start_date = Column(DateTime, primary_key=True, nullable=False, index=True)
     end_date = Column(DateTime, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    # Relationships
-    stream_message = relationship("StreamMessage", back_populates="performance_data")
-    aggregates = relationship("PerformanceAggregate", back_populates="performance_data")
+    # Relationships (partitioned tables carry no foreign keys)
+    stream_message = relationship(
+        "StreamMessage",
+        primaryjoin="foreign(PerformanceData.stream_message_id) == StreamMessage.id",
+        back_populates="performance_data",
+    )
+    aggregates = relationship(
+        "PerformanceAggregate",
+        primaryjoin="PerformanceData.id == foreign(PerformanceAggregate.performance_data_id)",
+        back_populates="performance_data",
+    )
 
     # Indexes for common queries
     __table_args__ = (
         Index("idx_performance_campaign_date", "campaign_id", "start_date"),
         Index("idx_performance_profile_date", "profile_id", "start_date"),
+        {"postgresql_partition_by": "RANGE (start_date)"},
     )
 
 
 class PerformanceAggregate(Base):
-    """Hourly and daily aggregated performance metrics."""
+    """Hourly, daily, weekly and monthly aggregated performance metrics."""
 
     __tablename__ = "performance_aggregates"
 
     id = Column(BigInteger, primary_key=True, index=True)
-    performance_data_id = Column(
-        BigInteger, ForeignKey("performance_data.id"), nullable=False, index=True
-    )
+    performance_data_id = Column(BigInteger, nullable=False, index=True)  # first row rolled up
     dataset_type = Column(Enum(StreamDatasetType), nullable=False, index=True)
     profile_id = Column(String(255), nullable=False, index=True)
     campaign_id = Column(String(255), nullable=False, index=True)
 
     # Aggregation period
-    period_type = Column(String(20), nullable=False, index=True)  # 'hourly' or 'daily'
+    period_type = Column(String(20), nullable=False, index=True)  # hourly, daily, weekly, monthly
     period_start = Column(DateTime, nullable=False, index=True)
     period_end = Column(DateTime, nullable=False)
 
@@ -132,10 +163,17 @@ class PerformanceAggregate(Base):
     avg_roas = Column(Numeric(10, 4), nullable=True)
     avg_conversion_rate = Column(Numeric(5, 4), nullable=True)
 
+    # Number of performance_data rows rolled into this bucket
+    record_count = Column(Integer, default=0, nullable=False)
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    performance_data = relationship("PerformanceData", back_populates="aggregates")
+    performance_data = relationship(
+        "PerformanceData",
+        primaryjoin="foreign(PerformanceAggregate.performance_data_id) == PerformanceData.id",
+        back_populates="aggregates",
+    )
 
     # Unique constraint to prevent duplicate aggregates
     __table_args__ = (
@@ -149,6 +187,70 @@ class PerformanceAggregate(Base):
     )
 
 
+class DimensionAggregate(Base):
+    """Aggregated metrics per ad group, keyword, ASIN or profile."""
+
+    __tablename__ = "dimension_aggregates"
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    dimension = Column(String(20), nullable=False)  # ad_group, keyword, asin, profile
+    dimension_id = Column(String(255), nullable=False)
+    dataset_type = Column(Enum(StreamDatasetType), nullable=False)
+    profile_id = Column(String(255), nullable=False, index=True)
+    campaign_id = Column(String(255), nullable=True, index=True)  # ad_group/keyword only
+
+    # Aggregation period
+    period_type = Column(String(20), nullable=False)  # hourly, daily, weekly, monthly
+    period_start = Column(DateTime, nullable=False)
+    period_end = Column(DateTime, nullable=False)
+
+    # Aggregated metrics
+    total_impressions = Column(Integer, default=0)
+    total_clicks = Column(Integer, default=0)
+    total_cost = Column(Numeric(10, 2), default=Decimal("0.00"))
+    total_sales = Column(Numeric(10, 2), default=Decimal("0.00"))
+    total_orders = Column(Integer, default=0)
+    total_units_sold = Column(Integer, default=0)
+    record_count = Column(Integer, default=0, nullable=False)
+
+    # Aggregated calculated metrics
+    avg_ctr = Column(Numeric(5, 4), nullable=True)
+    avg_cpc = Column(Numeric(10, 4), nullable=True)
+    avg_acos = Column(Numeric(5, 4), nullable=True)
+    avg_roas = Column(Numeric(10, 4), nullable=True)
+    avg_conversion_rate = Column(Numeric(5, 4), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_dimension_aggregate_unique",
+            "dimension",
+            "dimension_id",
+            "dataset_type",
+            "period_type",
+            "period_start",
+            unique=True,
+        ),
+        Index(
+            "idx_dimension_aggregate_period",
+            "dimension",
+            "period_type",
+            "period_start",
+        ),
+    )
+
+
+class AggregationWatermark(Base):
+    """Highest performance_data id already rolled up, per period type."""
+
+    __tablename__ = "aggregation_watermarks"
+
+    period_type = Column(String(20), primary_key=True)
+    last_performance_data_id = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class Alert(Base):
     """Alert records for performance threshold breaches."""
 
@@ -170,6 +272,8 @@ class Alert(Base):
     # Status
     sent = Column(Boolean, default=False, index=True)
     sent_at = Column(DateTime, nullable=True)
+    claimed_until = Column(DateTime, nullable=True)  # dispatcher lease
+    delivery_failed_at = Column(DateTime, nullable=True)  # Slack rejected the alert
     acknowledged = Column(Boolean, default=False, index=True)
     acknowledged_at = Column(DateTime, nullable=True)
 
@@ -182,9 +286,7 @@ class BudgetUsageEvent(Base):
     __tablename__ = "budget_usage_events"
 
     id = Column(BigInteger, primary_key=True, index=True)
-    stream_message_id = Column(
-        BigInteger, ForeignKey("stream_messages.id"), nullable=False, index=True
-    )
+    stream_message_id = Column(BigInteger, nullable=False, index=True)
     dataset_type = Column(Enum(StreamDatasetType), nullable=False, index=True)
     dataset_name = Column(String(255), nullable=True, index=True)
     profile_id = Column(String(255), nullable=False, index=True)
@@ -200,5 +302,8 @@ class BudgetUsageEvent(Base):
     details = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    stream_message = relationship("StreamMessage")
+    stream_message = relationship(
+        "StreamMessage",
+        primaryjoin="foreign(BudgetUsageEvent.stream_message_id) == StreamMessage.id",
+    )
 
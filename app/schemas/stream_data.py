@@ -102,6 +102,31 @@ class PerformanceAggregateResponse(BaseModel):
         from_attributes = True
 
 
+class DimensionAggregateResponse(BaseModel):
+    """Schema for ad group, keyword, ASIN or profile aggregate response."""
+
+    id: int
+    dimension: str
+    dimension_id: str
+    dataset_type: str
+    profile_id: str
+    campaign_id: Optional[str]
+    period_type: str
+    period_start: datetime
+    period_end: datetime
+    total_impressions: int
+    total_clicks: int
+    total_cost: Decimal
+    total_sales: Decimal
+    total_orders: int
+    avg_ctr: Optional[Decimal]
+    avg_acos: Optional[Decimal]
+    avg_roas: Optional[Decimal]
+
+    class Config:
+        from_attributes = True
+
+
 class AlertCreate(BaseModel):
     """Schema for creating an alert."""
 
@@ -0,0 +1,271 @@
+"""Typed records decoded from Amazon Marketing Stream payloads.
+
+The Pydantic models in ``stream_data`` describe API responses; these
+slotted dataclasses are the internal ingest representation. Each dataset
+maps to a decoder that resolves field aliases through a compiled
+``FieldExtractor`` plan and validates numeric fields once, so the rest of
+the pipeline works with compact typed records instead of nested dicts.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Optional, Union
+
+from app.utils import json_codec
+from app.utils.field_extractor import FieldExtractor
+
+
+class RecordDecodeError(ValueError):
+    """Raised when a payload field fails validation."""
+
+
+@dataclass(slots=True)
+class StreamEnvelope:
+    """Message-level metadata shared by every dataset."""
+
+    message_id: Optional[str]
+    dataset_id: Optional[str]
+    profile_id: Optional[str]
+
+
+@dataclass(slots=True)
+class PerformanceRecord:
+    """Traffic/conversion metrics for one campaign entity and time window."""
+
+    campaign_id: str
+    campaign_name: Optional[str]
+    ad_group_id: Optional[str]
+    ad_group_name: Optional[str]
+    keyword_id: Optional[str]
+    keyword_text: Optional[str]
+    asin: Optional[str]
+    impressions: int
+    clicks: int
+    cost: Decimal
+    sales: Decimal
+    orders: int
+    units_sold: int
+    start_date: datetime
+    end_date: datetime
+
+
+@dataclass(slots=True)
+class BudgetUsageRecord:
+    """Budget consumption snapshot."""
+
+    campaign_id: Optional[str]
+    budget_type: Optional[str]
+    budget_name: Optional[str]
+    budget_status: Optional[str]
+    currency: Optional[str]
+    daily_budget: Decimal
+    budget_consumed: Decimal
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    details: str
+
+
+StreamRecord = Union[PerformanceRecord, BudgetUsageRecord]
+
+# Canonical field -> aliases in priority order. Tuples are nested key paths.
+ENVELOPE_FIELDS = FieldExtractor(
+    {
+        "message_id": ("messageId", "id", "idempotency_id", "idempotencyId"),
+        "dataset_id": ("datasetType", "dataset_type", "dataset_id"),
+        "profile_id": ("profileId", "profile_id", "advertiser_id"),
+    }
+)
+
+PERFORMANCE_FIELDS = FieldExtractor(
+    {
+        "campaign_id": ("campaignId", "campaign_id", ("campaign", "id")),
+        "campaign_name": ("campaignName", "campaign_name", ("campaign", "name")),
+        "impressions": ("impressions",),
+        "clicks": ("clicks",),
+        "cost": ("cost", "spend", "ad_cost"),
+        "sales": ("sales", "revenue", "attributed_sales_1d", "attributed_sales_7d"),
+        "orders": ("orders", "conversions", "attributed_conversions_1d"),
+        "units_sold": ("unitsSold", "units_sold", "attributed_units_ordered_1d"),
+        "start_date": (
+            "time_window_start",
+            "startDate",
+            "start_date",
+            "date",
+            ("period", "start"),
+        ),
+        "end_date": ("time_window_end", "endDate", "end_date", ("period", "end")),
+        "ad_group_id": ("adGroupId", "ad_group_id", ("ad_group", "id")),
+        "ad_group_name": ("adGroupName", "ad_group_name", ("ad_group", "name")),
+        "keyword_id": ("keywordId", "keyword_id"),
+        "keyword_text": ("keywordText", "keyword_text", "search_term"),
+        "asin": ("asin", "ASIN", ("product", "asin")),
+    }
+)
+
+BUDGET_FIELDS = FieldExtractor(
+    {
+        "campaign_id": ("campaignId", "campaign_id", ("campaign", "id")),
+        "budget_type": ("budgetType", "budget_type"),
+        "budget_name": ("budgetName", "budget_name"),
+        "budget_status": ("budgetStatus", "budget_status", "status"),
+        "currency": ("currency", "currencyCode", "currency_code"),
+        "daily_budget": (
+            "dailyBudget",
+            "budget",
+            "budgetLimit",
+            "budget_limit",
+            "maxBudget",
+            "max_budget",
+        ),
+        "budget_consumed": (
+            "budgetConsumed",
+            "budget_consumed",
+            "amountSpent",
+            "amount_spent",
+            "spend",
+        ),
+        "start_date": ("time_window_start", "startDate", "start_date", "date"),
+        "end_date": ("time_window_end", "endDate", "end_date"),
+    }
+)
+
+
+def decode_envelope(message_body: Dict[str, Any]) -> StreamEnvelope:
+    """Decode message-level metadata."""
+    fields = ENVELOPE_FIELDS.extract(message_body)
+    return StreamEnvelope(
+        message_id=fields["message_id"],
+        dataset_id=fields["dataset_id"],
+        profile_id=fields["profile_id"],
+    )
+
+
+def decode_performance(
+    data: Dict[str, Any], dataset_name: Optional[str]
+) -> Optional[PerformanceRecord]:
+    """Decode an sp/sb/sd traffic or conversion payload.
+
+    Returns None when the payload has no campaign id.
+    """
+    fields = PERFORMANCE_FIELDS.extract(data, dataset_name)
+
+    campaign_id = fields["campaign_id"]
+    if not campaign_id:
+        return None
+
+    # Parse dates (assuming ISO format)
+    try:
+        start_date = (
+            _fromisoformat(fields["start_date"])
+            if fields["start_date"]
+            else datetime.utcnow()
+        )
+        end_date = (
+            _fromisoformat(fields["end_date"]) if fields["end_date"] else datetime.utcnow()
+        )
+    except (ValueError, AttributeError):
+        start_date = datetime.utcnow()
+        end_date = datetime.utcnow()
+
+    return PerformanceRecord(
+        campaign_id=str(campaign_id),
+        campaign_name=fields["campaign_name"],
+        ad_group_id=fields["ad_group_id"],
+        ad_group_name=fields["ad_group_name"],
+        keyword_id=fields["keyword_id"],
+        keyword_text=fields["keyword_text"],
+        asin=fields["asin"],
+        impressions=_as_int(fields["impressions"], "impressions"),
+        clicks=_as_int(fields["clicks"], "clicks"),
+        cost=_as_decimal(fields["cost"], "cost"),
+        sales=_as_decimal(fields["sales"], "sales"),
+        orders=_as_int(fields["orders"], "orders"),
+        units_sold=_as_int(fields["units_sold"], "units_sold"),
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+def decode_budget_usage(
+    data: Dict[str, Any], dataset_name: Optional[str]
+) -> BudgetUsageRecord:
+    """Decode a budget-usage payload."""
+    fields = BUDGET_FIELDS.extract(data, dataset_name)
+    campaign_id = fields["campaign_id"]
+
+    return BudgetUsageRecord(
+        campaign_id=str(campaign_id) if campaign_id else None,
+        budget_type=fields["budget_type"],
+        budget_name=fields["budget_name"],
+        budget_status=fields["budget_status"],
+        currency=fields["currency"],
+        daily_budget=_as_decimal(fields["daily_budget"], "daily_budget"),
+        budget_consumed=_as_decimal(fields["budget_consumed"], "budget_consumed"),
+        start_date=parse_datetime(fields["start_date"]),
+        end_date=parse_datetime(fields["end_date"]),
+        details=json_codec.dumps(data),
+    )
+
+
+RecordDecoder = Callable[[Dict[str, Any], Optional[str]], Optional[StreamRecord]]
+
+# Known Marketing Stream datasets; unknown names fall back on the budget check
+DATASET_DECODERS: Dict[str, RecordDecoder] = {
+    "sp-traffic": decode_performance,
+    "sp-conversion": decode_performance,
+    "sb-traffic": decode_performance,
+    "sb-conversion": decode_performance,
+    "sd-traffic": decode_performance,
+    "sd-conversion": decode_performance,
+    "budget-usage": decode_budget_usage,
+    "sp-budget-usage": decode_budget_usage,
+    "sb-budget-usage": decode_budget_usage,
+    "sd-budget-usage": decode_budget_usage,
+}
+
+
+def decoder_for(dataset_name: Optional[str]) -> RecordDecoder:
+    """Return the decoder for a normalized dataset name."""
+    decoder = DATASET_DECODERS.get(dataset_name or "")
+    if decoder:
+        return decoder
+    if dataset_name and "budget" in dataset_name:
+        return decode_budget_usage
+    return decode_performance
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse ISO datetime strings safely."""
+    if not value:
+        return None
+    try:
+        return _fromisoformat(value)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _fromisoformat(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _as_int(value: Any, field: str) -> int:
+    """Validate an integer metric; missing values count as 0."""
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordDecodeError(f"Invalid {field}: {value!r}") from None
+
+
+def _as_decimal(value: Any, field: str) -> Decimal:
+    """Validate a monetary metric; missing values count as 0."""
+    if not value:
+        return Decimal("0")
+    try:
+        result = Decimal(str(value))
+    except InvalidOperation:
+        raise RecordDecodeError(f"Invalid {field}: {value!r}") from None
+    if not result.is_finite():
+        raise RecordDecodeError(f"Invalid {field}: {value!r}")
+    return result
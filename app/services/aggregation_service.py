@@ -1,237 +1,634 @@
 """Service for aggregating performance data."""
 import logging
 from datetime import datetime, timedelta
-from decimal import Decimal
-from typing import List
-
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
-from app.models.stream_data import PerformanceData, PerformanceAggregate, StreamDatasetType
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Numeric,
+    case,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models.stream_data import (
+    AggregationWatermark,
+    DimensionAggregate,
+    PerformanceData,
+    PerformanceAggregate,
+)
 
 logger = logging.getLogger(__name__)
 
+# period_type -> (date_trunc unit, bucket length as a SQL interval)
+PERIODS: Dict[str, Tuple[str, str]] = {
+    "hourly": ("hour", "1 hour"),
+    "daily": ("day", "1 day"),
+    "weekly": ("week", "1 week"),
+    "monthly": ("month", "1 month"),
+}
+
+# Grains rolled up straight from performance_data. A record only counts in a
+# bucket it ends inside of, so days are not sums of hours: records spanning
+# more than one hour still count in their day.
+RAW_PERIODS: Tuple[str, ...] = ("hourly", "daily")
+
+# (period_type, source period_type) rolled up from finer aggregates. Weeks do
+# not nest in months, so both come from days.
+DERIVED_PERIODS: Tuple[Tuple[str, str], ...] = (
+    ("weekly", "daily"),
+    ("monthly", "daily"),
+)
+
+# Rollup dimension -> (performance_data column, whether it belongs to one campaign)
+DIMENSIONS: Dict[str, Tuple[str, bool]] = {
+    "ad_group": ("ad_group_id", True),
+    "keyword": ("keyword_id", True),
+    "asin": ("asin", False),
+    "profile": ("profile_id", False),
+}
+
+_TOTAL_COLUMNS = (
+    "total_impressions",
+    "total_clicks",
+    "total_cost",
+    "total_sales",
+    "total_orders",
+    "total_units_sold",
+    "record_count",
+)
+# Aggregate ratio column -> (numerator total, denominator total)
+_RATIO_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "avg_ctr": ("total_clicks", "total_impressions"),
+    "avg_cpc": ("total_cost", "total_clicks"),
+    "avg_acos": ("total_cost", "total_sales"),
+    "avg_roas": ("total_sales", "total_cost"),
+    "avg_conversion_rate": ("total_orders", "total_clicks"),
+}
+_INSERT_COLUMNS = (
+    "performance_data_id",
+    "dataset_type",
+    "profile_id",
+    "campaign_id",
+    "period_type",
+    "period_start",
+    "period_end",
+    *_TOTAL_COLUMNS,
+    *_RATIO_COLUMNS,
+)
+_DIMENSION_INSERT_COLUMNS = (
+    "dimension",
+    "dimension_id",
+    "dataset_type",
+    "profile_id",
+    "campaign_id",
+    "period_type",
+    "period_start",
+    "period_end",
+    *_TOTAL_COLUMNS,
+    *_RATIO_COLUMNS,
+)
+_CAMPAIGN_KEY = ("campaign_id", "period_type", "period_start")
+_DIMENSION_KEY = ("dimension", "dimension_id", "dataset_type", "period_type", "period_start")
+
+
+def ratio_of_sums(numerator: Any, denominator: Any) -> Any:
+    """SQL ratio rounded like MetricsCalculator; NULL when the denominator is 0."""
+    return func.round(cast(numerator, Numeric) / func.nullif(denominator, 0), 4)
+
+
+def bucket_bounds(period_type: str, timestamp: Any) -> Tuple[Any, Any]:
+    """SQL start and end of the ``period_type`` bucket containing ``timestamp``."""
+    trunc_unit, length = PERIODS[period_type]
+    start = func.date_trunc(trunc_unit, timestamp)
+    return start, start + literal_column(f"INTERVAL '{length}'")
+
 
 class AggregationService:
-    """Service for aggregating performance metrics."""
+    """Service for aggregating performance metrics.
+
+    Hourly and daily buckets are rolled up from ``performance_data``; weekly
+    and monthly buckets are rolled up from daily ones, so the coarser grains
+    only rescan a few dozen aggregate rows. Records spanning more than one
+    day are left out of every grain, as in the original daily rollup.
+    Campaign rollups go to ``performance_aggregates``; the same runs fill
+    ``dimension_aggregates`` for each configured dimension.
+    """
 
     def __init__(self, db: Session):
         """Initialize aggregation service."""
         self.db = db
 
-    def aggregate_hourly(self, hours: int = 24) -> List[PerformanceAggregate]:
-        """Aggregate performance data by hour."""
+    def aggregate_hourly(self, hours: int = 24) -> int:
+        """Recompute hourly aggregates, and the grains above, for the trailing window.
+
+        Returns the number of aggregate rows inserted or updated.
+        """
         end_time = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
         start_time = end_time - timedelta(hours=hours)
+        # Rows above the watermark are added to these buckets by the next
+        # incremental run, so counting them here would count them twice
+        max_id = self._lock_watermark().last_performance_data_id
+
+        window = (
+            PerformanceData.start_date >= start_time,
+            PerformanceData.end_date <= end_time,
+            PerformanceData.id <= max_id,
+        )
+        # The window covers its first and last days only partly
+        days = (
+            PerformanceData.start_date >= start_time.replace(hour=0),
+            PerformanceData.start_date < end_time.replace(hour=0) + timedelta(days=1),
+            PerformanceData.id <= max_id,
+        )
+        count = self._rollup_performance_data("hourly", window, additive=False)
+        count += self._rollup_performance_data("daily", days, additive=False)
+        count += self._derive_all(
+            select(PerformanceData.campaign_id, PerformanceData.start_date).where(*days)
+        )
+        count += self._rollup_dimensions({"hourly": window, "daily": days}, additive=False)
+        self.db.commit()
+        logger.info(f"Upserted {count} aggregates for the last {hours} hours")
+        return count
 
-        # Get all campaigns with data in the period
-        campaigns = (
-            self.db.query(
-                PerformanceData.campaign_id,
-                PerformanceData.dataset_type,
-                PerformanceData.profile_id,
-            )
-            .filter(
-                PerformanceData.start_date >= start_time,
-                PerformanceData.end_date <= end_time,
-            )
-            .distinct()
-            .all()
-        )
-
-        aggregates = []
-        for campaign_id, dataset_type, profile_id in campaigns:
-            # Aggregate for each hour
-            current_hour = start_time
-            while current_hour < end_time:
-                hour_end = current_hour + timedelta(hours=1)
-
-                # Get all performance data for this hour
-                performance_records = (
-                    self.db.query(PerformanceData)
-                    .filter(
-                        PerformanceData.campaign_id == campaign_id,
-                        PerformanceData.dataset_type == dataset_type,
-                        PerformanceData.start_date >= current_hour,
-                        PerformanceData.end_date < hour_end,
-                    )
-                    .all()
-                )
+    def aggregate_daily(self, days: int = 7) -> int:
+        """Recompute daily, weekly and monthly aggregates for the trailing window.
+
+        Like ``aggregate_hourly``, only rows up to the locked hourly watermark
+        are counted; newer rows are added by the next incremental run.
 
-                if performance_records:
-                    aggregate = self._create_aggregate(
-                        performance_records,
-                        "hourly",
-                        current_hour,
-                        hour_end,
-                        campaign_id,
-                        dataset_type,
-                        profile_id,
-                    )
-                    if aggregate:
-                        aggregates.append(aggregate)
-
-                current_hour = hour_end
-
-        if aggregates:
-            self.db.commit()
-            logger.info(f"Created {len(aggregates)} hourly aggregates")
-
-        return aggregates
-
-    def aggregate_daily(self, days: int = 7) -> List[PerformanceAggregate]:
-        """Aggregate performance data by day."""
+        Returns the number of aggregate rows inserted or updated.
+        """
         end_time = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         start_time = end_time - timedelta(days=days)
+        max_id = self._lock_watermark().last_performance_data_id
+
+        window = (
+            PerformanceData.start_date >= start_time,
+            PerformanceData.start_date < end_time,
+            PerformanceData.id <= max_id,
+        )
+        count = self._rollup_performance_data("daily", window, additive=False)
+        count += self._derive_all(
+            select(PerformanceData.campaign_id, PerformanceData.start_date).where(*window)
+        )
+        count += self._rollup_dimensions({"daily": window}, additive=False)
+        self.db.commit()
+        logger.info(f"Upserted {count} aggregates for the last {days} days")
+        return count
+
+    def aggregate_incremental(self) -> int:
+        """Fold performance rows added since the last run into their buckets.
+
+        Only rows with an id above the hourly watermark are scanned, so the
+        cost tracks new data rather than window size, and late-arriving rows
+        for old buckets are still counted. Totals are added to the existing
+        hourly and daily buckets and ratios are recomputed from the new
+        totals; the weekly and monthly buckets those rows fall in are then
+        recomputed from daily ones. The watermark row is locked and advanced
+        in the same transaction as the upserts.
+
+        The first run has no watermark to resume from, so it rebuilds every
+        bucket from scratch instead. When the streaming rollup store already
+        adds rows to buckets at ingest time, runs recompute the touched
+        hourly and daily buckets instead of adding to them.
+
+        Returns the number of aggregate rows inserted or updated.
+        """
+        watermark = self._lock_watermark()
+        last_id = watermark.last_performance_data_id
+
+        high_id = self._high_water_id(last_id)
+        if high_id is None:
+            self.db.rollback()
+            return 0
+
+        new_rows = (PerformanceData.id > last_id, PerformanceData.id <= high_id)
+        count = 0
+        for period_type in RAW_PERIODS:
+            if last_id and settings.streaming_rollup_enabled:
+                count += self._rollup_performance_data(
+                    period_type,
+                    (self._touched_buckets(period_type, new_rows),),
+                    additive=False,
+                )
+            elif last_id:
+                count += self._rollup_performance_data(period_type, new_rows, additive=True)
+            else:
+                count += self._rollup_performance_data(
+                    period_type, (PerformanceData.id <= high_id,), additive=False
+                )
+        count += self._derive_all(
+            select(PerformanceData.campaign_id, PerformanceData.start_date).where(*new_rows)
+        )
+        # The streaming store only feeds campaign buckets, so dimension
+        # buckets are always updated additively after the first run
+        dimension_rows = new_rows if last_id else (PerformanceData.id <= high_id,)
+        count += self._rollup_dimensions(
+            {period_type: dimension_rows for period_type in RAW_PERIODS},
+            additive=bool(last_id),
+        )
+
+        watermark.last_performance_data_id = high_id
+        watermark.updated_at = datetime.utcnow()
+        self.db.commit()
+        logger.info(
+            f"Upserted {count} aggregates "
+            f"(performance_data ids {last_id + 1}-{high_id})"
+        )
+        return count
+
+    def rebuild_range(self, start_time: datetime, end_time: datetime, max_id: int) -> int:
+        """Rebuild buckets for rows starting in [start_time, end_time) from scratch.
+
+        Used after performance rows in the range were replaced; the range
+        must start and end on day boundaries. Hourly and daily buckets in the
+        range are deleted first so buckets whose rows are gone do not linger.
+        Only rows with ids up to ``max_id`` (the hourly watermark) are
+        counted, so newer rows are still added exactly once by the next
+        incremental run. The caller commits.
+
+        Returns the number of aggregate rows inserted or updated.
+        """
+        for model in (PerformanceAggregate, DimensionAggregate):
+            self.db.execute(
+                delete(model).where(
+                    model.period_type.in_(RAW_PERIODS),
+                    model.period_start >= start_time,
+                    model.period_start < end_time,
+                )
+            )
+
+        in_range = (
+            PerformanceData.start_date >= start_time,
+            PerformanceData.start_date < end_time,
+        )
+        counted = (*in_range, PerformanceData.id <= max_id)
+        count = 0
+        for period_type in RAW_PERIODS:
+            count += self._rollup_performance_data(period_type, counted, additive=False)
+        count += self._derive_all(
+            select(PerformanceData.campaign_id, PerformanceData.start_date).where(*in_range)
+        )
+        count += self._rollup_dimensions(
+            {period_type: counted for period_type in RAW_PERIODS}, additive=False
+        )
+        logger.info(f"Rebuilt {count} aggregates for {start_time} to {end_time}")
+        return count
+
+    def add_to_buckets(self, rows: List[Dict[str, Any]]) -> int:
+        """Add precomputed bucket rows to their aggregates with one upsert.
+
+        ``rows`` hold PerformanceAggregate column values, including
+        ``record_count``; at most one row per (campaign_id, period_type,
+        period_start). The caller commits.
+        """
+        stmt = pg_insert(PerformanceAggregate).values(rows)
+        return self.db.execute(
+            self._on_conflict(stmt, _CAMPAIGN_KEY, additive=True)
+        ).rowcount
+
+    def _lock_watermark(self) -> AggregationWatermark:
+        """Lock the hourly watermark row, creating it on the first run.
+
+        The lock is held until the caller commits, so windowed recomputes and
+        incremental runs never interleave.
+        """
+        self.db.execute(
+            pg_insert(AggregationWatermark)
+            .values(period_type="hourly", last_performance_data_id=0)
+            .on_conflict_do_nothing(index_elements=[AggregationWatermark.period_type])
+        )
+        return self.db.scalars(
+            select(AggregationWatermark)
+            .where(AggregationWatermark.period_type == "hourly")
+            .with_for_update()
+        ).one()
+
+    def _high_water_id(self, last_id: int) -> Optional[int]:
+        """Return the highest id safe to roll up, or None if nothing is new.
+
+        Rows younger than the configured lag are left for the next run: ids
+        are assigned at insert time, so a lower id may still be uncommitted
+        while a higher one is already visible.
+        """
+        cutoff = datetime.utcnow() - timedelta(
+            seconds=settings.aggregation_watermark_lag_seconds
+        )
+        return self.db.scalar(
+            select(func.max(PerformanceData.id)).where(
+                PerformanceData.id > last_id,
+                PerformanceData.created_at <= cutoff,
+            )
+        )
 
-        # Get all campaigns with data in the period
-        campaigns = (
-            self.db.query(
+    def _touched_buckets(self, period_type: str, filters: Tuple[Any, ...]) -> Any:
+        """Filter matching every row in the buckets that ``filters`` rows fall in."""
+        period_start, _ = bucket_bounds(period_type, PerformanceData.start_date)
+        touched = select(PerformanceData.campaign_id, period_start).where(*filters).distinct()
+        return tuple_(PerformanceData.campaign_id, period_start).in_(touched)
+
+    def _rollup_performance_data(
+        self, period_type: str, filters: Tuple[Any, ...], additive: bool
+    ) -> int:
+        """Roll up matching rows with one INSERT ... SELECT ... GROUP BY statement.
+
+        Each record is bucketed by ``date_trunc`` on its start date and only
+        counted when it also ends inside that bucket. Rows are grouped on the
+        unique key (campaign_id, period_type, period_start) because an upsert
+        cannot touch the same target row twice; a campaign belongs to a
+        single profile and ad product, so dataset_type and profile_id are
+        carried along with MIN().
+
+        Ratios are weighted ratio-of-sums over the bucket's totals, or the
+        unweighted mean of per-record ratios when ``AGGREGATE_METRIC_MODE`` is
+        ``mean_of_ratios``. With ``additive`` the new totals are added to an
+        existing bucket, otherwise they replace it.
+        """
+        period_start, period_end = bucket_bounds(period_type, PerformanceData.start_date)
+
+        rollup = (
+            select(
+                func.min(PerformanceData.id),
+                func.min(PerformanceData.dataset_type),
+                func.min(PerformanceData.profile_id),
                 PerformanceData.campaign_id,
+                literal(period_type),
+                period_start,
+                period_end,
+                *self._performance_data_totals(),
+            )
+            .where(*filters, PerformanceData.end_date < period_end)
+            .group_by(PerformanceData.campaign_id, period_start)
+        )
+
+        stmt = pg_insert(PerformanceAggregate).from_select(list(_INSERT_COLUMNS), rollup)
+        return self.db.execute(self._on_conflict(stmt, _CAMPAIGN_KEY, additive)).rowcount
+
+    def _rollup_dimensions(
+        self, filters: Dict[str, Tuple[Any, ...]], additive: bool
+    ) -> int:
+        """Roll matching rows into raw-grain buckets, then the derived grains.
+
+        ``filters`` maps each grain in ``RAW_PERIODS`` to roll up to the
+        filters selecting its rows; it must include daily, which the derived
+        grains are recomputed from.
+        """
+        count = 0
+        for dimension in settings.enabled_aggregation_dimensions:
+            column, _ = DIMENSIONS[dimension]
+            key = getattr(PerformanceData, column)
+            for period_type, period_filters in filters.items():
+                count += self._rollup_dimension(
+                    dimension, period_type, period_filters, additive
+                )
+            count += self._derive_dimension_all(
+                dimension,
+                select(key, PerformanceData.start_date).where(
+                    *filters["daily"], key.isnot(None)
+                ),
+            )
+        return count
+
+    def _rollup_dimension(
+        self, dimension: str, period_type: str, filters: Tuple[Any, ...], additive: bool
+    ) -> int:
+        """Roll up matching rows per dimension value, like the campaign rollup.
+
+        Rows without a value for the dimension are skipped. Buckets are split
+        by dataset_type because ASINs and profiles span ad products.
+        """
+        column, per_campaign = DIMENSIONS[dimension]
+        key = getattr(PerformanceData, column)
+        period_start, period_end = bucket_bounds(period_type, PerformanceData.start_date)
+
+        rollup = (
+            select(
+                literal(dimension),
+                key,
                 PerformanceData.dataset_type,
-                PerformanceData.profile_id,
+                func.min(PerformanceData.profile_id),
+                func.min(PerformanceData.campaign_id) if per_campaign else null(),
+                literal(period_type),
+                period_start,
+                period_end,
+                *self._performance_data_totals(),
             )
-            .filter(
-                PerformanceData.start_date >= start_time,
-                PerformanceData.end_date <= end_time,
+            .where(*filters, key.isnot(None), PerformanceData.end_date < period_end)
+            .group_by(key, PerformanceData.dataset_type, period_start)
+        )
+
+        stmt = pg_insert(DimensionAggregate).from_select(
+            list(_DIMENSION_INSERT_COLUMNS), rollup
+        )
+        return self.db.execute(self._on_conflict(stmt, _DIMENSION_KEY, additive)).rowcount
+
+    def _derive_dimension_all(self, dimension: str, touched: Any) -> int:
+        """Recompute derived grains of one dimension for the touched buckets.
+
+        ``touched`` selects (dimension_id, timestamp) pairs whose data changed.
+        """
+        count = 0
+        for period_type, source_period in DERIVED_PERIODS:
+            count += self._derive_dimension(dimension, period_type, source_period, touched)
+        return count
+
+    def _derive_dimension(
+        self, dimension: str, period_type: str, source_period: str, touched: Any
+    ) -> int:
+        """Replace one dimension's ``period_type`` buckets from ``source_period`` rows."""
+        source = aliased(DimensionAggregate, name="source")
+        period_start, period_end = bucket_bounds(period_type, source.period_start)
+
+        touched = touched.subquery()
+        dimension_id, timestamp = touched.c
+        touched_start, _ = bucket_bounds(period_type, timestamp)
+        touched_buckets = select(dimension_id, touched_start).distinct()
+
+        rollup = (
+            select(
+                literal(dimension),
+                source.dimension_id,
+                source.dataset_type,
+                func.min(source.profile_id),
+                func.min(source.campaign_id),
+                literal(period_type),
+                period_start,
+                period_end,
+                *self._aggregate_totals(source),
             )
-            .distinct()
-            .all()
-        )
-
-        aggregates = []
-        for campaign_id, dataset_type, profile_id in campaigns:
-            # Aggregate for each day
-            current_day = start_time
-            while current_day < end_time:
-                day_end = current_day + timedelta(days=1)
-
-                # Get all performance data for this day
-                performance_records = (
-                    self.db.query(PerformanceData)
-                    .filter(
-                        PerformanceData.campaign_id == campaign_id,
-                        PerformanceData.dataset_type == dataset_type,
-                        PerformanceData.start_date >= current_day,
-                        PerformanceData.end_date < day_end,
-                    )
-                    .all()
-                )
+            .where(
+                source.dimension == dimension,
+                source.period_type == source_period,
+                tuple_(source.dimension_id, period_start).in_(touched_buckets),
+            )
+            .group_by(source.dimension_id, source.dataset_type, period_start)
+        )
 
-                if performance_records:
-                    aggregate = self._create_aggregate(
-                        performance_records,
-                        "daily",
-                        current_day,
-                        day_end,
-                        campaign_id,
-                        dataset_type,
-                        profile_id,
-                    )
-                    if aggregate:
-                        aggregates.append(aggregate)
-
-                current_day = day_end
-
-        if aggregates:
-            self.db.commit()
-            logger.info(f"Created {len(aggregates)} daily aggregates")
-
-        return aggregates
-
-    def _create_aggregate(
-        self,
-        performance_records: List[PerformanceData],
-        period_type: str,
-        period_start: datetime,
-        period_end: datetime,
-        campaign_id: str,
-        dataset_type: StreamDatasetType,
-        profile_id: str,
-    ) -> PerformanceAggregate:
-        """Create an aggregate record from performance records."""
-        # Check if aggregate already exists
-        existing = (
-            self.db.query(PerformanceAggregate)
-            .filter(
-                PerformanceAggregate.campaign_id == campaign_id,
-                PerformanceAggregate.period_type == period_type,
-                PerformanceAggregate.period_start == period_start,
+        stmt = pg_insert(DimensionAggregate).from_select(
+            list(_DIMENSION_INSERT_COLUMNS), rollup
+        )
+        return self.db.execute(
+            self._on_conflict(stmt, _DIMENSION_KEY, additive=False)
+        ).rowcount
+
+    @staticmethod
+    def _performance_data_totals() -> List[Any]:
+        """Total, record count and ratio columns summarizing performance_data rows.
+
+        Ratios are weighted ratio-of-sums over the totals, or the unweighted
+        mean of per-record ratios when ``AGGREGATE_METRIC_MODE`` is
+        ``mean_of_ratios``.
+        """
+        if settings.aggregate_metric_mode == "mean_of_ratios":
+            ratios = [
+                func.avg(getattr(PerformanceData, column[len("avg_"):]))
+                for column in _RATIO_COLUMNS
+            ]
+        else:
+            ratios = [
+                ratio_of_sums(
+                    func.sum(getattr(PerformanceData, numerator[len("total_"):])),
+                    func.sum(getattr(PerformanceData, denominator[len("total_"):])),
+                )
+                for numerator, denominator in _RATIO_COLUMNS.values()
+            ]
+        return [
+            func.sum(PerformanceData.impressions),
+            func.sum(PerformanceData.clicks),
+            func.sum(PerformanceData.cost),
+            func.sum(PerformanceData.sales),
+            func.sum(PerformanceData.orders),
+            func.sum(PerformanceData.units_sold),
+            func.count(),
+            *ratios,
+        ]
+
+    @staticmethod
+    def _aggregate_totals(source: Any) -> List[Any]:
+        """Total, record count and ratio columns summarizing finer aggregate rows."""
+        if settings.aggregate_metric_mode == "mean_of_ratios":
+            ratios = [
+                func.round(
+                    func.sum(getattr(source, column) * source.record_count)
+                    / func.nullif(
+                        func.sum(
+                            case(
+                                (getattr(source, column).isnot(None), source.record_count),
+                            )
+                        ),
+                        0,
+                    ),
+                    4,
+                )
+                for column in _RATIO_COLUMNS
+            ]
+        else:
+            ratios = [
+                ratio_of_sums(
+                    func.sum(getattr(source, numerator)),
+                    func.sum(getattr(source, denominator)),
+                )
+                for numerator, denominator in _RATIO_COLUMNS.values()
+            ]
+        return [*(func.sum(getattr(source, column)) for column in _TOTAL_COLUMNS), *ratios]
+
+    def _derive_all(self, touched: Any) -> int:
+        """Recompute every derived grain for the buckets ``touched`` falls in.
+
+        ``touched`` selects (campaign_id, timestamp) pairs whose data changed.
+        """
+        count = 0
+        for period_type, source_period in DERIVED_PERIODS:
+            count += self._derive(period_type, source_period, touched)
+        return count
+
+    def _derive(self, period_type: str, source_period: str, touched: Any) -> int:
+        """Replace ``period_type`` buckets with sums of their ``source_period`` rows."""
+        source = aliased(PerformanceAggregate, name="source")
+        period_start, period_end = bucket_bounds(period_type, source.period_start)
+
+        touched = touched.subquery()
+        campaign_id, timestamp = touched.c
+        touched_start, _ = bucket_bounds(period_type, timestamp)
+        touched_buckets = select(campaign_id, touched_start).distinct()
+
+        rollup = (
+            select(
+                func.min(source.performance_data_id),
+                func.min(source.dataset_type),
+                func.min(source.profile_id),
+                source.campaign_id,
+                literal(period_type),
+                period_start,
+                period_end,
+                *self._aggregate_totals(source),
             )
-            .first()
-        )
-
-        if existing:
-            return existing
-
-        # Calculate aggregates
-        total_impressions = sum(r.impressions for r in performance_records)
-        total_clicks = sum(r.clicks for r in performance_records)
-        total_cost = sum(r.cost for r in performance_records)
-        total_sales = sum(r.sales for r in performance_records)
-        total_orders = sum(r.orders for r in performance_records)
-        total_units_sold = sum(r.units_sold for r in performance_records)
-
-        # Calculate averages
-        valid_records = [r for r in performance_records if r.ctr is not None]
-        avg_ctr = (
-            sum(r.ctr for r in valid_records) / len(valid_records)
-            if valid_records
-            else None
-        )
-
-        valid_records = [r for r in performance_records if r.cpc is not None]
-        avg_cpc = (
-            sum(r.cpc for r in valid_records) / len(valid_records)
-            if valid_records
-            else None
-        )
-
-        valid_records = [r for r in performance_records if r.acos is not None]
-        avg_acos = (
-            sum(r.acos for r in valid_records) / len(valid_records)
-            if valid_records
-            else None
-        )
-
-        valid_records = [r for r in performance_records if r.roas is not None]
-        avg_roas = (
-            sum(r.roas for r in valid_records) / len(valid_records)
-            if valid_records
-            else None
-        )
-
-        valid_records = [r for r in performance_records if r.conversion_rate is not None]
-        avg_conversion_rate = (
-            sum(r.conversion_rate for r in valid_records) / len(valid_records)
-            if valid_records
-            else None
-        )
-
-        # Create aggregate record
-        aggregate = PerformanceAggregate(
-            performance_data_id=performance_records[0].id,  # Reference to first record
-            dataset_type=dataset_type,
-            profile_id=profile_id,
-            campaign_id=campaign_id,
-            period_type=period_type,
-            period_start=period_start,
-            period_end=period_end,
-            total_impressions=total_impressions,
-            total_clicks=total_clicks,
-            total_cost=total_cost,
-            total_sales=total_sales,
-            total_orders=total_orders,
-            total_units_sold=total_units_sold,
-            avg_ctr=avg_ctr,
-            avg_cpc=avg_cpc,
-            avg_acos=avg_acos,
-            avg_roas=avg_roas,
-            avg_conversion_rate=avg_conversion_rate,
-        )
-
-        self.db.add(aggregate)
-        self.db.flush()
-
-        return aggregate
+            .where(
+                source.period_type == source_period,
+                tuple_(source.campaign_id, period_start).in_(touched_buckets),
+            )
+            .group_by(source.campaign_id, period_start)
+        )
 
+        stmt = pg_insert(PerformanceAggregate).from_select(list(_INSERT_COLUMNS), rollup)
+        return self.db.execute(
+            self._on_conflict(stmt, _CAMPAIGN_KEY, additive=False)
+        ).rowcount
+
+    def _on_conflict(self, stmt: Any, key: Tuple[str, ...], additive: bool) -> Any:
+        """Attach the ON CONFLICT clause shared by all aggregate upserts."""
+        table = stmt.table
+        excluded = stmt.excluded
+        if additive:
+            updates = {
+                column: func.coalesce(table.c[column], 0) + excluded[column]
+                for column in _TOTAL_COLUMNS
+            }
+            if settings.aggregate_metric_mode == "mean_of_ratios":
+                updates.update(
+                    {
+                        column: self._merged_average(table, column, excluded)
+                        for column in _RATIO_COLUMNS
+                    }
+                )
+            else:
+                # Ratios of the summed totals, evaluated against the old row
+                updates.update(
+                    {
+                        column: ratio_of_sums(updates[numerator], updates[denominator])
+                        for column, (numerator, denominator) in _RATIO_COLUMNS.items()
+                    }
+                )
+        else:
+            updates = {
+                column: excluded[column]
+                for column in (*_TOTAL_COLUMNS, *_RATIO_COLUMNS)
+            }
+        for column in ("dataset_type", "profile_id", "campaign_id", "period_end"):
+            if column not in key:
+                updates[column] = excluded[column]
+
+        return stmt.on_conflict_do_update(index_elements=list(key), set_=updates)
+
+    @staticmethod
+    def _merged_average(table: Any, column: str, excluded: Any) -> Any:
+        """Combine stored and new mean-of-ratios, weighted by record count."""
+        current = table.c[column]
+        return case(
+            (current.is_(None), excluded[column]),
+            (excluded[column].is_(None), current),
+            else_=(
+                current * table.c.record_count
+                + excluded[column] * excluded.record_count
+            )
+            / (table.c.record_count + excluded.record_count),
+        )
@@ -0,0 +1,257 @@
+"""Declarative alert rules compiled into per-record checks.
+
+Rules are plain data: the metric they read, how it is compared with a
+threshold, an optional baseline from the lookback window, severity bands and
+per-profile or per-campaign threshold overrides. ``AlertRuleEngine`` compiles
+them once into closures so evaluating a batch is one pass over the records
+with dictionary lookups for overrides and no per-rule queries.
+
+The default rules reproduce the ``ALERT_*_THRESHOLD`` settings. A JSON file
+named by ``ALERT_RULES_PATH`` holds a list of rule objects; an entry whose
+``alert_type`` matches a default rule replaces it.
+"""
+import logging
+import operator
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.models.stream_data import PerformanceData
+from app.services.baseline_cache import Baseline
+from app.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "gte": operator.ge,
+    "gt": operator.gt,
+    "lte": operator.le,
+    "lt": operator.lt,
+}
+
+# Baseline -> the only metric the lookback window provides it for
+_BASELINE_METRICS = {
+    "previous": "ctr",  # most recent earlier value; score is the drop from it
+    "window_total": "cost",  # lookback total; score is value / total
+}
+
+
+@dataclass(slots=True)
+class AlertRule:
+    """One alert rule.
+
+    ``comparison`` is one of gte, gt, lte or lt and applies ``score
+    <comparison> threshold``. Without a ``baseline`` the score is the metric
+    itself. ``severity_bands`` are ``(bound, severity)`` pairs checked in
+    order; the first bound the score strictly passes in the comparison's
+    direction wins, otherwise ``severity`` applies. An override of ``None``
+    disables the rule for that profile or campaign; campaign overrides take
+    precedence over profile overrides.
+
+    ``message`` is a ``str.format`` template over ``value``, ``baseline``,
+    ``score``, ``change`` (relative to the baseline) and ``threshold``.
+    ``cooldown_minutes`` defaults to ``ALERT_COOLDOWN_MINUTES``.
+    """
+
+    alert_type: str
+    metric: str
+    comparison: str
+    threshold: float
+    message: str
+    baseline: Optional[str] = None
+    severity: str = "medium"
+    severity_bands: Sequence[Tuple[float, str]] = ()
+    profile_overrides: Dict[str, Optional[float]] = field(default_factory=dict)
+    campaign_overrides: Dict[str, Optional[float]] = field(default_factory=dict)
+    cooldown_minutes: Optional[int] = None
+
+
+# (record, baseline) -> Alert column values or None
+CompiledRule = Callable[[PerformanceData, Optional[Baseline]], Optional[Dict[str, Any]]]
+
+
+def default_rules() -> List[AlertRule]:
+    """Build the built-in rules from the configured thresholds."""
+    return [
+        AlertRule(
+            alert_type="ctr_drop",
+            metric="ctr",
+            baseline="previous",
+            comparison="gte",
+            threshold=settings.alert_ctr_drop_threshold,
+            severity_bands=[(0.4, "high")],
+            message="CTR dropped by {score:.1%} (from {baseline:.2%} to {value:.2%})",
+        ),
+        AlertRule(
+            alert_type="spend_spike",
+            metric="cost",
+            baseline="window_total",
+            comparison="gte",
+            threshold=settings.alert_spend_spike_threshold,
+            severity_bands=[(2.0, "high")],
+            message="Spend increased by {change:.1%} (from ${baseline:.2f} to ${value:.2f})",
+        ),
+        AlertRule(
+            alert_type="high_acos",
+            metric="acos",
+            comparison="gte",
+            threshold=settings.alert_acos_threshold,
+            severity_bands=[(0.5, "high")],
+            message="ACOS is {value:.2%}, exceeding threshold of {threshold:.2%}",
+        ),
+        AlertRule(
+            alert_type="low_roas",
+            metric="roas",
+            comparison="lt",
+            threshold=settings.alert_roas_threshold,
+            severity_bands=[(1.0, "high")],
+            message="ROAS is {value:.2f}, below threshold of {threshold:.2f}",
+        ),
+    ]
+
+
+def load_rules(path: Optional[str] = None) -> List[AlertRule]:
+    """Return the default rules merged with those in the rules file.
+
+    Defaults to the configured ``ALERT_RULES_PATH``.
+    """
+    rules = {rule.alert_type: rule for rule in default_rules()}
+    path = path or settings.alert_rules_path
+    if path:
+        for entry in json_codec.loads(Path(path).read_bytes()):
+            entry["severity_bands"] = [tuple(band) for band in entry.get("severity_bands", ())]
+            rules[entry["alert_type"]] = AlertRule(**entry)
+        logger.info(f"Loaded alert rules from {path}")
+    return list(rules.values())
+
+
+def _decimal(value: Optional[float]) -> Optional[Decimal]:
+    """Convert a configured number to the Decimal it was written as."""
+    return None if value is None else Decimal(str(value))
+
+
+def compile_rule(rule: AlertRule) -> CompiledRule:
+    """Compile a rule into a check returning Alert column values or None.
+
+    Raises ValueError for rules that cannot be evaluated.
+    """
+    if rule.metric not in PerformanceData.__table__.c:
+        raise ValueError(f"Unknown metric {rule.metric!r} in rule {rule.alert_type}")
+    if rule.comparison not in _COMPARISONS:
+        raise ValueError(f"Unknown comparison {rule.comparison!r} in rule {rule.alert_type}")
+    if rule.baseline is not None and _BASELINE_METRICS.get(rule.baseline) != rule.metric:
+        raise ValueError(
+            f"Baseline {rule.baseline!r} is not available for metric {rule.metric!r} "
+            f"in rule {rule.alert_type}"
+        )
+
+    get_value = operator.attrgetter(rule.metric)
+    passes = _COMPARISONS[rule.comparison]
+    beyond = operator.gt if rule.comparison in ("gte", "gt") else operator.lt
+    # Metrics are Numeric columns; compare against exact decimals
+    default_threshold = _decimal(rule.threshold)
+    bands = tuple((_decimal(bound), severity) for bound, severity in rule.severity_bands)
+    campaign_overrides = {k: _decimal(v) for k, v in rule.campaign_overrides.items()}
+    profile_overrides = {k: _decimal(v) for k, v in rule.profile_overrides.items()}
+    baseline_index = {"previous": 0, "window_total": 1}.get(rule.baseline)
+
+    def check(
+        record: PerformanceData, baseline: Optional[Baseline]
+    ) -> Optional[Dict[str, Any]]:
+        value = get_value(record)
+        if not value:
+            return None
+
+        if record.campaign_id in campaign_overrides:
+            threshold = campaign_overrides[record.campaign_id]
+        else:
+            threshold = profile_overrides.get(record.profile_id, default_threshold)
+        if threshold is None:
+            return None
+
+        previous = change = None
+        score = value
+        if baseline_index is not None:
+            previous = baseline[baseline_index] if baseline else None
+            if not previous:
+                return None
+            change = (value - previous) / previous
+            score = -change if baseline_index == 0 else value / previous
+
+        if not passes(score, threshold):
+            return None
+
+        severity = rule.severity
+        for bound, band_severity in bands:
+            if beyond(score, bound):
+                severity = band_severity
+                break
+
+        return {
+            "alert_type": rule.alert_type,
+            "severity": severity,
+            "campaign_id": record.campaign_id,
+            "campaign_name": record.campaign_name,
+            "profile_id": record.profile_id,
+            "message": rule.message.format(
+                value=value,
+                baseline=previous,
+                score=score,
+                change=change,
+                threshold=threshold,
+            ),
+            "metric_value": value,
+            "threshold_value": threshold,
+            "previous_value": previous,
+        }
+
+    return check
+
+
+class AlertRuleEngine:
+    """Compiled alert rules evaluated in one pass per batch."""
+
+    def __init__(self, rules: Sequence[AlertRule]):
+        """Compile ``rules``."""
+        self.rules = list(rules)
+        self._checks = [compile_rule(rule) for rule in self.rules]
+        self.needs_baselines = any(rule.baseline for rule in self.rules)
+        # alert_type -> how long repeats are suppressed
+        self.cooldowns = {
+            rule.alert_type: timedelta(
+                minutes=settings.alert_cooldown_minutes
+                if rule.cooldown_minutes is None
+                else rule.cooldown_minutes
+            )
+            for rule in self.rules
+        }
+
+    def evaluate(
+        self,
+        records: Sequence[PerformanceData],
+        baselines: Optional[Sequence[Optional[Baseline]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return Alert column values for every rule a record breaches."""
+        if baselines is None:
+            baselines = [None] * len(records)
+        rows = []
+        for record, baseline in zip(records, baselines):
+            for check in self._checks:
+                row = check(record, baseline)
+                if row:
+                    rows.append(row)
+        return rows
+
+
+_engine: Optional[AlertRuleEngine] = None
+
+
+def get_rule_engine() -> AlertRuleEngine:
+    """Return the process-wide engine, compiling the rules on first use."""
+    global _engine
+    if _engine is None:
+        _engine = AlertRuleEngine(load_rules())
+    return _engine
@@ -0,0 +1,142 @@
+"""In-process suppression of repeated alerts."""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.stream_data import Alert
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_RANKS = {"low": 0, "medium": 1, "high": 2}
+
+# Reservations younger than this may belong to alerts not yet committed, so
+# a rebuild keeps them even when its query did not see them
+RESERVATION_GRACE = timedelta(minutes=1)
+
+# (campaign_id, alert_type)
+_Key = Tuple[str, str]
+
+
+class AlertSuppressor:
+    """Latest alert per (campaign_id, alert_type), used to drop repeats.
+
+    An alert is admitted when its type's cooldown has passed since the last
+    admitted alert for the same campaign, or when it escalates to a higher
+    severity; otherwise it is dropped before anything is written or sent.
+    Admitting reserves the key immediately so concurrent batches don't both
+    alert.
+
+    ``load`` refreshes the index from recent unacknowledged alerts, so
+    acknowledging an alert lets the next breach through after the following
+    refresh, and other processes' alerts are seen with the same delay.
+    Reservations made while the refresh runs are kept.
+    """
+
+    def __init__(self):
+        """Initialize alert suppressor."""
+        self._latest: Dict[_Key, Tuple[datetime, int]] = {}
+        self._lock = threading.Lock()
+
+        self.admitted_count = 0
+        self.suppressed_count = 0
+
+    def load(self, db: Session, cooldowns: Mapping[str, timedelta]) -> int:
+        """Merge unacknowledged alerts still in cooldown into the index.
+
+        Keys without such an alert are dropped unless they were reserved
+        within ``RESERVATION_GRACE`` of the refresh; for keys in both, the
+        later entry wins. Returns the number of keys loaded.
+        """
+        now = datetime.utcnow()
+        longest = max(cooldowns.values(), default=timedelta(0))
+        latest: Dict[_Key, Tuple[datetime, int]] = {}
+        if longest:
+            rows = db.execute(
+                select(
+                    Alert.campaign_id, Alert.alert_type, Alert.severity, Alert.created_at
+                )
+                .where(
+                    Alert.acknowledged.is_not(True),
+                    Alert.created_at >= now - longest,
+                )
+                .order_by(Alert.created_at)
+            ).all()
+            for campaign_id, alert_type, severity, created_at in rows:
+                if created_at >= now - cooldowns.get(alert_type, timedelta(0)):
+                    latest[(campaign_id, alert_type)] = (
+                        created_at,
+                        SEVERITY_RANKS.get(severity, 0),
+                    )
+
+        loaded = len(latest)
+        with self._lock:
+            for key, entry in self._latest.items():
+                current = latest.get(key)
+                if current is not None:
+                    if entry[0] > current[0]:
+                        latest[key] = entry
+                elif entry[0] >= now - RESERVATION_GRACE:
+                    latest[key] = entry
+            self._latest = latest
+        logger.debug(f"Loaded {loaded} alert suppression keys")
+        return loaded
+
+    def admit(
+        self, rows: List[Dict[str, Any]], cooldowns: Mapping[str, timedelta]
+    ) -> List[Dict[str, Any]]:
+        """Return the alert rows that are not repeats, reserving their keys.
+
+        Within ``rows`` only the most severe alert per key is considered.
+        """
+        candidates: Dict[_Key, Dict[str, Any]] = {}
+        for row in rows:
+            key = (row["campaign_id"], row["alert_type"])
+            current = candidates.get(key)
+            if current is None or _rank(row) > _rank(current):
+                candidates[key] = row
+
+        now = datetime.utcnow()
+        admitted = []
+        with self._lock:
+            for key, row in candidates.items():
+                cooldown = cooldowns.get(row["alert_type"], timedelta(0))
+                previous = self._latest.get(key)
+                if (
+                    cooldown
+                    and previous is not None
+                    and now - previous[0] < cooldown
+                    and _rank(row) <= previous[1]
+                ):
+                    continue
+                self._latest[key] = (now, _rank(row))
+                admitted.append(row)
+            self.admitted_count += len(admitted)
+            self.suppressed_count += len(rows) - len(admitted)
+        return admitted
+
+    def release(self, rows: List[Dict[str, Any]]) -> None:
+        """Drop reservations for admitted rows that were not stored."""
+        with self._lock:
+            for row in rows:
+                self._latest.pop((row["campaign_id"], row["alert_type"]), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return suppression counters."""
+        with self._lock:
+            keys = len(self._latest)
+        return {
+            "keys": keys,
+            "admitted": self.admitted_count,
+            "suppressed": self.suppressed_count,
+        }
+
+
+def _rank(row: Dict[str, Any]) -> int:
+    return SEVERITY_RANKS.get(row["severity"], 0)
+
+
+alert_suppressor = AlertSuppressor()
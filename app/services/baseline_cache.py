@@ -0,0 +1,241 @@
+"""In-process rolling windows of recent spend and CTR per campaign."""
+import logging
+import threading
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.stream_data import (
+    AggregationWatermark,
+    PerformanceAggregate,
+    PerformanceData,
+)
+from app.services.rollup_store import naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Lookback of the CTR-drop and spend-spike rules
+LOOKBACK_HOURS = 24
+
+_EPOCH = datetime(1970, 1, 1)
+
+# (previous CTR, spend in the lookback window)
+Baseline = Tuple[Optional[Decimal], Decimal]
+
+
+def _hour_index(value: datetime) -> int:
+    """Number of whole hours since the epoch."""
+    return int((naive_utc(value) - _EPOCH) // timedelta(hours=1))
+
+
+class _Window:
+    """Ring buffer of hourly sums for one campaign."""
+
+    __slots__ = ("newest", "hours", "cost", "clicks", "impressions")
+
+    def __init__(self, size: int):
+        self.newest = -1
+        self.hours: List[Optional[int]] = [None] * size
+        self.cost = [Decimal("0")] * size
+        self.clicks = [0] * size
+        self.impressions = [0] * size
+
+
+class BaselineCache:
+    """Recent hourly spend, clicks and impressions per campaign.
+
+    Each campaign keeps a ring buffer of ``2 * window_hours`` hourly buckets
+    indexed by hour, so a baseline is read from at most ``window_hours``
+    slots without touching the database. ``warm`` loads the buckets from
+    hourly PerformanceAggregate rows (plus rows above the hourly watermark
+    that no aggregate holds yet) and ``MessageProcessor`` adds every
+    committed PerformanceData row afterwards.
+
+    Buckets have hourly resolution: a record's window is the ``window_hours``
+    whole hours before the hour it starts in. ``baseline`` returns None when
+    the window is not fully covered (before warm-up, or for records older
+    than the ring), and callers fall back to the database.
+    """
+
+    def __init__(self, window_hours: int = LOOKBACK_HOURS):
+        """Initialize baseline cache."""
+        self.window_hours = window_hours
+        self.size = 2 * window_hours
+        self._windows: Dict[str, _Window] = {}
+        self._newest = -1
+        # First hour the cache has complete data for; None until warmed
+        self._floor: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped_count = 0
+
+    def warm(self, db: Session) -> int:
+        """Load recent hourly buckets from the database.
+
+        Call before ingestion starts; rows committed while warming are not
+        picked up. Returns the number of campaigns loaded.
+        """
+        now = _hour_index(datetime.utcnow())
+        floor = now - self.size + 1
+        since = _EPOCH + timedelta(hours=floor)
+
+        rows = db.execute(
+            select(
+                PerformanceAggregate.campaign_id,
+                PerformanceAggregate.period_start,
+                PerformanceAggregate.total_cost,
+                PerformanceAggregate.total_clicks,
+                PerformanceAggregate.total_impressions,
+            ).where(
+                PerformanceAggregate.period_type == "hourly",
+                PerformanceAggregate.period_start >= since,
+            )
+        ).all()
+
+        # Streaming rollups already add rows above the watermark to aggregates
+        if not settings.streaming_rollup_enabled:
+            watermark = db.scalar(
+                select(AggregationWatermark.last_performance_data_id).where(
+                    AggregationWatermark.period_type == "hourly"
+                )
+            )
+            rows += db.execute(
+                select(
+                    PerformanceData.campaign_id,
+                    PerformanceData.start_date,
+                    PerformanceData.cost,
+                    PerformanceData.clicks,
+                    PerformanceData.impressions,
+                ).where(
+                    PerformanceData.id > (watermark or 0),
+                    PerformanceData.start_date >= since,
+                )
+            ).all()
+
+        windows: Dict[str, _Window] = {}
+        newest = now
+        for campaign_id, start, cost, clicks, impressions in rows:
+            hour = _hour_index(start)
+            self._add_to(windows, campaign_id, hour, cost, clicks, impressions)
+            newest = max(newest, hour)
+
+        with self._lock:
+            self._windows = windows
+            self._newest = newest
+            self._floor = floor
+        logger.info(f"Warmed alert baselines for {len(windows)} campaigns")
+        return len(windows)
+
+    def add(self, records: Iterable[PerformanceData]) -> None:
+        """Add committed performance rows to their hourly buckets."""
+        with self._lock:
+            for record in records:
+                hour = _hour_index(record.start_date)
+                if not self._add_to(
+                    self._windows,
+                    record.campaign_id,
+                    hour,
+                    record.cost,
+                    record.clicks,
+                    record.impressions,
+                ):
+                    self.skipped_count += 1
+                    continue
+                if hour > self._newest:
+                    self._newest = hour
+                    self._prune()
+
+    def baseline(self, campaign_id: str, start_date: datetime) -> Optional[Baseline]:
+        """Get the previous hour's CTR and the window's spend before ``start_date``.
+
+        Returns None when the cache cannot answer for that window.
+        """
+        hour = _hour_index(start_date)
+        first = hour - self.window_hours
+        with self._lock:
+            # Buckets older than the ring may have been overwritten or pruned
+            if self._floor is None or first < max(
+                self._floor, self._newest - self.size + 1
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+            window = self._windows.get(campaign_id)
+            if window is None:
+                return None, Decimal("0")
+
+            previous_ctr: Optional[Decimal] = None
+            found = False
+            spend = Decimal("0")
+            for earlier in range(hour - 1, first - 1, -1):
+                slot = earlier % self.size
+                if window.hours[slot] != earlier:
+                    continue
+                spend += window.cost[slot]
+                if not found:
+                    found = True
+                    impressions = window.impressions[slot]
+                    if impressions:
+                        previous_ctr = (
+                            Decimal(window.clicks[slot]) / Decimal(impressions)
+                        ).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+            return previous_ctr, spend
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters."""
+        with self._lock:
+            campaigns = len(self._windows)
+        return {
+            "campaigns": campaigns,
+            "warm": self._floor is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped_count,
+        }
+
+    def _add_to(
+        self,
+        windows: Dict[str, _Window],
+        campaign_id: str,
+        hour: int,
+        cost: Optional[Decimal],
+        clicks: Optional[int],
+        impressions: Optional[int],
+    ) -> bool:
+        """Add one row's sums to its bucket; False if the ring has moved past it."""
+        window = windows.get(campaign_id)
+        if window is None:
+            window = windows[campaign_id] = _Window(self.size)
+        elif hour <= window.newest - self.size:
+            return False
+
+        slot = hour % self.size
+        if window.hours[slot] != hour:
+            window.hours[slot] = hour
+            window.cost[slot] = Decimal("0")
+            window.clicks[slot] = 0
+            window.impressions[slot] = 0
+        window.cost[slot] += cost or 0
+        window.clicks[slot] += clicks or 0
+        window.impressions[slot] += impressions or 0
+        window.newest = max(window.newest, hour)
+        return True
+
+    def _prune(self) -> None:
+        """Drop campaigns with no bucket left in the ring."""
+        stale = [
+            campaign_id
+            for campaign_id, window in self._windows.items()
+            if window.newest <= self._newest - self.size
+        ]
+        for campaign_id in stale:
+            del self._windows[campaign_id]
+
+
+baseline_cache = BaselineCache()
@@ -1,81 +1,101 @@
 """Service for processing stream messages."""
-import json
 import logging
 from datetime import datetime
-from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.stream_data import (
     StreamMessage,
+    StreamMessageKey,
     PerformanceData,
     StreamDatasetType,
     BudgetUsageEvent,
 )
+from app.schemas.stream_records import (
+    BudgetUsageRecord,
+    PerformanceRecord,
+    RecordDecodeError,
+    StreamRecord,
+    decode_envelope,
+    decoder_for,
+)
+from app.services.baseline_cache import baseline_cache
+from app.services.rollup_store import rollup_store
+from app.utils import json_codec
+from app.utils.bulk_writer import BulkWriter
+from app.utils.dedup_cache import DedupCache
 from app.utils.metrics_calculator import MetricsCalculator
 
 logger = logging.getLogger(__name__)
 
+# Shared by every MessageProcessor in the process; processors are per-batch
+dedup_cache = DedupCache(
+    max_size=settings.dedup_cache_size,
+    ttl_seconds=settings.dedup_cache_ttl_seconds,
+)
+
+
+class _PreparedMessage(NamedTuple):
+    """A parsed message waiting to be written as part of a batch."""
+
+    index: int
+    message_id: str
+    dataset_type: StreamDatasetType
+    dataset_name: Optional[str]
+    profile_id: str
+    message_body: Dict[str, Any]
+    raw_body: Optional[str]
+    record: StreamRecord
+
 
 class MessageProcessor:
     """Processes Amazon Marketing Stream messages."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[DedupCache] = None):
         """Initialize message processor."""
         self.db = db
         self.metrics_calculator = MetricsCalculator()
+        self.dedup_cache = cache or dedup_cache
 
     def process_message(
-        self, message_body: Dict[str, Any]
+        self, message_body: Dict[str, Any], raw_body: Optional[str] = None
     ) -> Optional[PerformanceData]:
-        """Process a single stream message."""
-        try:
-            # Extract message metadata
-            message_id = self._get_first_value(
-                message_body,
-                "messageId",
-                "id",
-                "idempotency_id",
-                "idempotencyId",
-            )
-            dataset_type_str = self._get_first_value(
-                message_body, "datasetType", "dataset_type", "dataset_id"
-            )
-            dataset_name = self._normalize_dataset_name(dataset_type_str)
-            profile_id = self._get_first_value(
-                message_body, "profileId", "profile_id", "advertiser_id"
-            )
+        """Process a single stream message.
 
-            if not all([message_id, dataset_type_str, profile_id]):
-                logger.warning(f"Missing required fields in message: {message_body}")
+        ``raw_body`` is the original SQS body; when given it is stored as-is
+        instead of re-encoding ``message_body``.
+        """
+        try:
+            envelope = self._parse_envelope(message_body)
+            if not envelope:
                 return None
+            message_id, dataset_type, dataset_name, profile_id = envelope
 
-            # Determine dataset type
-            try:
-                dataset_type = self._map_dataset_type(dataset_name or dataset_type_str)
-            except ValueError:
-                logger.warning(f"Unknown dataset type: {dataset_type_str}")
+            # Check if message already processed
+            if self.dedup_cache.filter_seen([message_id]):
+                logger.debug(f"Message already processed: {message_id}")
                 return None
 
-            # Check if message already processed
-            existing = (
-                self.db.query(StreamMessage)
-                .filter(StreamMessage.message_id == message_id)
-                .first()
-            )
+            existing = self.db.get(StreamMessageKey, message_id)
             if existing:
+                self.dedup_cache.record_conflicts(1)
+                self.dedup_cache.add_many([message_id])
                 logger.debug(f"Message already processed: {message_id}")
                 return None
 
-            # Store raw message
+            # Store raw message; the key's primary key rejects concurrent duplicates
+            received_at = datetime.utcnow()
+            self.db.add(StreamMessageKey(message_id=message_id, created_at=received_at))
             stream_message = StreamMessage(
                 message_id=message_id,
                 dataset_type=dataset_type,
                 dataset_name=dataset_name,
                 profile_id=profile_id,
-                raw_data=json.dumps(message_body),
+                raw_data=self._raw_data(message_body, raw_body),
                 processed=False,
+                created_at=received_at,
             )
             self.db.add(stream_message)
             self.db.flush()
@@ -94,12 +114,15 @@ class MessageProcessor:
                 stream_message.processed = True
                 stream_message.processed_at = datetime.utcnow()
                 self.db.commit()
+                self.dedup_cache.add_many([message_id])
                 logger.info(f"Processed message {message_id}")
-                return (
-                    result_obj
-                    if isinstance(result_obj, PerformanceData)
-                    else None
-                )
+                if not isinstance(result_obj, PerformanceData):
+                    return None
+                if settings.streaming_rollup_enabled:
+                    rollup_store.add([result_obj])
+                if settings.alert_baseline_cache_enabled:
+                    baseline_cache.add([result_obj])
+                return result_obj
             else:
                 self.db.rollback()
                 logger.warning(f"Failed to extract performance data from message {message_id}")
@@ -110,145 +133,273 @@ class MessageProcessor:
             self.db.rollback()
             return None
 
-    def _extract_performance_data(
+    def process_batch(
         self,
-        stream_message: StreamMessage,
-        message_body: Dict[str, Any],
-        dataset_name: Optional[str],
-    ) -> Optional[PerformanceData]:
-        """Extract performance data from message body."""
+        message_bodies: List[Dict[str, Any]],
+        raw_bodies: Optional[List[Optional[str]]] = None,
+    ) -> List[Optional[PerformanceData]]:
+        """Process a batch of stream messages in a single transaction.
+
+        Recently committed ids are filtered out through the in-memory dedup
+        cache; everything else is written with multi-row INSERT ... ON CONFLICT
+        DO NOTHING RETURNING, so the unique index on ``message_id`` remains the
+        authoritative duplicate check. The batch is committed once. Messages
+        that cannot be parsed are skipped; if the batch write fails, the
+        remaining messages are retried one by one through ``process_message``
+        so a single poison message cannot block the rest.
+
+        ``raw_bodies``, when given, is aligned with ``message_bodies`` and holds
+        the original SQS bodies to store verbatim.
+
+        Returns a list aligned with ``message_bodies`` holding the created
+        PerformanceData, or None for skipped, duplicate and budget messages.
+        """
+        results: List[Optional[PerformanceData]] = [None] * len(message_bodies)
+
+        prepared: List[_PreparedMessage] = []
+        for index, message_body in enumerate(message_bodies):
+            raw_body = raw_bodies[index] if raw_bodies else None
+            item = self._prepare_message(index, message_body, raw_body)
+            if item:
+                prepared.append(item)
+
+        if not prepared:
+            return results
+
+        existing = set(self.dedup_cache.filter_seen(p.message_id for p in prepared))
+        fresh: List[_PreparedMessage] = []
+        for item in prepared:
+            if item.message_id in existing:
+                logger.debug(f"Message already processed: {item.message_id}")
+                continue
+            # Also drop duplicates delivered twice within the same batch
+            existing.add(item.message_id)
+            fresh.append(item)
+
+        if not fresh:
+            return results
+
         try:
-            data = (
-                message_body.get("data")
-                or message_body.get("payload")
-                or message_body
+            records, inserted_ids = self._insert_batch(fresh)
+            self.db.commit()
+        except Exception as e:
+            logger.error(
+                f"Batch insert failed, falling back to per-message processing: {e}",
+                exc_info=True,
             )
+            self.db.rollback()
+            for item in fresh:
+                results[item.index] = self.process_message(
+                    item.message_body, item.raw_body
+                )
+            return results
+
+        # Rows the database skipped were duplicates the cache did not know about
+        conflicts = len(fresh) - len(inserted_ids)
+        if conflicts:
+            self.dedup_cache.record_conflicts(conflicts)
+            logger.debug(f"Skipped {conflicts} already processed messages")
+        self.dedup_cache.add_many(item.message_id for item in fresh)
+        if settings.streaming_rollup_enabled:
+            rollup_store.add(records.values())
+        if settings.alert_baseline_cache_enabled:
+            baseline_cache.add(records.values())
+
+        for index, record in records.items():
+            results[index] = record
+        logger.info(f"Processed batch of {len(inserted_ids)} messages")
+        return results
+
+    def extract_performance_columns(
+        self, message_body: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Decode a stored message into PerformanceData column values.
+
+        Used to re-derive rows from stored raw payloads; nothing is written.
+        Returns None for budget, invalid and unrecognized messages.
+        """
+        item = self._prepare_message(0, message_body)
+        if item is None or not isinstance(item.record, PerformanceRecord):
+            return None
+        return {
+            "dataset_type": item.dataset_type,
+            "profile_id": item.profile_id,
+            **self._performance_columns(item.record, item.dataset_name),
+        }
+
+    def _prepare_message(
+        self, index: int, message_body: Dict[str, Any], raw_body: Optional[str] = None
+    ) -> Optional[_PreparedMessage]:
+        """Decode a message into a typed record ready for a bulk insert."""
+        try:
+            envelope = self._parse_envelope(message_body)
+            if not envelope:
+                return None
+            message_id, dataset_type, dataset_name, profile_id = envelope
 
-            # Extract campaign information
-            campaign_id = self._get_first_value(
-                data,
-                "campaignId",
-                "campaign_id",
-                ("campaign", "id"),
+            record = decoder_for(dataset_name)(
+                self._get_payload(message_body), dataset_name
             )
-            if not campaign_id:
-                logger.warning("No campaign ID found in message")
+            if record is None:
+                logger.warning(f"Failed to extract performance data from message {message_id}")
                 return None
 
-            campaign_name = self._get_first_value(
-                data,
-                "campaignName",
-                "campaign_name",
-                ("campaign", "name"),
+            return _PreparedMessage(
+                index=index,
+                message_id=message_id,
+                dataset_type=dataset_type,
+                dataset_name=dataset_name,
+                profile_id=profile_id,
+                message_body=message_body,
+                raw_body=raw_body,
+                record=record,
             )
+        except RecordDecodeError as e:
+            logger.warning(f"Rejected invalid message: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error processing message: {e}", exc_info=True)
+            return None
 
-            # Extract metrics
-            impressions = int(self._get_first_value(data, "impressions") or 0)
-            clicks = int(self._get_first_value(data, "clicks") or 0)
-            cost = Decimal(
-                str(self._get_first_value(data, "cost", "spend", "ad_cost") or 0)
+    def _insert_batch(
+        self, items: List[_PreparedMessage]
+    ) -> Tuple[Dict[int, PerformanceData], Dict[str, int]]:
+        """Bulk insert stream messages and their extracted rows.
+
+        Messages whose ``message_id`` already has a key row are skipped by
+        the database and get no stored or extracted rows. Returns the created
+        PerformanceData keyed by batch index and the inserted message ids
+        mapped to row ids.
+        """
+        processed_at = datetime.utcnow()
+        writer = BulkWriter(self.db)
+        claimed = {
+            message_id
+            for (message_id,) in writer.insert(
+                StreamMessageKey.__table__,
+                [
+                    {"message_id": item.message_id, "created_at": processed_at}
+                    for item in items
+                ],
+                conflict_columns=["message_id"],
+                returning=[StreamMessageKey.message_id],
             )
-            sales = Decimal(
-                str(
-                    self._get_first_value(
-                        data,
-                        "sales",
-                        "revenue",
-                        "attributed_sales_1d",
-                        "attributed_sales_7d",
-                    )
-                    or 0
-                )
-            )
-            orders = int(
-                self._get_first_value(
-                    data, "orders", "conversions", "attributed_conversions_1d"
-                )
-                or 0
+        }
+        items = [item for item in items if item.message_id in claimed]
+        if not items:
+            return {}, {}
+
+        stream_rows = writer.insert(
+            StreamMessage.__table__,
+            [
+                {
+                    "message_id": item.message_id,
+                    "dataset_type": item.dataset_type,
+                    "dataset_name": item.dataset_name,
+                    "profile_id": item.profile_id,
+                    "raw_data": self._raw_data(item.message_body, item.raw_body),
+                    "processed": True,
+                    "processed_at": processed_at,
+                    "created_at": processed_at,
+                }
+                for item in items
+            ],
+            returning=[StreamMessage.id, StreamMessage.message_id],
+        )
+        stream_ids = {message_id: row_id for row_id, message_id in stream_rows}
+
+        performance_items = [
+            item for item in items if isinstance(item.record, PerformanceRecord)
+        ]
+        budget_items = [
+            item for item in items if isinstance(item.record, BudgetUsageRecord)
+        ]
+
+        records: Dict[int, PerformanceData] = {}
+        if performance_items:
+            created = writer.insert(
+                PerformanceData.__table__,
+                [
+                    {
+                        "stream_message_id": stream_ids[item.message_id],
+                        "dataset_type": item.dataset_type,
+                        "profile_id": item.profile_id,
+                        **self._performance_columns(item.record, item.dataset_name),
+                    }
+                    for item in performance_items
+                ],
+                returning=PerformanceData,
             )
-            units_sold = int(
-                self._get_first_value(
-                    data, "unitsSold", "units_sold", "attributed_units_ordered_1d"
-                )
-                or 0
+            # COPY does not preserve order; each message yields at most one row
+            by_stream_id = {record.stream_message_id: record for record in created}
+            for item in performance_items:
+                record = by_stream_id[stream_ids[item.message_id]]
+                # Detach so the loaded state survives the commit and callers
+                # (alert checks) don't re-select every row.
+                self.db.expunge(record)
+                records[item.index] = record
+
+        if budget_items:
+            writer.insert(
+                BudgetUsageEvent.__table__,
+                [
+                    {
+                        "stream_message_id": stream_ids[item.message_id],
+                        "dataset_type": item.dataset_type,
+                        "profile_id": item.profile_id,
+                        **self._budget_usage_columns(item.record, item.dataset_name),
+                    }
+                    for item in budget_items
+                ],
             )
 
-            # Extract time period
-            start_date_str = self._get_first_value(
-                data,
-                "time_window_start",
-                "startDate",
-                "start_date",
-                "date",
-                ("period", "start"),
-            )
-            end_date_str = self._get_first_value(
-                data,
-                "time_window_end",
-                "endDate",
-                "end_date",
-                ("period", "end"),
-            )
+        return records, stream_ids
 
-            # Parse dates (assuming ISO format)
-            try:
-                start_date = (
-                    datetime.fromisoformat(start_date_str.replace("Z", "+00:00"))
-                    if start_date_str
-                    else datetime.utcnow()
-                )
-                end_date = (
-                    datetime.fromisoformat(end_date_str.replace("Z", "+00:00"))
-                    if end_date_str
-                    else datetime.utcnow()
-                )
-            except (ValueError, AttributeError):
-                start_date = datetime.utcnow()
-                end_date = datetime.utcnow()
+    def _parse_envelope(
+        self, message_body: Dict[str, Any]
+    ) -> Optional[Tuple[str, StreamDatasetType, Optional[str], str]]:
+        """Extract message id, dataset type/name and profile id."""
+        envelope = decode_envelope(message_body)
+        message_id = envelope.message_id
+        dataset_type_str = envelope.dataset_id
+        dataset_name = self._normalize_dataset_name(dataset_type_str)
+        profile_id = envelope.profile_id
+
+        if not all([message_id, dataset_type_str, profile_id]):
+            logger.warning(f"Missing required fields in message: {message_body}")
+            return None
+
+        # Determine dataset type
+        try:
+            dataset_type = self._map_dataset_type(dataset_name or dataset_type_str)
+        except ValueError:
+            logger.warning(f"Unknown dataset type: {dataset_type_str}")
+            return None
+
+        return message_id, dataset_type, dataset_name, profile_id
+
+    def _extract_performance_data(
+        self,
+        stream_message: StreamMessage,
+        message_body: Dict[str, Any],
+        dataset_name: Optional[str],
+    ) -> Optional[PerformanceData]:
+        """Extract performance data from message body."""
+        try:
+            record = decoder_for(dataset_name)(
+                self._get_payload(message_body), dataset_name
+            )
+            if not isinstance(record, PerformanceRecord):
+                logger.warning("No campaign ID found in message")
+                return None
 
-            # Create performance data record
             performance_data = PerformanceData(
                 stream_message_id=stream_message.id,
                 dataset_type=stream_message.dataset_type,
-                dataset_name=dataset_name,
                 profile_id=stream_message.profile_id,
-                campaign_id=str(campaign_id),
-                campaign_name=campaign_name,
-                ad_group_id=self._get_first_value(
-                    data,
-                    "adGroupId",
-                    "ad_group_id",
-                    ("ad_group", "id"),
-                ),
-                ad_group_name=self._get_first_value(
-                    data,
-                    "adGroupName",
-                    "ad_group_name",
-                    ("ad_group", "name"),
-                ),
-                keyword_id=self._get_first_value(data, "keywordId", "keyword_id"),
-                keyword_text=self._get_first_value(
-                    data, "keywordText", "keyword_text", "search_term"
-                ),
-                asin=self._get_first_value(data, "asin", "ASIN", ("product", "asin")),
-                impressions=impressions,
-                clicks=clicks,
-                cost=cost,
-                sales=sales,
-                orders=orders,
-                units_sold=units_sold,
-                start_date=start_date,
-                end_date=end_date,
+                **self._performance_columns(record, dataset_name),
             )
 
-            # Calculate metrics
-            metrics = self.metrics_calculator.calculate_metrics(performance_data)
-            performance_data.ctr = metrics.get("ctr")
-            performance_data.cpc = metrics.get("cpc")
-            performance_data.acos = metrics.get("acos")
-            performance_data.roas = metrics.get("roas")
-            performance_data.conversion_rate = metrics.get("conversion_rate")
-
             self.db.add(performance_data)
             self.db.flush()
 
@@ -260,6 +411,43 @@ class MessageProcessor:
             )
             return None
 
+    def _performance_columns(
+        self, record: PerformanceRecord, dataset_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build PerformanceData column values from a decoded record."""
+        # Calculate metrics
+        metrics = self.metrics_calculator.calculate_from_totals(
+            impressions=record.impressions,
+            clicks=record.clicks,
+            cost=record.cost,
+            sales=record.sales,
+            orders=record.orders,
+        )
+
+        return {
+            "dataset_name": dataset_name,
+            "campaign_id": record.campaign_id,
+            "campaign_name": record.campaign_name,
+            "ad_group_id": record.ad_group_id,
+            "ad_group_name": record.ad_group_name,
+            "keyword_id": record.keyword_id,
+            "keyword_text": record.keyword_text,
+            "asin": record.asin,
+            "impressions": record.impressions,
+            "clicks": record.clicks,
+            "cost": record.cost,
+            "sales": record.sales,
+            "orders": record.orders,
+            "units_sold": record.units_sold,
+            "ctr": metrics.get("ctr"),
+            "cpc": metrics.get("cpc"),
+            "acos": metrics.get("acos"),
+            "roas": metrics.get("roas"),
+            "conversion_rate": metrics.get("conversion_rate"),
+            "start_date": record.start_date,
+            "end_date": record.end_date,
+        }
+
     def _extract_budget_usage(
         self,
         stream_message: StreamMessage,
@@ -268,88 +456,15 @@ class MessageProcessor:
     ) -> Optional[BudgetUsageEvent]:
         """Extract budget usage information."""
         try:
-            data = (
-                message_body.get("data")
-                or message_body.get("payload")
-                or message_body
-            )
-
-            campaign_id = self._get_first_value(
-                data, "campaignId", "campaign_id", ("campaign", "id")
-            )
-            budget_type = self._get_first_value(
-                data, "budgetType", "budget_type"
-            )
-            budget_name = self._get_first_value(
-                data, "budgetName", "budget_name"
-            )
-            budget_status = self._get_first_value(
-                data, "budgetStatus", "budget_status", "status"
-            )
-            currency = self._get_first_value(
-                data, "currency", "currencyCode", "currency_code"
-            )
-            daily_budget = Decimal(
-                str(
-                    self._get_first_value(
-                        data,
-                        "dailyBudget",
-                        "budget",
-                        "budgetLimit",
-                        "budget_limit",
-                        "maxBudget",
-                        "max_budget",
-                    )
-                    or 0
-                )
-            )
-            budget_consumed = Decimal(
-                str(
-                    self._get_first_value(
-                        data,
-                        "budgetConsumed",
-                        "budget_consumed",
-                        "amountSpent",
-                        "amount_spent",
-                        "spend",
-                    )
-                    or 0
-                )
-            )
-
-            start_date = self._parse_datetime(
-                self._get_first_value(
-                    data,
-                    "time_window_start",
-                    "startDate",
-                    "start_date",
-                    "date",
-                )
-            )
-            end_date = self._parse_datetime(
-                self._get_first_value(
-                    data,
-                    "time_window_end",
-                    "endDate",
-                    "end_date",
-                )
+            record = decoder_for(dataset_name)(
+                self._get_payload(message_body), dataset_name
             )
 
             budget_event = BudgetUsageEvent(
                 stream_message_id=stream_message.id,
                 dataset_type=stream_message.dataset_type,
-                dataset_name=dataset_name,
                 profile_id=stream_message.profile_id,
-                campaign_id=str(campaign_id) if campaign_id else None,
-                budget_type=budget_type,
-                budget_name=budget_name,
-                budget_status=budget_status,
-                daily_budget=daily_budget,
-                budget_consumed=budget_consumed,
-                currency=currency,
-                start_date=start_date,
-                end_date=end_date,
-                details=json.dumps(data),
+                **self._budget_usage_columns(record, dataset_name),
             )
 
             self.db.add(budget_event)
@@ -362,24 +477,39 @@ class MessageProcessor:
             return None
 
     @staticmethod
-    def _get_first_value(data: Dict[str, Any], *keys):
-        """Return first non-null value for provided keys. Supports tuple paths."""
-        for key in keys:
-            if key is None:
-                continue
-            if isinstance(key, tuple):
-                current = data
-                for part in key:
-                    if isinstance(current, dict) and part in current:
-                        current = current[part]
-                    else:
-                        current = None
-                        break
-                if current is not None:
-                    return current
-            elif isinstance(data, dict) and key in data and data[key] is not None:
-                return data[key]
-        return None
+    def _budget_usage_columns(
+        record: BudgetUsageRecord, dataset_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build BudgetUsageEvent column values from a decoded record."""
+        return {
+            "dataset_name": dataset_name,
+            "campaign_id": record.campaign_id,
+            "budget_type": record.budget_type,
+            "budget_name": record.budget_name,
+            "budget_status": record.budget_status,
+            "daily_budget": record.daily_budget,
+            "budget_consumed": record.budget_consumed,
+            "currency": record.currency,
+            "start_date": record.start_date,
+            "end_date": record.end_date,
+            "details": record.details,
+        }
+
+    @staticmethod
+    def _raw_data(message_body: Dict[str, Any], raw_body: Optional[str]) -> str:
+        """Return the text stored in StreamMessage.raw_data."""
+        if raw_body is None:
+            return json_codec.dumps(message_body)
+        return raw_body.decode() if isinstance(raw_body, bytes) else raw_body
+
+    @staticmethod
+    def _get_payload(message_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the metrics payload nested inside a message body."""
+        return (
+            message_body.get("data")
+            or message_body.get("payload")
+            or message_body
+        )
 
     @staticmethod
     def _map_dataset_type(raw_value: str) -> StreamDatasetType:
@@ -405,14 +535,3 @@ class MessageProcessor:
         if not raw_value:
             return None
         return raw_value.strip().lower()
-
-    @staticmethod
-    def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
-        """Parse ISO datetime strings safely."""
-        if not value:
-            return None
-        try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00"))
-        except (ValueError, AttributeError):
-            return None
-
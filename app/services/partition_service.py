@@ -0,0 +1,223 @@
+"""Service for maintaining time-partitioned tables."""
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> (partition column, partition interval). Raw messages
+# are large and short-lived, so they get daily partitions; performance rows
+# are kept longer and queried by month-sized windows.
+PARTITIONED_TABLES: Dict[str, Tuple[str, str]] = {
+    "stream_messages": ("created_at", "day"),
+    "performance_data": ("start_date", "month"),
+}
+
+_BOUND_PATTERN = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def partition_start(interval: str, moment: datetime) -> datetime:
+    """Start of the ``interval`` partition containing ``moment``."""
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "month":
+        start = start.replace(day=1)
+    return start
+
+
+def next_partition_start(interval: str, start: datetime) -> datetime:
+    """Start of the partition following the one starting at ``start``."""
+    if interval == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(table: str, interval: str, start: datetime) -> str:
+    """Name of the partition starting at ``start``, e.g. ``performance_data_p202610``."""
+    suffix = start.strftime("%Y%m" if interval == "month" else "%Y%m%d")
+    return f"{table}_p{suffix}"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    """Parse one side of a range partition bound; None for MINVALUE/MAXVALUE."""
+    value = value.strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value)
+
+
+class PartitionService:
+    """Service that creates upcoming partitions and drops expired ones.
+
+    Partitions are created ahead of time so rows never land in the default
+    partition, and retention drops whole partitions instead of deleting rows,
+    which leaves no dead tuples to vacuum. Tables that are not partitioned
+    (e.g. created with ``create_all``) are skipped.
+    """
+
+    def __init__(self, db: Session):
+        """Initialize partition service."""
+        self.db = db
+
+    def ensure_partitions(self, days_ahead: Optional[int] = None) -> int:
+        """Create missing partitions from today through ``days_ahead`` days out.
+
+        Each partition is created and committed on its own, so one failure is
+        logged and does not undo the others. Returns the number of partitions
+        created.
+        """
+        if days_ahead is None:
+            days_ahead = settings.partition_premake_days
+        today = datetime.utcnow()
+
+        created = 0
+        for table, (column, interval) in PARTITIONED_TABLES.items():
+            if not self.is_partitioned(table):
+                continue
+            existing = self.partition_bounds(table)
+            start = partition_start(interval, today)
+            horizon = today + timedelta(days=days_ahead)
+            while start <= horizon:
+                end = next_partition_start(interval, start)
+                overlaps = any(
+                    (lower is None or lower < end) and (upper is None or upper > start)
+                    for _, lower, upper in existing
+                )
+                if not overlaps:
+                    name = partition_name(table, interval, start)
+                    try:
+                        self._create_partition(table, column, name, start, end)
+                        self.db.commit()
+                    except Exception as e:
+                        self.db.rollback()
+                        logger.error(f"Error creating partition {name}: {e}", exc_info=True)
+                    else:
+                        existing.append((name, start, end))
+                        created += 1
+                        logger.info(f"Created partition {name}")
+                start = end
+
+        return created
+
+    def drop_expired(self) -> int:
+        """Drop partitions entirely older than each table's retention period.
+
+        Rows older than the cutoff that fell into a default partition are
+        deleted, and so are dedup keys of dropped messages. Returns the number
+        of partitions dropped.
+        """
+        retention = {
+            "stream_messages": settings.stream_message_retention_days,
+            "performance_data": settings.performance_data_retention_days,
+        }
+        now = datetime.utcnow()
+
+        dropped = 0
+        for table, (column, _) in PARTITIONED_TABLES.items():
+            days = retention[table]
+            if days <= 0 or not self.is_partitioned(table):
+                continue
+            cutoff = now - timedelta(days=days)
+
+            for name, _, upper in self.partition_bounds(table):
+                if upper is not None and upper <= cutoff:
+                    self.db.execute(text(f"DROP TABLE {name}"))
+                    dropped += 1
+                    logger.info(f"Dropped partition {name}")
+
+            default = self._default_partition(table)
+            if default:
+                self.db.execute(
+                    text(f"DELETE FROM {default} WHERE {column} < :cutoff"),
+                    {"cutoff": cutoff},
+                )
+
+            if table == "stream_messages":
+                self.db.execute(
+                    text("DELETE FROM stream_message_keys WHERE created_at < :cutoff"),
+                    {"cutoff": cutoff},
+                )
+
+        self.db.commit()
+        return dropped
+
+    def is_partitioned(self, table: str) -> bool:
+        """Check whether ``table`` is a partitioned table."""
+        return bool(
+            self.db.scalar(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table "
+                    "WHERE partrelid = to_regclass(:table)"
+                ),
+                {"table": table},
+            )
+        )
+
+    def partition_bounds(
+        self, table: str
+    ) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+        """Return (name, lower, upper) for each range partition of ``table``."""
+        rows = self.db.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {"table": table},
+        ).all()
+
+        bounds = []
+        for name, bound in rows:
+            match = _BOUND_PATTERN.search(bound)
+            if match:
+                bounds.append((name, _parse_bound(match[1]), _parse_bound(match[2])))
+        return bounds
+
+    def _create_partition(
+        self, table: str, column: str, name: str, start: datetime, end: datetime
+    ) -> None:
+        """Create the partition [start, end) of ``table``; the caller commits.
+
+        PostgreSQL refuses to create a partition while the default partition
+        holds rows in its range, so such rows are moved: the default is
+        detached, the partition created, the rows moved across and the
+        default reattached.
+        """
+        bounds = f"FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+        in_range = f"{column} >= :start AND {column} < :end"
+        params = {"start": start, "end": end}
+
+        default = self._default_partition(table)
+        if not default or not self.db.scalar(
+            text(f"SELECT 1 FROM {default} WHERE {in_range} LIMIT 1"), params
+        ):
+            self.db.execute(
+                text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}")
+            )
+            return
+
+        self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        self.db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        moved = self.db.execute(
+            text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"), params
+        ).rowcount
+        self.db.execute(text(f"DELETE FROM {default} WHERE {in_range}"), params)
+        self.db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+        logger.info(f"Moved {moved} rows from {default} to {name}")
+
+    def _default_partition(self, table: str) -> Optional[str]:
+        """Return the name of ``table``'s default partition, if any."""
+        return self.db.scalar(
+            text(
+                "SELECT c.relname "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table) "
+                "AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+            ),
+            {"table": table},
+        )
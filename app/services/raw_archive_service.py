@@ -0,0 +1,226 @@
+"""Service for moving raw stream payloads to compressed archive files."""
+import gzip
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.clients.archive_storage import (
+    ArchiveStorage,
+    S3ArchiveStorage,
+    get_archive_storage,
+)
+from app.core.config import settings
+from app.models.stream_data import StreamMessage
+from app.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+def _codec(name: str) -> Tuple[str, Callable[[bytes], bytes]]:
+    """Return (file suffix, compress function) for a compression setting."""
+    if name == "zstd":
+        if zstandard is not None:
+            return ".jsonl.zst", zstandard.ZstdCompressor(level=10).compress
+        logger.warning("zstandard is not installed; archiving with gzip")
+    return ".jsonl.gz", lambda data: gzip.compress(data, compresslevel=6)
+
+
+def _decompress(uri: str, data: bytes) -> bytes:
+    """Decompress an archive file according to its suffix."""
+    if uri.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {uri}")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+def archive_key(profile_id: str, day: date) -> str:
+    """Key prefix of the archive files for one profile and day."""
+    return f"profile_id={profile_id}/date={day.isoformat()}/"
+
+
+class RawArchiveService:
+    """Service that archives and reads back raw stream payloads.
+
+    Processed messages older than ``RAW_ARCHIVE_AFTER_DAYS`` are written to
+    compressed JSON Lines files, one file per profile, day and batch, keyed
+    ``profile_id=<id>/date=<YYYY-MM-DD>/<first id>-<last id>.jsonl.gz``. The
+    row keeps its metadata but its ``raw_data`` is replaced by a pointer to
+    the file, which keeps the hot table and its TOAST storage small.
+    """
+
+    def __init__(self, db: Session, storage: Optional[ArchiveStorage] = None):
+        """Initialize raw archive service."""
+        self.db = db
+        self.storage = storage or get_archive_storage()
+
+    def archive(self, max_batches: Optional[int] = None) -> int:
+        """Archive eligible messages batch by batch.
+
+        Returns the number of messages archived.
+        """
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.archive_batch()
+            if not count:
+                break
+            total += count
+            batches += 1
+        if total:
+            logger.info(f"Archived raw payloads of {total} stream messages")
+        return total
+
+    def archive_batch(self, batch_size: Optional[int] = None) -> int:
+        """Archive up to ``batch_size`` eligible messages in one transaction.
+
+        Files are written before the rows are updated, so a failed commit
+        leaves an unreferenced file that the next run overwrites rather than
+        a pointer to nothing. Returns the number of messages archived.
+        """
+        batch_size = batch_size or settings.raw_archive_batch_size
+        cutoff = datetime.utcnow() - timedelta(days=settings.raw_archive_after_days)
+
+        messages = self.db.execute(
+            select(
+                StreamMessage.id,
+                StreamMessage.message_id,
+                StreamMessage.dataset_type,
+                StreamMessage.dataset_name,
+                StreamMessage.profile_id,
+                StreamMessage.created_at,
+                StreamMessage.raw_data,
+            )
+            .where(
+                StreamMessage.created_at < cutoff,
+                StreamMessage.processed.is_(True),
+                StreamMessage.raw_data.isnot(None),
+            )
+            .order_by(StreamMessage.created_at, StreamMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not messages:
+            self.db.rollback()
+            return 0
+
+        groups: Dict[Tuple[str, date], List[Any]] = defaultdict(list)
+        for message in messages:
+            groups[(message.profile_id, message.created_at.date())].append(message)
+
+        suffix, compress = _codec(settings.raw_archive_compression)
+        archived_at = datetime.utcnow()
+        try:
+            for (profile_id, day), group in groups.items():
+                lines = [
+                    json_codec.dumps(
+                        {
+                            "id": message.id,
+                            "message_id": message.message_id,
+                            "dataset_type": message.dataset_type.value,
+                            "dataset_name": message.dataset_name,
+                            "profile_id": message.profile_id,
+                            "created_at": message.created_at.isoformat(),
+                            "raw_data": message.raw_data,
+                        }
+                    )
+                    for message in group
+                ]
+                key = f"{archive_key(profile_id, day)}{group[0].id}-{group[-1].id}{suffix}"
+                uri = self.storage.write(key, compress("\n".join(lines).encode() + b"\n"))
+
+                self.db.execute(
+                    update(StreamMessage)
+                    .where(
+                        StreamMessage.id.in_([message.id for message in group]),
+                        StreamMessage.created_at < cutoff,
+                    )
+                    .values(raw_data=None, raw_data_uri=uri, archived_at=archived_at)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return len(messages)
+
+    def read_raw_data(self, message: StreamMessage) -> Optional[str]:
+        """Return a message's raw payload, from the row or its archive file.
+
+        Decompresses the whole archive file; use ``read_raw_data_many`` for
+        more than one message.
+        """
+        return self.read_raw_data_many([message]).get(message.id)
+
+    def read_raw_data_many(
+        self, messages: Sequence[StreamMessage]
+    ) -> Dict[int, Optional[str]]:
+        """Return raw payloads by message id, reading each archive file once."""
+        payloads: Dict[int, Optional[str]] = {}
+        archived: Dict[str, List[int]] = defaultdict(list)
+        for message in messages:
+            if message.raw_data is None and message.raw_data_uri:
+                archived[message.raw_data_uri].append(message.id)
+            else:
+                payloads[message.id] = message.raw_data
+
+        found = self.read_archived(archived)
+        for message in messages:
+            if message.id in payloads:
+                continue
+            payloads[message.id] = found.get(message.id)
+            if message.id not in found:
+                logger.warning(
+                    f"Message {message.message_id} not found in {message.raw_data_uri}"
+                )
+        return payloads
+
+    def read_archived(self, ids_by_uri: Mapping[str, Iterable[int]]) -> Dict[int, str]:
+        """Return archived payloads by message id, reading each file once."""
+        payloads: Dict[int, str] = {}
+        for uri, ids in ids_by_uri.items():
+            wanted = set(ids)
+            for record in self.read_file(uri):
+                if record["id"] in wanted:
+                    payloads[record["id"]] = record["raw_data"]
+        return payloads
+
+    def iter_archived(
+        self, profile_id: str, start_date: date, end_date: date
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield archived records for a profile from ``start_date`` to ``end_date`` inclusive."""
+        day = start_date
+        while day <= end_date:
+            for uri in self.storage.list(archive_key(profile_id, day)):
+                yield from self.read_file(uri)
+            day += timedelta(days=1)
+
+    def read_file(self, uri: str) -> Iterator[Dict[str, Any]]:
+        """Yield the records of one archive file."""
+        storage = self.storage
+        if uri.startswith("s3://") != isinstance(storage, S3ArchiveStorage):
+            storage = get_archive_storage(uri)
+        data = _decompress(uri, storage.read(uri))
+        for line in data.splitlines():
+            if line:
+                yield json_codec.loads(line)
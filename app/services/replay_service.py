@@ -0,0 +1,312 @@
+"""Service for re-deriving performance data from stored raw messages."""
+import logging
+import os
+import re
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import MetaData, and_, func, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.models.stream_data import (
+    AggregationWatermark,
+    PerformanceData,
+    StreamMessage,
+)
+from app.services.aggregation_service import AggregationService
+from app.services.partition_service import PartitionService
+from app.services.rollup_store import naive_utc
+from app.utils import json_codec
+from app.utils.bulk_writer import BulkWriter
+
+logger = logging.getLogger(__name__)
+
+# (stream message id, raw payload or None, archive file URI or None)
+_SourceRow = Tuple[int, Optional[str], Optional[str]]
+
+_INDEX_NAME = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON \S+ ")
+
+
+def extract_chunk(rows: Sequence[_SourceRow]) -> List[Dict[str, Any]]:
+    """Decode raw messages into PerformanceData rows.
+
+    Runs in replay worker processes. Archived payloads are read once per
+    archive file.
+    """
+    # Imported here so pool workers only pay for what they use
+    from app.services.message_processor import MessageProcessor
+    from app.services.raw_archive_service import RawArchiveService
+
+    archived: Dict[str, List[int]] = defaultdict(list)
+    payloads: Dict[int, str] = {}
+    for stream_message_id, raw_data, raw_data_uri in rows:
+        if raw_data is not None:
+            payloads[stream_message_id] = raw_data
+        elif raw_data_uri:
+            archived[raw_data_uri].append(stream_message_id)
+
+    if archived:
+        payloads.update(RawArchiveService(db=None).read_archived(archived))
+
+    processor = MessageProcessor(db=None)
+    extracted = []
+    for stream_message_id, payload in payloads.items():
+        try:
+            columns = processor.extract_performance_columns(json_codec.loads(payload))
+        except json_codec.DecodeError:
+            logger.warning(f"Skipping undecodable stream message {stream_message_id}")
+            continue
+        if columns is not None:
+            columns["stream_message_id"] = stream_message_id
+            columns["dataset_type"] = columns["dataset_type"].value
+            extracted.append(columns)
+    return extracted
+
+
+class ReplayService:
+    """Service that rebuilds ``performance_data`` partitions from raw messages.
+
+    Each monthly partition overlapping the requested range is replayed on its
+    own: stored messages are streamed in chunks to a process pool running the
+    current ``MessageProcessor`` extraction, and the results are bulk loaded
+    into a standalone shadow table. Rows re-derived from a message keep the
+    id of the row they replace. The swap then runs in one short transaction:
+
+    1. lock the live partition,
+    2. carry over live rows whose message was not replayed (e.g. rows
+       ingested while the shadow was built),
+    3. detach the live partition and attach the shadow with the same bounds.
+
+    Readers see either the old or the new partition, never a mix. DETACH
+    holds an ACCESS EXCLUSIVE lock on ``performance_data``, so the range's
+    aggregates are rebuilt afterwards in a separate transaction holding only
+    the hourly aggregation watermark; until then they still describe the old
+    rows.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        workers: Optional[int] = None,
+        chunk_size: int = 2000,
+        lookahead_days: int = 3,
+    ):
+        """Initialize replay service.
+
+        ``lookahead_days`` extends the message scan past a partition's end,
+        since messages are received some time after the period they report.
+        """
+        self.db = db
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lookahead = timedelta(days=lookahead_days)
+
+    def replay(self, start: datetime, end: datetime, keep_old: bool = False) -> int:
+        """Replay every partition overlapping [start, end).
+
+        Returns the number of rows written to the swapped-in partitions.
+        """
+        partitions = PartitionService(self.db)
+        if not partitions.is_partitioned("performance_data"):
+            raise RuntimeError("performance_data is not partitioned; run migrations first")
+
+        total = 0
+        for name, lower, upper in sorted(
+            partitions.partition_bounds("performance_data"),
+            key=lambda bounds: bounds[2] or datetime.max,
+        ):
+            if (lower is None or lower < end) and (upper is None or upper > start):
+                total += self.replay_partition(name, lower, upper, keep_old=keep_old)
+        return total
+
+    def replay_partition(
+        self,
+        name: str,
+        lower: Optional[datetime],
+        upper: Optional[datetime],
+        keep_old: bool = False,
+    ) -> int:
+        """Rebuild one partition through a shadow table and swap it in.
+
+        Returns the number of rows in the new partition.
+        """
+        shadow = f"{name}_replay"
+        logger.info(f"Replaying partition {name} into {shadow}")
+
+        self.db.execute(text(f"DROP TABLE IF EXISTS {shadow}"))
+        self.db.execute(
+            text(f"CREATE TABLE {shadow} (LIKE performance_data INCLUDING DEFAULTS)")
+        )
+        # Ids are assigned after loading, reusing those of replaced rows
+        self.db.execute(text(f"ALTER TABLE {shadow} ALTER COLUMN id DROP DEFAULT"))
+        self.db.execute(text(f"ALTER TABLE {shadow} ALTER COLUMN id DROP NOT NULL"))
+        self.db.commit()
+
+        loaded = self._load_shadow(name, shadow, lower, upper)
+        self._prepare_shadow(name, shadow, lower, upper)
+        count = self._swap(name, shadow, lower, upper, keep_old)
+        if count:
+            self._rebuild_aggregates(lower, upper)
+        logger.info(f"Replayed {name}: {loaded} rows re-derived, {count} rows in total")
+        return count
+
+    def _load_shadow(
+        self,
+        name: str,
+        shadow: str,
+        lower: Optional[datetime],
+        upper: Optional[datetime],
+    ) -> int:
+        """Extract messages in parallel and COPY rows inside the bounds."""
+        shadow_table = PerformanceData.__table__.to_metadata(MetaData(), name=shadow)
+
+        received = [StreamMessage.created_at >= lower] if lower else []
+        if upper:
+            received.append(StreamMessage.created_at < upper + self.lookahead)
+        replaced = select(text("stream_message_id")).select_from(text(name))
+        source = (
+            select(StreamMessage.id, StreamMessage.raw_data, StreamMessage.raw_data_uri)
+            .where(or_(StreamMessage.id.in_(replaced), and_(*received)))
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        writer = BulkWriter(self.db)
+        loaded = 0
+        # A separate session streams the source so shadow batches can commit
+        with Session(bind=self.db.get_bind()) as reader:
+            chunks = (
+                [tuple(row) for row in partition]
+                for partition in reader.execute(source).partitions()
+            )
+            for rows in self._extract_parallel(chunks):
+                rows = [
+                    row
+                    for row in rows
+                    if (lower is None or naive_utc(row["start_date"]) >= lower)
+                    and (upper is None or naive_utc(row["start_date"]) < upper)
+                ]
+                if rows:
+                    writer.insert(shadow_table, rows)
+                    self.db.commit()
+                    loaded += len(rows)
+        return loaded
+
+    def _extract_parallel(
+        self, chunks: Iterator[List[_SourceRow]]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Run ``extract_chunk`` over chunks with a bounded number in flight."""
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            max_pending = 2 * workers
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(extract_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _prepare_shadow(
+        self,
+        name: str,
+        shadow: str,
+        lower: Optional[datetime],
+        upper: Optional[datetime],
+    ) -> None:
+        """Assign ids, then add the constraints and indexes the partition needs."""
+        self.db.execute(
+            text(
+                f"UPDATE {shadow} AS s SET id = p.id FROM {name} AS p "
+                f"WHERE p.stream_message_id = s.stream_message_id"
+            )
+        )
+        self.db.execute(
+            text(
+                f"UPDATE {shadow} SET id = nextval('performance_data_id_seq') "
+                f"WHERE id IS NULL"
+            )
+        )
+        self.db.execute(text(f"ALTER TABLE {shadow} ALTER COLUMN id SET NOT NULL"))
+
+        # A matching CHECK lets ATTACH PARTITION skip its validation scan
+        bounds = []
+        if lower:
+            bounds.append(f"start_date >= '{lower.isoformat(' ')}'")
+        if upper:
+            bounds.append(f"start_date < '{upper.isoformat(' ')}'")
+        if bounds:
+            self.db.execute(
+                text(
+                    f"ALTER TABLE {shadow} ADD CONSTRAINT {shadow}_bounds "
+                    f"CHECK ({' AND '.join(bounds)})"
+                )
+            )
+
+        # Same indexes as the live partition so ATTACH adopts them
+        definitions = self.db.scalars(
+            text("SELECT indexdef FROM pg_indexes WHERE tablename = :name"),
+            {"name": name},
+        ).all()
+        for definition in definitions:
+            unnamed = _INDEX_NAME.sub(
+                lambda match: f"CREATE {match[1] or ''}INDEX ON {shadow} ", definition
+            )
+            self.db.execute(text(unnamed))
+        self.db.commit()
+
+    def _swap(
+        self,
+        name: str,
+        shadow: str,
+        lower: Optional[datetime],
+        upper: Optional[datetime],
+        keep_old: bool,
+    ) -> int:
+        """Swap the shadow in for the live partition in one transaction."""
+        self.db.execute(text(f"LOCK TABLE {name} IN EXCLUSIVE MODE"))
+        self.db.execute(
+            text(
+                f"INSERT INTO {shadow} SELECT * FROM {name} AS p WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {shadow} AS s WHERE s.stream_message_id = p.stream_message_id)"
+            )
+        )
+
+        lower_sql = f"'{lower.isoformat(' ')}'" if lower else "MINVALUE"
+        upper_sql = f"'{upper.isoformat(' ')}'" if upper else "MAXVALUE"
+        self.db.execute(text(f"ALTER TABLE performance_data DETACH PARTITION {name}"))
+        self.db.execute(text(f"ALTER TABLE {name} RENAME TO {name}_replaced"))
+        self.db.execute(text(f"ALTER TABLE {shadow} RENAME TO {name}"))
+        self.db.execute(
+            text(
+                f"ALTER TABLE performance_data ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ({lower_sql}) TO ({upper_sql})"
+            )
+        )
+        if not keep_old:
+            self.db.execute(text(f"DROP TABLE {name}_replaced"))
+
+        count = self.db.scalar(text(f"SELECT count(*) FROM {name}"))
+        self.db.commit()
+        return count
+
+    def _rebuild_aggregates(self, lower: Optional[datetime], upper: Optional[datetime]) -> None:
+        """Rebuild the swapped range's aggregates from rows up to the watermark.
+
+        The watermark is locked so the incremental job cannot add rows to the
+        range while it is rebuilt; rows above it are added by its next run.
+        """
+        watermark = self.db.scalars(
+            select(AggregationWatermark)
+            .where(AggregationWatermark.period_type == "hourly")
+            .with_for_update()
+        ).one_or_none()
+        max_id = watermark.last_performance_data_id if watermark else 0
+        if max_id:
+            start_time = lower or self.db.scalar(
+                select(func.min(PerformanceData.start_date))
+            )
+            end_time = upper or datetime.utcnow() + timedelta(days=1)
+            AggregationService(self.db).rebuild_range(start_time, end_time, max_id)
+        self.db.commit()
@@ -0,0 +1,235 @@
+"""In-process hourly and daily rollups maintained at ingest time."""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.stream_data import PerformanceData, StreamDatasetType
+from app.services.aggregation_service import AggregationService
+from app.utils.metrics_calculator import MetricsCalculator
+
+logger = logging.getLogger(__name__)
+
+# Grains maintained at ingest time, matching the SQL rollup from performance_data
+ROLLUP_PERIODS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+
+_RATIO_FIELDS = ("ctr", "cpc", "acos", "roas", "conversion_rate")
+
+_calculator = MetricsCalculator()
+
+
+class _Bucket:
+    """Running sums for one campaign bucket."""
+
+    __slots__ = (
+        "dataset_type",
+        "profile_id",
+        "first_id",
+        "impressions",
+        "clicks",
+        "cost",
+        "sales",
+        "orders",
+        "units_sold",
+        "record_count",
+        "ratio_sums",
+        "ratio_counts",
+    )
+
+    def __init__(self, dataset_type: StreamDatasetType, profile_id: str, first_id: int):
+        self.dataset_type = dataset_type
+        self.profile_id = profile_id
+        self.first_id = first_id
+        self.impressions = 0
+        self.clicks = 0
+        self.cost = Decimal("0")
+        self.sales = Decimal("0")
+        self.orders = 0
+        self.units_sold = 0
+        self.record_count = 0
+        self.ratio_sums = [Decimal("0")] * len(_RATIO_FIELDS)
+        self.ratio_counts = [0] * len(_RATIO_FIELDS)
+
+    def merge(self, other: "_Bucket") -> None:
+        """Fold another bucket's sums into this one."""
+        self.first_id = min(self.first_id, other.first_id)
+        self.impressions += other.impressions
+        self.clicks += other.clicks
+        self.cost += other.cost
+        self.sales += other.sales
+        self.orders += other.orders
+        self.units_sold += other.units_sold
+        self.record_count += other.record_count
+        for i in range(len(_RATIO_FIELDS)):
+            self.ratio_sums[i] += other.ratio_sums[i]
+            self.ratio_counts[i] += other.ratio_counts[i]
+
+
+class RollupStore:
+    """Running hourly and daily sums per campaign, flushed to PerformanceAggregate.
+
+    ``MessageProcessor`` adds every committed PerformanceData row; ``flush``
+    swaps the buckets out and adds them to the hourly and daily aggregates
+    with one multi-row upsert, so dashboards see new data within one flush
+    interval instead of after the next aggregation run. Buckets are keyed by
+    (campaign_id, period_type, period_start) to match the aggregate's unique
+    key, and a row only counts in a bucket it ends inside of, as in the SQL
+    rollup.
+
+    The store is provisional: the hourly watermark job recomputes every
+    hourly and daily bucket touched since its last run, which also repairs
+    buckets whose sums were lost with the process. Weekly and monthly
+    buckets are only refreshed by that job.
+    """
+
+    def __init__(self):
+        """Initialize rollup store."""
+        self._buckets: Dict[Tuple[str, str, datetime], _Bucket] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self.added_count = 0
+        self.skipped_count = 0
+        self.flushed_buckets = 0
+        self.failed_flushes = 0
+
+    def add(self, records: Iterable[PerformanceData]) -> None:
+        """Add committed performance rows to their hourly and daily buckets."""
+        with self._lock:
+            for record in records:
+                start = naive_utc(record.start_date)
+                end = naive_utc(record.end_date)
+                counted = False
+                for period_type, length in ROLLUP_PERIODS.items():
+                    period_start = _truncate(start, period_type)
+                    if end < period_start + length:
+                        self._add_to((record.campaign_id, period_type, period_start), record)
+                        counted = True
+                if counted:
+                    self.added_count += 1
+                else:
+                    self.skipped_count += 1
+
+    def flush(self, db: Session) -> int:
+        """Upsert pending buckets into hourly and daily aggregates.
+
+        Buckets are put back on failure so the next flush retries them.
+        Returns the number of buckets written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                buckets, self._buckets = self._buckets, {}
+            if not buckets:
+                return 0
+
+            try:
+                AggregationService(db).add_to_buckets(
+                    [self._aggregate_row(key, bucket) for key, bucket in buckets.items()]
+                )
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error flushing rollups: {e}", exc_info=True)
+                db.rollback()
+                self.failed_flushes += 1
+                with self._lock:
+                    for key, bucket in buckets.items():
+                        current = self._buckets.get(key)
+                        if current is None:
+                            self._buckets[key] = bucket
+                        else:
+                            current.merge(bucket)
+                return 0
+
+            self.flushed_buckets += len(buckets)
+            logger.debug(f"Flushed {len(buckets)} rollup buckets")
+            return len(buckets)
+
+    def stats(self) -> Dict[str, int]:
+        """Return rollup counters."""
+        with self._lock:
+            pending = len(self._buckets)
+        return {
+            "pending_buckets": pending,
+            "added": self.added_count,
+            "skipped": self.skipped_count,
+            "flushed_buckets": self.flushed_buckets,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def _add_to(self, key: Tuple[str, str, datetime], record: PerformanceData) -> None:
+        """Add one row's sums to a bucket; the caller holds the lock."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(
+                record.dataset_type, record.profile_id, record.id
+            )
+        bucket.first_id = min(bucket.first_id, record.id)
+        bucket.impressions += record.impressions or 0
+        bucket.clicks += record.clicks or 0
+        bucket.cost += record.cost or 0
+        bucket.sales += record.sales or 0
+        bucket.orders += record.orders or 0
+        bucket.units_sold += record.units_sold or 0
+        bucket.record_count += 1
+        for i, field in enumerate(_RATIO_FIELDS):
+            value = getattr(record, field)
+            if value is not None:
+                bucket.ratio_sums[i] += value
+                bucket.ratio_counts[i] += 1
+
+    @staticmethod
+    def _aggregate_row(key: Tuple[str, str, datetime], bucket: _Bucket) -> Dict[str, Any]:
+        """Build PerformanceAggregate column values for a bucket."""
+        campaign_id, period_type, period_start = key
+        row = {
+            "performance_data_id": bucket.first_id,
+            "dataset_type": bucket.dataset_type,
+            "profile_id": bucket.profile_id,
+            "campaign_id": campaign_id,
+            "period_type": period_type,
+            "period_start": period_start,
+            "period_end": period_start + ROLLUP_PERIODS[period_type],
+            "total_impressions": bucket.impressions,
+            "total_clicks": bucket.clicks,
+            "total_cost": bucket.cost,
+            "total_sales": bucket.sales,
+            "total_orders": bucket.orders,
+            "total_units_sold": bucket.units_sold,
+            "record_count": bucket.record_count,
+        }
+        if settings.aggregate_metric_mode == "mean_of_ratios":
+            for field, total, count in zip(
+                _RATIO_FIELDS, bucket.ratio_sums, bucket.ratio_counts
+            ):
+                row[f"avg_{field}"] = total / count if count else None
+        else:
+            metrics = _calculator.calculate_from_totals(
+                impressions=bucket.impressions,
+                clicks=bucket.clicks,
+                cost=bucket.cost,
+                sales=bucket.sales,
+                orders=bucket.orders,
+            )
+            for field in _RATIO_FIELDS:
+                row[f"avg_{field}"] = metrics[field]
+        return row
+
+
+def _truncate(value: datetime, period_type: str) -> datetime:
+    """Start of the hour or day containing ``value``."""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if period_type == "daily" else value
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Normalize to the naive UTC datetimes stored in the database."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+rollup_store = RollupStore()
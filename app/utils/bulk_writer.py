@@ -0,0 +1,172 @@
+"""Bulk inserts through PostgreSQL COPY with an executemany fallback."""
+import io
+import itertools
+import logging
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import Column, Table, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_staging_ids = itertools.count()
+
+
+def _copy_value(value: Any) -> str:
+    """Encode one value for COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, Enum):
+        # SQLAlchemy Enum columns store member names
+        return value.name
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class BulkWriter:
+    """Insert many rows into one table, choosing the cheapest write path.
+
+    Batches of at least ``BULK_COPY_MIN_ROWS`` rows are streamed with COPY
+    into a temporary staging table holding only the supplied columns, then
+    moved with one ``INSERT ... SELECT ... ON CONFLICT``; COPY skips
+    per-row statement parsing and parameter binding entirely. Smaller batches
+    (and non-PostgreSQL databases) use a multi-row executemany INSERT. Both
+    paths run in the session's transaction; the caller commits.
+    """
+
+    def __init__(self, db: Session, copy_min_rows: Optional[int] = None):
+        """Initialize bulk writer."""
+        self.db = db
+        self.copy_min_rows = (
+            settings.bulk_copy_min_rows if copy_min_rows is None else copy_min_rows
+        )
+
+    def insert(
+        self,
+        table: Table,
+        rows: List[Dict[str, Any]],
+        conflict_columns: Sequence[str] = (),
+        returning: Union[None, type, Sequence[Column]] = None,
+    ) -> Optional[List[Any]]:
+        """Insert ``rows``, all with the same keys.
+
+        With ``conflict_columns`` rows that collide on that unique key are
+        skipped. ``returning`` is a mapped class (inserted ORM objects are
+        returned) or a list of columns (result rows are returned). Rows are
+        returned in insert order on the executemany path only.
+        """
+        if not rows:
+            return [] if returning is not None else None
+        if self.use_copy(len(rows)):
+            return self._copy_insert(table, rows, conflict_columns, returning)
+        return self._executemany_insert(table, rows, conflict_columns, returning)
+
+    def use_copy(self, row_count: int) -> bool:
+        """Check whether a batch of ``row_count`` rows goes through COPY."""
+        return (
+            self.copy_min_rows > 0
+            and row_count >= self.copy_min_rows
+            and self.db.get_bind().dialect.name == "postgresql"
+        )
+
+    def _executemany_insert(
+        self,
+        table: Table,
+        rows: List[Dict[str, Any]],
+        conflict_columns: Sequence[str],
+        returning: Union[None, type, Sequence[Column]],
+    ) -> Optional[List[Any]]:
+        # Inserting through the mapped class lets RETURNING load ORM objects
+        stmt = pg_insert(returning if isinstance(returning, type) else table)
+        if conflict_columns:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        if returning is None:
+            self.db.execute(stmt, rows)
+            return None
+        if isinstance(returning, type):
+            return self.db.scalars(
+                stmt.returning(returning, sort_by_parameter_order=True), rows
+            ).all()
+        return self.db.execute(stmt.returning(*returning), rows).all()
+
+    def _copy_insert(
+        self,
+        table: Table,
+        rows: List[Dict[str, Any]],
+        conflict_columns: Sequence[str],
+        returning: Union[None, type, Sequence[Column]],
+    ) -> Optional[List[Any]]:
+        defaults = self._python_defaults(table, rows[0])
+        columns = [*rows[0], *defaults]
+        column_list = ", ".join(columns)
+        staging = f"_bulk_{table.name}_{next(_staging_ids)}"
+
+        connection = self.db.connection()
+        # Staging holds only the written columns, so no sequence is consumed
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table.name} WITH NO DATA"
+        )
+
+        buffer = io.StringIO()
+        for row in rows:
+            values = {**defaults, **row}
+            buffer.write("\t".join(_copy_value(values[column]) for column in columns))
+            buffer.write("\n")
+        buffer.seek(0)
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN", buffer)
+
+        sql = f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging}"
+        if conflict_columns:
+            sql += f" ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+
+        if returning is None:
+            connection.exec_driver_sql(sql)
+            result = None
+        elif isinstance(returning, type):
+            result = self.db.scalars(
+                select(returning).from_statement(text(f"{sql} RETURNING *"))
+            ).all()
+        else:
+            names = ", ".join(column.name for column in returning)
+            result = self.db.execute(
+                text(f"{sql} RETURNING {names}").columns(*returning)
+            ).all()
+
+        connection.exec_driver_sql(f"DROP TABLE {staging}")
+        logger.debug(f"Copied {len(rows)} rows into {table.name}")
+        return result
+
+    @staticmethod
+    def _python_defaults(table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate client-side column defaults that executemany would apply.
+
+        Callable defaults are evaluated once per batch.
+        """
+        defaults = {}
+        for column in table.columns:
+            default = column.default
+            if column.name in row or default is None or default.is_sequence:
+                continue
+            if default.is_scalar:
+                defaults[column.name] = default.arg
+            elif default.is_callable:
+                defaults[column.name] = default.arg(None)
+        return defaults
@@ -0,0 +1,77 @@
+"""Bounded in-memory cache of recently committed message ids."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+
+class DedupCache:
+    """Time-windowed LRU set of message ids known to be stored.
+
+    SQS redeliveries usually arrive within minutes of the original, so a
+    small recent-ids window answers most duplicate checks without touching
+    the database. The cache only ever says "definitely seen"; a miss is not
+    proof that a message is new, so inserts still rely on the
+    ``stream_message_keys`` primary key as the authoritative guard.
+    """
+
+    def __init__(self, max_size: int = 100_000, ttl_seconds: float = 3600.0):
+        """Initialize dedup cache."""
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+
+    def filter_seen(self, message_ids: Iterable[str]) -> List[str]:
+        """Return the ids that are already cached, counting hits and misses."""
+        now = time.monotonic()
+        seen = []
+        with self._lock:
+            for message_id in message_ids:
+                added_at = self._entries.get(message_id)
+                if added_at is not None and now - added_at < self.ttl_seconds:
+                    self._entries.move_to_end(message_id)
+                    seen.append(message_id)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return seen
+
+    def add_many(self, message_ids: Iterable[str]) -> None:
+        """Remember ids whose rows are committed."""
+        now = time.monotonic()
+        with self._lock:
+            for message_id in message_ids:
+                self._entries[message_id] = now
+                self._entries.move_to_end(message_id)
+            self._evict(now)
+
+    def record_conflicts(self, count: int) -> None:
+        """Count duplicates the cache missed but the database rejected."""
+        with self._lock:
+            self.conflicts += count
+
+    def stats(self) -> Dict[str, float]:
+        """Return size and hit/miss/conflict counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "conflicts": self.conflicts,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries from the old end, then enforce max size."""
+        while self._entries:
+            oldest_id, added_at = next(iter(self._entries.items()))
+            if now - added_at < self.ttl_seconds and len(self._entries) <= self.max_size:
+                break
+            del self._entries[oldest_id]
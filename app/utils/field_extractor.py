@@ -0,0 +1,82 @@
+"""Compiled alias-based field extraction for stream payloads."""
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Alias = Union[str, Tuple[str, ...]]
+Plan = Tuple[Tuple[str, Tuple[Alias, ...]], ...]
+
+
+class FieldExtractor:
+    """Maps canonical field names to the first non-null alias in a payload.
+
+    Payloads from the same dataset almost always share one key layout, so
+    instead of probing every alias on every message the extractor compiles a
+    plan per ``(dataset, key layout)``: for each canonical field, only the
+    aliases whose top-level key is actually present, in priority order.
+    Applying a plan is then a handful of direct dict lookups. Nulls are still
+    skipped at lookup time, so results match probing every alias.
+    """
+
+    def __init__(self, fields: Dict[str, Tuple[Alias, ...]], max_plans: int = 512):
+        """Initialize extractor with canonical field -> aliases mapping."""
+        self.fields = fields
+        self.max_plans = max_plans
+        self._plans: Dict[Hashable, Plan] = {}
+
+    def extract(self, data: Any, dataset: Optional[str] = None) -> Dict[str, Any]:
+        """Return a dict of canonical field -> value (None when absent)."""
+        if not isinstance(data, dict):
+            return dict.fromkeys(self.fields)
+
+        key = (dataset, tuple(data))
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._compile(data)
+            if len(self._plans) >= self.max_plans:
+                # Unbounded key layouts would mean a misbehaving producer;
+                # start over rather than grow forever.
+                self._plans.clear()
+            self._plans[key] = plan
+
+        result = {}
+        for field, aliases in plan:
+            value = None
+            for alias in aliases:
+                if alias.__class__ is str:
+                    value = data[alias]
+                else:
+                    value = self._lookup_path(data, alias)
+                if value is not None:
+                    break
+            result[field] = value
+        return result
+
+    def plan_count(self) -> int:
+        """Number of compiled plans currently cached."""
+        return len(self._plans)
+
+    def _compile(self, data: Dict[str, Any]) -> Plan:
+        """Build a plan keeping only aliases reachable from ``data``'s keys."""
+        plan: List[Tuple[str, Tuple[Alias, ...]]] = []
+        for field, aliases in self.fields.items():
+            present = tuple(
+                alias
+                for alias in aliases
+                if (alias if isinstance(alias, str) else alias[0]) in data
+            )
+            plan.append((field, present))
+        logger.debug(f"Compiled extraction plan for keys {sorted(data)}")
+        return tuple(plan)
+
+    @staticmethod
+    def _lookup_path(data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+        """Follow a nested key path, returning None if any step is missing."""
+        current = data
+        for part in path:
+            if isinstance(current, dict) and part in current:
+                current = current[part]
+            else:
+                return None
+        return current
@@ -0,0 +1,81 @@
+"""Pluggable JSON codec for stream payloads.
+
+Uses orjson or msgspec when installed and falls back to the standard
+library otherwise. The backend can be pinned with the ``JSON_CODEC``
+setting (``auto``, ``orjson``, ``msgspec`` or ``json``).
+"""
+import json
+import logging
+from typing import Any, Callable, Tuple, Type, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_loads: Callable[[Union[str, bytes]], Any]
+_dumps: Callable[[Any], str]
+DecodeError: Tuple[Type[Exception], ...]
+BACKEND: str
+
+
+def _use_stdlib() -> None:
+    global _loads, _dumps, DecodeError, BACKEND
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj, separators=(",", ":"))  # noqa: E731
+    DecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+    BACKEND = "json"
+
+
+def _use_orjson() -> None:
+    import orjson
+
+    global _loads, _dumps, DecodeError, BACKEND
+    _loads = orjson.loads
+    _dumps = lambda obj: orjson.dumps(obj).decode()  # noqa: E731
+    DecodeError = (orjson.JSONDecodeError,)
+    BACKEND = "orjson"
+
+
+def _use_msgspec() -> None:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    global _loads, _dumps, DecodeError, BACKEND
+    _loads = decoder.decode
+    _dumps = lambda obj: encoder.encode(obj).decode()  # noqa: E731
+    DecodeError = (msgspec.DecodeError,)
+    BACKEND = "msgspec"
+
+
+def _select_backend(name: str) -> None:
+    """Activate the requested backend, falling back to the stdlib."""
+    candidates = {
+        "orjson": [_use_orjson],
+        "msgspec": [_use_msgspec],
+        "json": [],
+        "auto": [_use_orjson, _use_msgspec],
+    }.get(name.lower(), [])
+
+    for use in candidates:
+        try:
+            use()
+            return
+        except ImportError:
+            if name.lower() != "auto":
+                logger.warning(f"JSON codec '{name}' not installed, using stdlib json")
+    _use_stdlib()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document."""
+    return _loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Encode an object as a compact JSON string."""
+    return _dumps(obj)
+
+
+_select_backend(settings.json_codec)
@@ -1,13 +1,23 @@
 """Utility for calculating performance metrics."""
 import logging
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional
 
 from app.models.stream_data import PerformanceData
 
 logger = logging.getLogger(__name__)
 
 
+class _Totals(NamedTuple):
+    """Plain metric totals accepted wherever a PerformanceData is read."""
+
+    impressions: int
+    clicks: int
+    cost: Decimal
+    sales: Decimal
+    orders: int
+
+
 class MetricsCalculator:
     """Calculates performance metrics from raw data."""
 
@@ -21,6 +31,25 @@ class MetricsCalculator:
             "conversion_rate": self.calculate_conversion_rate(performance_data),
         }
 
+    def calculate_from_totals(
+        self,
+        impressions: int,
+        clicks: int,
+        cost: Decimal,
+        sales: Decimal,
+        orders: int,
+    ) -> Dict[str, Optional[Decimal]]:
+        """Calculate all metrics from raw totals without an ORM instance."""
+        return self.calculate_metrics(
+            _Totals(
+                impressions=impressions,
+                clicks=clicks,
+                cost=cost,
+                sales=sales,
+                orders=orders,
+            )
+        )
+
     def calculate_ctr(self, performance_data: PerformanceData) -> Optional[Decimal]:
         """Calculate Click-Through Rate (CTR)."""
         if performance_data.impressions == 0:
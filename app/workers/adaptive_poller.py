@@ -0,0 +1,99 @@
+"""Queue-depth driven scaling for the SQS consumer engine."""
+import logging
+import math
+import threading
+from typing import Any, Dict, Optional
+
+from app.clients.base import SQSClientInterface
+from app.workers.consumer_engine import SQSConsumerEngine
+
+logger = logging.getLogger(__name__)
+
+# SQS caps long polling at 20 seconds
+MAX_WAIT_TIME_SECONDS = 20
+
+
+class AdaptivePoller:
+    """Scales receiver concurrency and poll cadence with queue backlog.
+
+    Every ``check_interval_seconds`` the poller reads
+    ApproximateNumberOfMessages and activates one receiver per
+    ``backlog_per_receiver`` waiting messages, between ``min_receivers`` and
+    the engine's receiver count. An idle queue is served by a single receiver
+    doing full 20 second long polls; under backlog receivers use short waits
+    so they loop as fast as the processors drain.
+    """
+
+    def __init__(
+        self,
+        engine: SQSConsumerEngine,
+        sqs_client: SQSClientInterface,
+        min_receivers: int = 1,
+        backlog_per_receiver: int = 100,
+        check_interval_seconds: float = 15.0,
+        busy_wait_time_seconds: int = 1,
+    ):
+        """Initialize adaptive poller."""
+        self.engine = engine
+        self.sqs_client = sqs_client
+        self.min_receivers = max(1, min_receivers)
+        self.backlog_per_receiver = max(1, backlog_per_receiver)
+        self.check_interval_seconds = check_interval_seconds
+        self.busy_wait_time_seconds = busy_wait_time_seconds
+
+        self.backlog: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Size the engine once, then keep adjusting in the background."""
+        self.adjust()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sqs-adaptive-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop adjusting."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def adjust(self) -> None:
+        """Read queue depth and rescale the engine."""
+        depth = self.sqs_client.get_queue_depth()
+        if depth is None:
+            # Keep the current sizing if the depth cannot be read
+            return
+
+        self.backlog = depth
+        target = min(
+            max(self.min_receivers, math.ceil(depth / self.backlog_per_receiver)),
+            self.engine.receiver_count,
+        )
+        self.engine.wait_time_seconds = (
+            MAX_WAIT_TIME_SECONDS if depth == 0 else self.busy_wait_time_seconds
+        )
+
+        if target != self.engine.active_receivers:
+            logger.info(f"Scaling SQS receivers to {target} (backlog ~{depth})")
+            self.engine.set_active_receivers(target)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current concurrency and backlog estimate."""
+        return {
+            "backlog": self.backlog,
+            "active_receivers": self.engine.active_receivers,
+            "max_receivers": self.engine.receiver_count,
+            "wait_time_seconds": self.engine.wait_time_seconds,
+        }
+
+    def _run(self) -> None:
+        """Adjust periodically until stopped."""
+        while not self._stop.wait(self.check_interval_seconds):
+            try:
+                self.adjust()
+            except Exception as e:
+                logger.error(f"Error adjusting SQS polling: {e}", exc_info=True)
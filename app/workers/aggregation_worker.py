@@ -3,6 +3,7 @@ import logging
 
 from app.core.database import SessionLocal
 from app.services.aggregation_service import AggregationService
+from app.services.rollup_store import rollup_store
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +16,14 @@ class AggregationWorker:
         db = SessionLocal()
         try:
             service = AggregationService(db)
-            service.aggregate_hourly(hours=24)
+            service.aggregate_incremental()
         except Exception as e:
             logger.error(f"Error in hourly aggregation: {e}", exc_info=True)
         finally:
             db.close()
 
     def aggregate_daily(self):
-        """Run daily aggregation."""
+        """Recompute daily, weekly and monthly rollups for the last week."""
         db = SessionLocal()
         try:
             service = AggregationService(db)
@@ -32,3 +33,12 @@ class AggregationWorker:
         finally:
             db.close()
 
+    def flush_rollups(self):
+        """Write streaming rollups to hourly and daily aggregates."""
+        db = SessionLocal()
+        try:
+            rollup_store.flush(db)
+        except Exception as e:
+            logger.error(f"Error flushing rollups: {e}", exc_info=True)
+        finally:
+            db.close()
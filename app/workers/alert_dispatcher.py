@@ -0,0 +1,280 @@
+"""Asyncio delivery of stored alerts to Slack."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select, update
+
+from app.clients.async_slack_client import AsyncSlackClient, SlackRejectedError
+from app.clients.base import AsyncSlackClientInterface
+from app.clients.slack_client import MAX_BLOCKS, digest_payload
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.stream_data import Alert
+
+logger = logging.getLogger(__name__)
+
+
+class AlertDispatcher:
+    """Drains unsent alerts from the ``alerts`` table to Slack.
+
+    ``AlertService`` only stores alerts with ``sent = false``; this outbox
+    dispatcher runs on the FastAPI event loop, so ingestion never waits on
+    Slack. Each round leases pending alerts in a short transaction
+    (``FOR UPDATE SKIP LOCKED`` plus ``claimed_until``, so concurrent
+    dispatchers never post the same alert), posts them with no transaction
+    open as digests of up to ``SLACK_DIGEST_MAX_ALERTS`` alerts per message,
+    then records the outcome in a second short transaction. The leases of
+    the round's undelivered alerts are renewed before every post, which
+    settings validation guarantees outlasts one post with all its retries;
+    alerts whose lease was lost to another dispatcher are dropped from the
+    round. A digest Slack rejects is retried alert by alert and the alerts
+    Slack still rejects are marked failed, so one malformed alert never
+    blocks the rest. Rate limits and server errors end the round and release
+    the remaining leases; leases of a dispatcher that dies expire after
+    ``ALERT_DISPATCH_LEASE_SECONDS``. Alerts older than
+    ``ALERT_DELIVERY_MAX_AGE_MINUTES`` are no longer sent.
+    """
+
+    def __init__(self, slack_client: Optional[AsyncSlackClientInterface] = None):
+        """Initialize alert dispatcher."""
+        self.slack_client = slack_client or AsyncSlackClient()
+        self.interval_seconds = settings.alert_dispatch_interval_seconds
+        self.batch_size = settings.alert_dispatch_batch_size
+        self.lease = timedelta(seconds=settings.alert_dispatch_lease_seconds)
+        self.digest_size = max(1, min(settings.slack_digest_max_alerts, MAX_BLOCKS - 2))
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # claimed_until of the current round's leases
+        self._lease_until: Optional[datetime] = None
+
+        self.delivered_count = 0
+        self.digest_count = 0
+        self.rejected_count = 0
+        self.lost_lease_count = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatch task is active."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Spawn the dispatch task on the running loop."""
+        if self.running:
+            logger.warning("Alert dispatcher is already running")
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="alert-dispatcher")
+        logger.info("Alert dispatcher started")
+
+    async def stop(self) -> None:
+        """Stop dispatching; pending alerts stay in the table."""
+        self._stop.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.slack_client.close()
+        logger.info("Alert dispatcher stopped")
+
+    def stats(self) -> Dict[str, int]:
+        """Return dispatcher counters."""
+        return {
+            "delivered": self.delivered_count,
+            "digests": self.digest_count,
+            "rejected": self.rejected_count,
+            "lost_leases": self.lost_lease_count,
+        }
+
+    async def dispatch_once(self) -> bool:
+        """Deliver one round of pending alerts.
+
+        Returns True when more alerts may be waiting.
+        """
+        claimed = await asyncio.to_thread(self._claim)
+        if not claimed:
+            return False
+
+        # Undelivered alerts of this round, in id order
+        pending = dict(claimed)
+        sent_ids: List[int] = []
+        rejected_ids: List[int] = []
+        try:
+            while pending:
+                chunk = list(pending.items())[: self.digest_size]
+                if not await self._deliver(chunk, pending, sent_ids, rejected_ids):
+                    # Slack is failing; leave the rest for the next round
+                    break
+        finally:
+            await asyncio.to_thread(self._finish, sent_ids, rejected_ids, list(pending))
+
+        self.delivered_count += len(sent_ids)
+        self.rejected_count += len(rejected_ids)
+        if sent_ids:
+            logger.info(f"Sent {len(sent_ids)} alerts to Slack")
+        return not pending and len(claimed) == self.batch_size
+
+    async def _run(self) -> None:
+        """Dispatch rounds until stopped."""
+        while not self._stop.is_set():
+            try:
+                more = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Error dispatching alerts: {e}", exc_info=True)
+                more = False
+            if more:
+                continue
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(
+        self,
+        chunk: List[Tuple[int, Dict[str, Any]]],
+        pending: Dict[int, Dict[str, Any]],
+        sent_ids: List[int],
+        rejected_ids: List[int],
+    ) -> bool:
+        """Post ``chunk`` as one digest, recording sent and rejected alert ids.
+
+        Alerts leave ``pending`` once delivered, rejected or lost to another
+        dispatcher. A rejected digest is split into single-alert posts to
+        find the alerts Slack refuses. Returns False when Slack is failing.
+        """
+        await self._renew_leases(pending)
+        chunk = [entry for entry in chunk if entry[0] in pending]
+        if not chunk:
+            return True
+
+        try:
+            delivered = await self.slack_client.send_payload(
+                digest_payload([item for _, item in chunk])
+            )
+        except SlackRejectedError as e:
+            if len(chunk) == 1:
+                logger.error(f"Slack rejected alert {chunk[0][0]}; not retrying it: {e}")
+                rejected_ids.append(chunk[0][0])
+                del pending[chunk[0][0]]
+                return True
+            logger.warning(f"Slack rejected a digest of {len(chunk)} alerts; posting singly")
+            for entry in chunk:
+                if not await self._deliver([entry], pending, sent_ids, rejected_ids):
+                    return False
+            return True
+
+        if delivered:
+            for alert_id, _ in chunk:
+                sent_ids.append(alert_id)
+                del pending[alert_id]
+            self.digest_count += 1
+        return delivered
+
+    async def _renew_leases(self, pending: Dict[int, Dict[str, Any]]) -> None:
+        """Extend the leases of ``pending`` alerts, dropping any no longer held."""
+        held = await asyncio.to_thread(self._extend_leases, list(pending))
+        lost = [alert_id for alert_id in pending if alert_id not in held]
+        if lost:
+            logger.warning(f"Lost the lease on {len(lost)} alerts to another dispatcher")
+            self.lost_lease_count += len(lost)
+            for alert_id in lost:
+                del pending[alert_id]
+
+    def _claim(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Lease the oldest pending alerts no other dispatcher holds.
+
+        Returns ``(alert id, digest item)`` pairs in id order.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=settings.alert_delivery_max_age_minutes)
+        db = SessionLocal()
+        try:
+            alerts = db.scalars(
+                select(Alert)
+                .where(
+                    Alert.sent.is_(False),
+                    Alert.delivery_failed_at.is_(None),
+                    Alert.created_at >= cutoff,
+                    or_(Alert.claimed_until.is_(None), Alert.claimed_until < now),
+                )
+                .order_by(Alert.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            claimed = [(alert.id, _digest_item(alert)) for alert in alerts]
+            self._lease_until = now + self.lease
+            if claimed:
+                db.execute(
+                    update(Alert)
+                    .where(Alert.id.in_([alert_id for alert_id, _ in claimed]))
+                    .values(claimed_until=self._lease_until)
+                )
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _extend_leases(self, alert_ids: List[int]) -> Set[int]:
+        """Push back the leases this round still holds; return their alert ids."""
+        lease_until = datetime.utcnow() + self.lease
+        db = SessionLocal()
+        try:
+            held = db.scalars(
+                update(Alert)
+                .where(Alert.id.in_(alert_ids), Alert.claimed_until == self._lease_until)
+                .values(claimed_until=lease_until)
+                .returning(Alert.id)
+            ).all()
+            db.commit()
+            self._lease_until = lease_until
+            return set(held)
+        finally:
+            db.close()
+
+    def _finish(
+        self, sent_ids: List[int], rejected_ids: List[int], released_ids: List[int]
+    ) -> None:
+        """Record delivery outcomes and drop the leases."""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            for alert_ids, values in (
+                (sent_ids, {"sent": True, "sent_at": now}),
+                (rejected_ids, {"delivery_failed_at": now}),
+            ):
+                if alert_ids:
+                    db.execute(
+                        update(Alert)
+                        .where(Alert.id.in_(alert_ids))
+                        .values(claimed_until=None, **values)
+                    )
+            if released_ids:
+                # Leases another dispatcher has taken over are not ours to drop
+                db.execute(
+                    update(Alert)
+                    .where(Alert.id.in_(released_ids), Alert.claimed_until == self._lease_until)
+                    .values(claimed_until=None)
+                )
+            db.commit()
+        finally:
+            db.close()
+
+
+def _digest_item(alert: Alert) -> Dict[str, Any]:
+    """Build ``alert_payload`` arguments for a stored alert."""
+    metrics = {}
+    if alert.metric_value:
+        metrics["Current Value"] = str(alert.metric_value)
+    if alert.previous_value:
+        metrics["Previous Value"] = str(alert.previous_value)
+    if alert.threshold_value:
+        metrics["Threshold"] = str(alert.threshold_value)
+    return {
+        "alert_type": alert.alert_type,
+        "severity": alert.severity,
+        "message": alert.message,
+        "campaign_id": alert.campaign_id,
+        "campaign_name": alert.campaign_name,
+        "metrics": metrics or None,
+    }
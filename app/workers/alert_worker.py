@@ -0,0 +1,34 @@
+"""Worker for alert evaluation state."""
+import logging
+
+from app.core.database import SessionLocal
+from app.services.alert_rules import get_rule_engine
+from app.services.alert_suppressor import alert_suppressor
+from app.services.baseline_cache import baseline_cache
+
+logger = logging.getLogger(__name__)
+
+
+class AlertWorker:
+    """Worker that maintains in-memory alert state."""
+
+    def warm_baselines(self):
+        """Load recent hourly spend and CTR into the baseline cache."""
+        db = SessionLocal()
+        try:
+            baseline_cache.warm(db)
+        except Exception as e:
+            # Alert checks fall back to database lookbacks until warmed
+            logger.error(f"Error warming alert baselines: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    def refresh_suppression(self):
+        """Rebuild the alert suppression index from unacknowledged alerts."""
+        db = SessionLocal()
+        try:
+            alert_suppressor.load(db, get_rule_engine().cooldowns)
+        except Exception as e:
+            logger.error(f"Error refreshing alert suppression: {e}", exc_info=True)
+        finally:
+            db.close()
@@ -0,0 +1,21 @@
+"""Worker for archiving raw stream messages."""
+import logging
+
+from app.core.database import SessionLocal
+from app.services.raw_archive_service import RawArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveWorker:
+    """Worker that moves old raw payloads to archive storage."""
+
+    def archive_raw_messages(self):
+        """Archive processed raw payloads past the configured age."""
+        db = SessionLocal()
+        try:
+            RawArchiveService(db).archive()
+        except Exception as e:
+            logger.error(f"Error archiving raw messages: {e}", exc_info=True)
+        finally:
+            db.close()
@@ -0,0 +1,197 @@
+"""Asyncio SQS ingestion pipeline."""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.clients.async_sqs_client import AsyncSQSClient, AsyncVisibilityTracker
+from app.clients.base import AsyncSQSClientInterface
+from app.clients.sqs_client import MAX_BATCH_ENTRIES
+from app.core.config import settings
+from app.workers.consumer_engine import (
+    RECEIVE_BACKOFF_BASE_SECONDS,
+    RECEIVE_BACKOFF_MAX_SECONDS,
+)
+from app.workers.sqs_worker import process_received_messages
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSQSPipeline:
+    """Receives, persists and acknowledges messages on the event loop.
+
+    Receiver tasks long-poll SQS concurrently and feed a bounded
+    ``asyncio.Queue``. Processor tasks hand each batch to the (blocking)
+    database layer in a worker thread and acknowledge it with
+    DeleteMessageBatch, so receive latency overlaps with database writes.
+    In-flight messages are kept invisible by an ``AsyncVisibilityTracker``
+    heartbeat, and messages that need a retry are released immediately.
+    """
+
+    def __init__(
+        self,
+        sqs_client: Optional[AsyncSQSClientInterface] = None,
+        receiver_count: Optional[int] = None,
+        processor_count: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+    ):
+        """Initialize async pipeline."""
+        self.sqs_client = sqs_client or AsyncSQSClient()
+        self.receiver_count = receiver_count or settings.sqs_receiver_count
+        self.processor_count = processor_count or settings.sqs_processor_count
+        self.batch_size = settings.max_messages_per_poll
+        self.wait_time_seconds = settings.sqs_wait_time_seconds
+
+        self._buffer: asyncio.Queue = asyncio.Queue(
+            maxsize=buffer_size or settings.sqs_buffer_size
+        )
+        self._visibility = AsyncVisibilityTracker(
+            self.sqs_client,
+            visibility_timeout_seconds=settings.sqs_visibility_timeout_seconds,
+            heartbeat_seconds=settings.sqs_visibility_heartbeat_seconds,
+            max_extension_seconds=settings.sqs_visibility_max_extension_seconds,
+        )
+        self._stop = asyncio.Event()
+        self._receivers: List[asyncio.Task] = []
+        self._processors: List[asyncio.Task] = []
+
+        self.received_count = 0
+        self.processed_count = 0
+        self.failed_acks = 0
+        self.receive_errors = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether receiver or processor tasks are active."""
+        return any(not t.done() for t in self._receivers + self._processors)
+
+    async def start(self) -> None:
+        """Spawn receiver and processor tasks on the running loop."""
+        if self.running:
+            logger.warning("Async SQS pipeline is already running")
+            return
+
+        self._stop.clear()
+        self._processors = [
+            asyncio.create_task(self._process_loop(), name=f"sqs-processor-{i}")
+            for i in range(self.processor_count)
+        ]
+        self._receivers = [
+            asyncio.create_task(self._receive_loop(), name=f"sqs-receiver-{i}")
+            for i in range(self.receiver_count)
+        ]
+        logger.info(
+            f"Async SQS pipeline started with {self.receiver_count} receivers "
+            f"and {self.processor_count} processors"
+        )
+
+    async def stop(self) -> None:
+        """Stop receiving, drain buffered messages and close the client."""
+        self._stop.set()
+        if self._receivers:
+            _, pending = await asyncio.wait(
+                self._receivers, timeout=settings.sqs_shutdown_timeout_seconds
+            )
+            # Receivers stuck in a long poll are cancelled; unacknowledged
+            # messages simply become visible again on the queue.
+            for task in pending:
+                task.cancel()
+
+        try:
+            await asyncio.wait_for(
+                self._buffer.join(), timeout=settings.sqs_shutdown_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Async SQS pipeline stopped with {self._buffer.qsize()} buffered messages"
+            )
+
+        for task in self._processors:
+            task.cancel()
+        await asyncio.gather(*self._receivers, *self._processors, return_exceptions=True)
+        # Messages still buffered go straight back to the queue
+        await self._visibility.close()
+        await self.sqs_client.close()
+        logger.info("Async SQS pipeline stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pipeline counters."""
+        return {
+            "receivers": self.receiver_count,
+            "processors": self.processor_count,
+            "buffered": self._buffer.qsize(),
+            "received": self.received_count,
+            "processed": self.processed_count,
+            "failed_acks": self.failed_acks,
+            "receive_errors": self.receive_errors,
+            "visibility": self._visibility.stats(),
+        }
+
+    async def _receive_loop(self) -> None:
+        """Long-poll SQS and push messages into the buffer."""
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                messages = await self.sqs_client.receive_messages(
+                    max_messages=self.batch_size,
+                    wait_time_seconds=self.wait_time_seconds,
+                )
+            except Exception as e:
+                logger.error(f"Error receiving messages: {e}", exc_info=True)
+                self.receive_errors += 1
+                delay = min(
+                    RECEIVE_BACKOFF_BASE_SECONDS * 2**failures, RECEIVE_BACKOFF_MAX_SECONDS
+                )
+                failures += 1
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            failures = 0
+
+            self.received_count += len(messages)
+            self._visibility.track([m["receipt_handle"] for m in messages])
+            for message in messages:
+                await self._buffer.put(message)
+
+    async def _process_loop(self) -> None:
+        """Drain the buffer in batches, persist them and acknowledge."""
+        while True:
+            batch = [await self._buffer.get()]
+            while len(batch) < self.batch_size and not self._buffer.empty():
+                batch.append(self._buffer.get_nowait())
+
+            try:
+                try:
+                    processed, receipt_handles, retry_handles = await asyncio.to_thread(
+                        process_received_messages, batch
+                    )
+                except Exception:
+                    # Nothing was acknowledged; hand the whole batch back for retry
+                    await self._visibility.release([m["receipt_handle"] for m in batch])
+                    raise
+                self.processed_count += processed
+                self._visibility.untrack(receipt_handles)
+                await self._acknowledge(receipt_handles)
+                if retry_handles:
+                    await self._visibility.release(retry_handles)
+            except Exception as e:
+                logger.error(f"Error handling message batch: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._buffer.task_done()
+
+    async def _acknowledge(self, receipt_handles: List[str]) -> None:
+        """Delete handles in batches of 10, retrying only failed entries."""
+        for i in range(0, len(receipt_handles), MAX_BATCH_ENTRIES):
+            remaining = receipt_handles[i : i + MAX_BATCH_ENTRIES]
+            remaining, dropped = await self.sqs_client.delete_message_batch(remaining)
+            self.failed_acks += len(dropped)
+            for attempt in range(settings.sqs_ack_max_retries):
+                if not remaining:
+                    break
+                await asyncio.sleep(0.1 * 2**attempt)
+                remaining, dropped = await self.sqs_client.delete_message_batch(remaining)
+                self.failed_acks += len(dropped)
+            self.failed_acks += len(remaining)
+
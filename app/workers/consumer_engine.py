@@ -0,0 +1,204 @@
+"""Multi-consumer SQS polling engine."""
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from app.clients.base import SQSClientInterface
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[List[Dict[str, Any]]], Any]
+
+# Delay after a failed receive doubles per consecutive failure up to the cap
+RECEIVE_BACKOFF_BASE_SECONDS = 1.0
+RECEIVE_BACKOFF_MAX_SECONDS = 30.0
+
+
+class SQSConsumerEngine:
+    """Runs N long-polling receivers feeding M processing workers.
+
+    Receivers push messages into a bounded in-process buffer; when the buffer
+    is full they block, which stops them from pulling more work off the queue
+    than the processors can keep up with. Processors drain the buffer in
+    batches and hand each batch to ``handler``.
+    """
+
+    def __init__(
+        self,
+        sqs_client: SQSClientInterface,
+        handler: MessageHandler,
+        receiver_count: int = 2,
+        processor_count: int = 4,
+        buffer_size: int = 200,
+        batch_size: int = 10,
+        wait_time_seconds: int = 20,
+    ):
+        """Initialize consumer engine."""
+        self.sqs_client = sqs_client
+        self.handler = handler
+        self.receiver_count = max(1, receiver_count)
+        self.processor_count = max(1, processor_count)
+        self.batch_size = max(1, batch_size)
+        self.wait_time_seconds = wait_time_seconds
+
+        self._active_receivers = self.receiver_count
+        self._receiver_gate = threading.Condition()
+
+        self._buffer: queue.Queue = queue.Queue(maxsize=max(1, buffer_size))
+        self._stop_receiving = threading.Event()
+        self._stop_processing = threading.Event()
+        self._receivers: List[threading.Thread] = []
+        self._processors: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._received_count = 0
+        self._handled_count = 0
+        self._failed_batches = 0
+        self._receive_errors = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether any receiver or processor thread is alive."""
+        return any(t.is_alive() for t in self._receivers + self._processors)
+
+    @property
+    def active_receivers(self) -> int:
+        """Number of receivers currently allowed to poll."""
+        return self._active_receivers
+
+    def set_active_receivers(self, count: int) -> None:
+        """Scale polling between one and ``receiver_count`` receivers."""
+        with self._receiver_gate:
+            self._active_receivers = min(max(1, count), self.receiver_count)
+            self._receiver_gate.notify_all()
+
+    def start(self) -> None:
+        """Start receiver and processor threads."""
+        if self.running:
+            logger.warning("Consumer engine is already running")
+            return
+
+        self._stop_receiving.clear()
+        self._stop_processing.clear()
+
+        self._processors = [
+            threading.Thread(
+                target=self._process_loop, name=f"sqs-processor-{i}", daemon=True
+            )
+            for i in range(self.processor_count)
+        ]
+        self._receivers = [
+            threading.Thread(
+                target=self._receive_loop,
+                args=(i,),
+                name=f"sqs-receiver-{i}",
+                daemon=True,
+            )
+            for i in range(self.receiver_count)
+        ]
+        for thread in self._processors + self._receivers:
+            thread.start()
+
+        logger.info(
+            f"Consumer engine started with {self.receiver_count} receivers "
+            f"and {self.processor_count} processors"
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop receiving and drain buffered messages before returning."""
+        self._stop_receiving.set()
+        with self._receiver_gate:
+            self._receiver_gate.notify_all()
+        for thread in self._receivers:
+            thread.join(timeout)
+
+        # Processors exit once the buffer is empty
+        self._stop_processing.set()
+        for thread in self._processors:
+            thread.join(timeout)
+
+        logger.info(
+            f"Consumer engine stopped ({self._handled_count} messages handled, "
+            f"{self._buffer.qsize()} left in buffer)"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Return engine counters."""
+        with self._lock:
+            return {
+                "receivers": self.receiver_count,
+                "active_receivers": self._active_receivers,
+                "wait_time_seconds": self.wait_time_seconds,
+                "processors": self.processor_count,
+                "buffered": self._buffer.qsize(),
+                "received": self._received_count,
+                "handled": self._handled_count,
+                "failed_batches": self._failed_batches,
+                "receive_errors": self._receive_errors,
+            }
+
+    def _receive_loop(self, index: int) -> None:
+        """Long-poll SQS and push messages into the buffer."""
+        failures = 0
+        while not self._stop_receiving.is_set():
+            # Receivers beyond the active count park until scaled back up
+            with self._receiver_gate:
+                while index >= self._active_receivers and not self._stop_receiving.is_set():
+                    self._receiver_gate.wait()
+            if self._stop_receiving.is_set():
+                return
+
+            try:
+                messages = self.sqs_client.receive_messages(
+                    max_messages=self.batch_size,
+                    wait_time_seconds=self.wait_time_seconds,
+                )
+            except Exception as e:
+                logger.error(f"Error receiving messages: {e}", exc_info=True)
+                with self._lock:
+                    self._receive_errors += 1
+                delay = min(
+                    RECEIVE_BACKOFF_BASE_SECONDS * 2**failures, RECEIVE_BACKOFF_MAX_SECONDS
+                )
+                failures += 1
+                self._stop_receiving.wait(delay)
+                continue
+            failures = 0
+
+            if messages:
+                with self._lock:
+                    self._received_count += len(messages)
+
+            # Blocking put applies backpressure; processors keep draining
+            # until every receiver has exited, so this cannot deadlock.
+            for message in messages:
+                self._buffer.put(message)
+
+    def _process_loop(self) -> None:
+        """Drain the buffer in batches and hand them to the handler."""
+        while True:
+            try:
+                first = self._buffer.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop_processing.is_set():
+                    return
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._buffer.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.handler(batch)
+                with self._lock:
+                    self._handled_count += len(batch)
+            except Exception as e:
+                with self._lock:
+                    self._failed_batches += 1
+                logger.error(f"Error handling message batch: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._buffer.task_done()
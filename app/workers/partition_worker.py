@@ -0,0 +1,24 @@
+"""Worker for partition maintenance."""
+import logging
+
+from app.core.database import SessionLocal
+from app.services.partition_service import PartitionService
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionWorker:
+    """Worker that creates upcoming partitions and applies retention."""
+
+    def maintain_partitions(self):
+        """Create upcoming partitions, then drop expired ones."""
+        db = SessionLocal()
+        try:
+            service = PartitionService(db)
+            service.ensure_partitions()
+            service.drop_expired()
+        except Exception as e:
+            logger.error(f"Error in partition maintenance: {e}", exc_info=True)
+            db.rollback()
+        finally:
+            db.close()
@@ -1,11 +1,16 @@
 """Scheduler for background tasks."""
 import logging
+from datetime import datetime
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.core.config import settings
 from app.workers.sqs_worker import SQSWorker
 from app.workers.aggregation_worker import AggregationWorker
+from app.workers.alert_worker import AlertWorker
+from app.workers.archive_worker import ArchiveWorker
+from app.workers.partition_worker import PartitionWorker
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +18,15 @@ logger = logging.getLogger(__name__)
 _scheduler: BackgroundScheduler = None
 _sqs_worker: SQSWorker = None
 _aggregation_worker: AggregationWorker = None
+_partition_worker: PartitionWorker = None
+_archive_worker: ArchiveWorker = None
+_alert_worker: AlertWorker = None
 
 
 def start_scheduler():
     """Start the background scheduler."""
-    global _scheduler, _sqs_worker, _aggregation_worker
+    global _scheduler, _sqs_worker, _aggregation_worker, _partition_worker, _archive_worker
+    global _alert_worker
 
     if _scheduler and _scheduler.running:
         logger.warning("Scheduler is already running")
@@ -26,15 +35,9 @@ def start_scheduler():
     _scheduler = BackgroundScheduler()
     _sqs_worker = SQSWorker()
     _aggregation_worker = AggregationWorker()
-
-    # Schedule SQS polling
-    _scheduler.add_job(
-        func=_sqs_worker.process_messages,
-        trigger=IntervalTrigger(seconds=settings.sqs_poll_interval_seconds),
-        id="sqs_poller",
-        name="SQS Message Poller",
-        replace_existing=True,
-    )
+    _partition_worker = PartitionWorker()
+    _archive_worker = ArchiveWorker()
+    _alert_worker = AlertWorker()
 
     # Schedule hourly aggregation (runs every hour)
     _scheduler.add_job(
@@ -54,8 +57,53 @@ def start_scheduler():
         replace_existing=True,
     )
 
+    # Create upcoming partitions and drop expired ones (runs at startup, then daily)
+    _scheduler.add_job(
+        func=_partition_worker.maintain_partitions,
+        trigger=IntervalTrigger(days=1),
+        id="partition_maintenance",
+        name="Partition Maintenance",
+        next_run_time=datetime.now(),
+        replace_existing=True,
+    )
+
+    if settings.raw_archive_enabled:
+        _scheduler.add_job(
+            func=_archive_worker.archive_raw_messages,
+            trigger=IntervalTrigger(hours=1),
+            id="raw_archive",
+            name="Raw Message Archive",
+            replace_existing=True,
+        )
+
+    if settings.streaming_rollup_enabled:
+        _scheduler.add_job(
+            func=_aggregation_worker.flush_rollups,
+            trigger=IntervalTrigger(seconds=settings.streaming_rollup_flush_seconds),
+            id="rollup_flush",
+            name="Streaming Rollup Flush",
+            replace_existing=True,
+        )
+
+    if settings.alert_baseline_cache_enabled:
+        # Warm before ingestion starts so no committed rows are missed
+        _alert_worker.warm_baselines()
+
+    # Load recent alerts before ingestion starts, then pick up acknowledgements
+    _alert_worker.refresh_suppression()
+    _scheduler.add_job(
+        func=_alert_worker.refresh_suppression,
+        trigger=IntervalTrigger(seconds=settings.alert_suppression_refresh_seconds),
+        id="alert_suppression_refresh",
+        name="Alert Suppression Refresh",
+        replace_existing=True,
+    )
+
     _scheduler.start()
-    _sqs_worker.start()
+    # SQS polling runs on the worker's own consumer engine threads, unless
+    # the asyncio pipeline owns ingestion inside the FastAPI lifespan
+    if not settings.sqs_async_pipeline_enabled:
+        _sqs_worker.start()
     logger.info("Background scheduler started")
 
 
@@ -70,3 +118,14 @@ def stop_scheduler():
         _scheduler.shutdown()
         logger.info("Background scheduler stopped")
 
+    if _aggregation_worker and settings.streaming_rollup_enabled:
+        # Rows ingested since the last interval would otherwise wait for the
+        # next hourly aggregation run
+        _aggregation_worker.flush_rollups()
+
+
+def get_worker_stats() -> dict:
+    """Return SQS worker counters for monitoring."""
+    if not _sqs_worker:
+        return {}
+    return _sqs_worker.stats()
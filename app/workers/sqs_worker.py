@@ -1,6 +1,6 @@
 """SQS worker for processing messages."""
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -8,11 +8,66 @@ from app.clients.sqs_client import SQSClient
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.services.alert_service import AlertService
-from app.services.message_processor import MessageProcessor
+from app.services.alert_suppressor import alert_suppressor
+from app.services.baseline_cache import baseline_cache
+from app.services.message_processor import MessageProcessor, dedup_cache
+from app.services.rollup_store import rollup_store
+from app.workers.adaptive_poller import AdaptivePoller
+from app.workers.consumer_engine import SQSConsumerEngine
 
 logger = logging.getLogger(__name__)
 
 
+def process_received_messages(
+    messages: List[Dict[str, Any]]
+) -> Tuple[int, List[str], List[str]]:
+    """Persist and alert on received messages.
+
+    Returns the number of messages that produced performance data, the
+    receipt handles that are safe to delete from the queue and the receipt
+    handles that should be retried.
+    """
+    processed_count = 0
+    receipt_handles: List[str] = []
+    retry_handles: List[str] = []
+    db: Session = SessionLocal()
+
+    try:
+        processor = MessageProcessor(db)
+        alert_service = AlertService(db)
+
+        raw_bodies = (
+            [m.get("raw_body") for m in messages] if settings.store_raw_sqs_body else None
+        )
+        results = processor.process_batch([m["body"] for m in messages], raw_bodies)
+
+        alerts_checked = True
+        try:
+            # Check for alerts across the whole batch
+            alert_service.check_batch(results)
+        except Exception as e:
+            logger.error(f"Error checking alerts for batch: {e}", exc_info=True)
+            alerts_checked = False
+
+        for message, performance_data in zip(messages, results):
+            if performance_data:
+                if not alerts_checked:
+                    # Don't delete message on error - let it be retried
+                    retry_handles.append(message["receipt_handle"])
+                    continue
+                processed_count += 1
+
+            receipt_handles.append(message["receipt_handle"])
+
+    finally:
+        db.close()
+
+    if processed_count > 0:
+        logger.info(f"Processed {processed_count} messages from SQS")
+
+    return processed_count, receipt_handles, retry_handles
+
+
 class SQSWorker:
     """Worker that polls SQS and processes messages."""
 
@@ -20,9 +75,11 @@ class SQSWorker:
         """Initialize SQS worker."""
         self.sqs_client = SQSClient()
         self.running = False
+        self._engine: Optional[SQSConsumerEngine] = None
+        self._poller: Optional[AdaptivePoller] = None
 
     def process_messages(self) -> int:
-        """Process messages from SQS queue."""
+        """Receive and process a single poll's worth of messages."""
         if not settings.worker_enabled:
             logger.debug("Worker is disabled")
             return 0
@@ -36,52 +93,82 @@ class SQSWorker:
             if not messages:
                 return 0
 
-            processed_count = 0
-            db: Session = SessionLocal()
+            return self.handle_messages(messages)
 
-            try:
-                processor = MessageProcessor(db)
-                alert_service = AlertService(db)
-
-                for message in messages:
-                    try:
-                        # Process message
-                        performance_data = processor.process_message(message["body"])
-
-                        if performance_data:
-                            # Check for alerts
-                            alert_service.check_and_create_alerts(performance_data)
-                            processed_count += 1
-
-                        # Delete message from queue
-                        self.sqs_client.delete_message(message["receipt_handle"])
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error processing message {message.get('message_id')}: {e}",
-                            exc_info=True,
-                        )
-                        # Don't delete message on error - let it be retried
+        except Exception as e:
+            logger.error(f"Error in SQS worker: {e}", exc_info=True)
+            return 0
 
-            finally:
-                db.close()
+    def handle_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Persist, alert on and acknowledge a batch of received messages."""
+        try:
+            processed_count, receipt_handles, retry_handles = process_received_messages(
+                messages
+            )
+        except Exception:
+            # Nothing was acknowledged; hand the whole batch back for retry
+            self.sqs_client.release([m["receipt_handle"] for m in messages])
+            raise
 
-            if processed_count > 0:
-                logger.info(f"Processed {processed_count} messages from SQS")
+        for receipt_handle in receipt_handles:
+            # Queue message for batched deletion
+            self.sqs_client.acknowledge(receipt_handle)
 
-            return processed_count
+        if retry_handles:
+            self.sqs_client.release(retry_handles)
 
-        except Exception as e:
-            logger.error(f"Error in SQS worker: {e}", exc_info=True)
-            return 0
+        return processed_count
 
     def start(self):
-        """Start the worker (for continuous operation)."""
+        """Start the consumer engine (for continuous operation)."""
+        if self.running:
+            logger.warning("SQS worker is already running")
+            return
+
+        self._engine = SQSConsumerEngine(
+            sqs_client=self.sqs_client,
+            handler=self.handle_messages,
+            receiver_count=settings.sqs_receiver_count,
+            processor_count=settings.sqs_processor_count,
+            buffer_size=settings.sqs_buffer_size,
+            batch_size=settings.max_messages_per_poll,
+            wait_time_seconds=settings.sqs_wait_time_seconds,
+        )
+        self._engine.start()
+        if settings.sqs_adaptive_polling_enabled:
+            self._poller = AdaptivePoller(
+                self._engine,
+                self.sqs_client,
+                min_receivers=settings.sqs_min_receivers,
+                backlog_per_receiver=settings.sqs_backlog_per_receiver,
+                check_interval_seconds=settings.sqs_depth_check_seconds,
+            )
+            self._poller.start()
         self.running = True
         logger.info("SQS worker started")
 
     def stop(self):
-        """Stop the worker."""
+        """Stop the worker, draining buffered messages first."""
+        if self._poller:
+            self._poller.stop()
+            self._poller = None
+        if self._engine:
+            self._engine.stop(timeout=settings.sqs_shutdown_timeout_seconds)
+            self._engine = None
+        self.sqs_client.ack_buffer.close()
+        self.sqs_client.visibility_tracker.close()
         self.running = False
         logger.info("SQS worker stopped")
 
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return consumer engine, polling, acknowledgement and cache counters."""
+        return {
+            "engine": self._engine.stats() if self._engine else {},
+            "polling": self._poller.stats() if self._poller else {},
+            "acks": self.sqs_client.ack_buffer.stats(),
+            "visibility": self.sqs_client.visibility_tracker.stats(),
+            "dedup": dedup_cache.stats(),
+            "rollups": rollup_store.stats(),
+            "baselines": baseline_cache.stats(),
+            "alerts": alert_suppressor.stats(),
+        }
@@ -0,0 +1,89 @@
+"""Benchmark PerformanceData write paths against the configured database.
+
+Compares ORM add + flush per object, executemany and COPY. Every run is
+rolled back, so no rows are kept (id sequence values are consumed).
+
+Usage:
+    python scripts/benchmark_bulk_insert.py --rows 20000
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.models.stream_data import PerformanceData, StreamDatasetType
+from app.utils.bulk_writer import BulkWriter
+
+
+def make_rows(count):
+    """Build synthetic PerformanceData column values."""
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    return [
+        {
+            "stream_message_id": i,
+            "dataset_type": StreamDatasetType.SP,
+            "dataset_name": "sp-traffic",
+            "profile_id": "benchmark",
+            "campaign_id": f"campaign-{i % 500}",
+            "ad_group_id": f"ad-group-{i % 2000}",
+            "keyword_id": f"keyword-{i % 10000}",
+            "impressions": 100 + i % 50,
+            "clicks": i % 7,
+            "cost": Decimal("1.25"),
+            "sales": Decimal("4.00"),
+            "orders": i % 2,
+            "units_sold": i % 2,
+            "ctr": Decimal("0.0500"),
+            "start_date": start - timedelta(hours=i % 24),
+            "end_date": start - timedelta(hours=i % 24) + timedelta(minutes=59),
+        }
+        for i in range(count)
+    ]
+
+
+def orm_add_flush(db, rows):
+    for row in rows:
+        db.add(PerformanceData(**row))
+        db.flush()
+
+
+def executemany(db, rows):
+    BulkWriter(db, copy_min_rows=0).insert(PerformanceData.__table__, rows)
+
+
+def copy(db, rows):
+    BulkWriter(db, copy_min_rows=1).insert(PerformanceData.__table__, rows)
+
+
+def main():
+    """Time each write path."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--orm-rows", type=int, default=2000, help="ORM path is much slower")
+    args = parser.parse_args()
+
+    for name, write, count in (
+        ("orm add+flush", orm_add_flush, args.orm_rows),
+        ("executemany", executemany, args.rows),
+        ("copy", copy, args.rows),
+    ):
+        rows = make_rows(count)
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            write(db, rows)
+            elapsed = time.perf_counter() - started
+        finally:
+            db.rollback()
+            db.close()
+        print(f"{name:>14}: {count:>7} rows in {elapsed:7.2f}s ({count / elapsed:>9.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
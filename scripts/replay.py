@@ -0,0 +1,61 @@
+"""Re-derive performance_data from stored raw messages.
+
+Rebuilds every monthly performance_data partition overlapping the given
+range with the current extraction logic, then swaps it in atomically.
+
+Usage:
+    python scripts/replay.py --start 2026-01-01 --end 2026-04-01 --workers 8
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.replay_service import ReplayService
+
+
+def main():
+    """Parse arguments and run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", required=True, type=datetime.fromisoformat)
+    parser.add_argument("--end", required=True, type=datetime.fromisoformat)
+    parser.add_argument("--workers", type=int, default=None, help="default: CPU count")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument(
+        "--lookahead-days",
+        type=int,
+        default=3,
+        help="also scan messages received this long after a partition ends",
+    )
+    parser.add_argument(
+        "--keep-old",
+        action="store_true",
+        help="keep replaced partitions as <name>_replaced instead of dropping them",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        service = ReplayService(
+            db,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            lookahead_days=args.lookahead_days,
+        )
+        count = service.replay(args.start, args.end, keep_old=args.keep_old)
+        print(f"Replayed {count} rows in {time.monotonic() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
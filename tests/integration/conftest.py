@@ -0,0 +1,46 @@
+"""Fixtures for tests against a PostgreSQL database."""
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.stream_data import PerformanceData, StreamMessage
+
+PARTITIONED_MODELS = (StreamMessage, PerformanceData)
+
+
+@pytest.fixture
+def db():
+    """Session on a throwaway schema of ``DATABASE_URL``; skipped without PostgreSQL."""
+    admin = create_engine(settings.database_url)
+    try:
+        admin.connect().close()
+    except OperationalError:
+        admin.dispose()
+        pytest.skip("PostgreSQL is not available")
+
+    schema = f"test_{uuid4().hex[:12]}"
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(
+        settings.database_url, connect_args={"options": f"-csearch_path={schema}"}
+    )
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for model in PARTITIONED_MODELS:
+            table = model.__tablename__
+            conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    session = Session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
@@ -0,0 +1,66 @@
+"""Tests for watermark-based aggregation against PostgreSQL."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.stream_data import (
+    DimensionAggregate,
+    PerformanceAggregate,
+    PerformanceData,
+    StreamDatasetType,
+)
+from app.services.aggregation_service import AggregationService
+
+
+def add_rows(db, start_date, count, impressions=100):
+    """Insert ``count`` one-hour rows for campaign c1 of profile p1."""
+    created_at = datetime.utcnow() - timedelta(hours=1)
+    db.add_all(
+        PerformanceData(
+            stream_message_id=1,
+            dataset_type=StreamDatasetType.SP,
+            profile_id="p1",
+            campaign_id="c1",
+            impressions=impressions,
+            start_date=start_date + timedelta(hours=i),
+            end_date=start_date + timedelta(hours=i, minutes=59),
+            created_at=created_at,
+        )
+        for i in range(count)
+    )
+    db.commit()
+
+
+def daily_totals(db, day):
+    campaign = db.scalars(
+        select(PerformanceAggregate.total_impressions).where(
+            PerformanceAggregate.period_type == "daily",
+            PerformanceAggregate.period_start == day,
+        )
+    ).one()
+    profile = db.scalars(
+        select(DimensionAggregate.total_impressions).where(
+            DimensionAggregate.dimension == "profile",
+            DimensionAggregate.period_type == "daily",
+            DimensionAggregate.period_start == day,
+        )
+    ).one()
+    return campaign, profile
+
+
+def test_daily_recompute_then_incremental_counts_rows_once(db):
+    yesterday = datetime.utcnow().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) - timedelta(days=1)
+    service = AggregationService(db)
+
+    add_rows(db, yesterday, 3)
+    service.aggregate_incremental()
+    # Ingested after the last incremental run, before the daily job
+    add_rows(db, yesterday + timedelta(hours=3), 2)
+
+    service.aggregate_daily(days=7)
+    assert daily_totals(db, yesterday) == (300, 300)
+
+    service.aggregate_incremental()
+    assert daily_totals(db, yesterday) == (500, 500)
@@ -0,0 +1,119 @@
+"""Tests for alert delivery rounds."""
+import asyncio
+import json
+
+import pytest
+
+from app.clients.async_slack_client import SlackRejectedError
+from app.core.config import Settings
+from app.workers.alert_dispatcher import AlertDispatcher
+
+
+class FakeSlackClient:
+    """Rejects digests containing bad alerts and fails after ``fail_after`` posts."""
+
+    def __init__(self, bad=(), fail_after=None):
+        self.bad = set(bad)
+        self.fail_after = fail_after
+        self.posts = []
+
+    async def send_payload(self, payload):
+        if self.fail_after is not None and len(self.posts) >= self.fail_after:
+            return False
+        text = json.dumps(payload)
+        if any(f"alert {alert_id}" in text for alert_id in self.bad):
+            raise SlackRejectedError("400 invalid_blocks")
+        self.posts.append(payload)
+        return True
+
+    async def close(self):
+        pass
+
+
+def item(alert_id):
+    return {
+        "alert_type": "high_acos",
+        "severity": "medium",
+        "message": f"alert {alert_id}",
+        "campaign_id": "c1",
+        "campaign_name": None,
+        "metrics": None,
+    }
+
+
+def run_round(monkeypatch, slack_client, alert_ids, digest_size=2, taken=()):
+    """Run one round; alerts in ``taken`` are lost to another dispatcher at the first renewal."""
+    dispatcher = AlertDispatcher(slack_client)
+    dispatcher.digest_size = digest_size
+    dispatcher.batch_size = len(alert_ids)
+    outcome = {"renewals": []}
+
+    def extend_leases(ids):
+        outcome["renewals"].append(list(ids))
+        return set(ids) - set(taken)
+
+    monkeypatch.setattr(dispatcher, "_claim", lambda: [(i, item(i)) for i in alert_ids])
+    monkeypatch.setattr(dispatcher, "_extend_leases", extend_leases)
+    monkeypatch.setattr(
+        dispatcher,
+        "_finish",
+        lambda sent, rejected, released: outcome.update(
+            sent=sent, rejected=rejected, released=released
+        ),
+    )
+    more = asyncio.run(dispatcher.dispatch_once())
+    return dispatcher, outcome, more
+
+
+def test_rejected_alert_does_not_block_the_round(monkeypatch):
+    slack_client = FakeSlackClient(bad={2})
+
+    dispatcher, outcome, more = run_round(monkeypatch, slack_client, [1, 2, 3, 4])
+
+    assert outcome["sent"] == [1, 3, 4]
+    assert outcome["rejected"] == [2]
+    assert outcome["released"] == []
+    assert more
+    # Digest [1, 2] was rejected and retried singly; [3, 4] went as one digest
+    assert len(slack_client.posts) == 2
+    assert dispatcher.stats() == {
+        "delivered": 3,
+        "digests": 2,
+        "rejected": 1,
+        "lost_leases": 0,
+    }
+    # Leases of every undelivered alert are renewed before each post
+    assert outcome["renewals"] == [[1, 2, 3, 4], [1, 2, 3, 4], [2, 3, 4], [3, 4]]
+
+
+def test_failing_slack_ends_the_round(monkeypatch):
+    slack_client = FakeSlackClient(fail_after=1)
+
+    dispatcher, outcome, more = run_round(monkeypatch, slack_client, [1, 2, 3, 4, 5])
+
+    assert outcome["sent"] == [1, 2]
+    assert outcome["rejected"] == []
+    assert outcome["released"] == [3, 4, 5]
+    assert not more
+
+
+def test_alerts_with_lost_leases_are_not_posted(monkeypatch):
+    slack_client = FakeSlackClient()
+
+    dispatcher, outcome, more = run_round(monkeypatch, slack_client, [1, 2, 3], taken={2})
+
+    assert outcome["sent"] == [1, 3]
+    assert outcome["released"] == []
+    assert dispatcher.stats()["lost_leases"] == 1
+    assert "alert 2" not in json.dumps(slack_client.posts)
+
+
+def test_lease_must_outlast_one_slack_post():
+    settings = Settings(slack_max_retries=2, slack_retry_base_seconds=1.0)
+    # 3 attempts of 10s plus 2 waits of at most 4s
+    assert settings.slack_max_post_seconds == 38
+
+    with pytest.raises(ValueError, match="must exceed 38s"):
+        Settings(
+            slack_max_retries=2, slack_retry_base_seconds=1.0, alert_dispatch_lease_seconds=38
+        )
@@ -0,0 +1,298 @@
+"""Tests for declarative alert rules."""
+from decimal import Decimal
+
+import pytest
+
+from app.core.config import settings
+from app.models.stream_data import PerformanceData
+from app.services.alert_rules import (
+    AlertRule,
+    AlertRuleEngine,
+    compile_rule,
+    default_rules,
+    load_rules,
+)
+from app.utils import json_codec
+
+
+def make_record(**metrics):
+    """Unsaved performance row for campaign c1 of profile p1."""
+    values = {"campaign_id": "c1", "campaign_name": "Campaign 1", "profile_id": "p1"}
+    values.update(metrics)
+    return PerformanceData(**values)
+
+
+def default_rule(alert_type):
+    return next(rule for rule in default_rules() if rule.alert_type == alert_type)
+
+
+# The checks AlertService ran before rules were declarative, as
+# (severity, message) for a breach or None. Thresholds are compared as exact
+# decimals, as the old ACOS and ROAS checks did; the old CTR check compared
+# against the float setting and so missed drops of exactly the threshold.
+
+
+def legacy_ctr_drop(ctr, previous_ctr):
+    ctr_change = (ctr - previous_ctr) / previous_ctr
+    if ctr_change <= -Decimal(str(settings.alert_ctr_drop_threshold)):
+        return (
+            "high" if abs(ctr_change) > 0.4 else "medium",
+            f"CTR dropped by {abs(ctr_change) * 100:.1f}% "
+            f"(from {previous_ctr:.2%} to {ctr:.2%})",
+        )
+    return None
+
+
+def legacy_spend_spike(cost, previous_spend):
+    spend_ratio = cost / previous_spend
+    if spend_ratio >= settings.alert_spend_spike_threshold:
+        return (
+            "high" if spend_ratio > 2.0 else "medium",
+            f"Spend increased by {(spend_ratio - 1) * 100:.1f}% "
+            f"(from ${previous_spend:.2f} to ${cost:.2f})",
+        )
+    return None
+
+
+def legacy_high_acos(acos):
+    if acos >= Decimal(str(settings.alert_acos_threshold)):
+        return (
+            "high" if acos > 0.5 else "medium",
+            f"ACOS is {acos:.2%}, exceeding threshold of {settings.alert_acos_threshold:.2%}",
+        )
+    return None
+
+
+def legacy_low_roas(roas):
+    if roas < Decimal(str(settings.alert_roas_threshold)):
+        return (
+            "high" if roas < 1.0 else "medium",
+            f"ROAS is {roas:.2f}, below threshold of {settings.alert_roas_threshold:.2f}",
+        )
+    return None
+
+
+def outcome(row):
+    return None if row is None else (row["severity"], row["message"])
+
+
+@pytest.mark.parametrize(
+    "previous, current",
+    [("0.0500", "0.0450"), ("0.0500", "0.0400"), ("0.0500", "0.0350"), ("0.0500", "0.0200")],
+)
+def test_ctr_drop_matches_legacy_check(previous, current):
+    check = compile_rule(default_rule("ctr_drop"))
+    previous, current = Decimal(previous), Decimal(current)
+
+    row = check(make_record(ctr=current), (previous, Decimal("0")))
+
+    assert outcome(row) == legacy_ctr_drop(current, previous)
+    if row:
+        assert row["previous_value"] == previous
+        assert row["threshold_value"] == Decimal(str(settings.alert_ctr_drop_threshold))
+
+
+@pytest.mark.parametrize(
+    "previous, current",
+    [("10.00", "12.00"), ("10.00", "15.00"), ("10.00", "20.00"), ("10.00", "25.00")],
+)
+def test_spend_spike_matches_legacy_check(previous, current):
+    check = compile_rule(default_rule("spend_spike"))
+    previous, current = Decimal(previous), Decimal(current)
+
+    row = check(make_record(cost=current), (None, previous))
+
+    assert outcome(row) == legacy_spend_spike(current, previous)
+    if row:
+        assert row["metric_value"] == current
+        assert row["previous_value"] == previous
+
+
+@pytest.mark.parametrize("acos", ["0.2000", "0.3000", "0.5000", "0.5100"])
+def test_high_acos_matches_legacy_check(acos):
+    check = compile_rule(default_rule("high_acos"))
+    acos = Decimal(acos)
+
+    row = check(make_record(acos=acos), None)
+
+    assert outcome(row) == legacy_high_acos(acos)
+    if row:
+        assert row["threshold_value"] == Decimal(str(settings.alert_acos_threshold))
+        assert row["previous_value"] is None
+
+
+@pytest.mark.parametrize("roas", ["0.5000", "1.0000", "1.9900", "2.0000", "3.0000"])
+def test_low_roas_matches_legacy_check(roas):
+    check = compile_rule(default_rule("low_roas"))
+    roas = Decimal(roas)
+
+    assert outcome(check(make_record(roas=roas), None)) == legacy_low_roas(roas)
+
+
+def test_missing_values_and_baselines_never_alert():
+    engine = AlertRuleEngine(default_rules())
+
+    assert engine.evaluate([make_record()]) == []
+    # Drops and spikes need a baseline to compare with
+    assert engine.evaluate([make_record(ctr=Decimal("0.01"), cost=Decimal("100"))]) == []
+    assert (
+        engine.evaluate(
+            [make_record(ctr=Decimal("0.01"), cost=Decimal("100"))],
+            [(None, Decimal("0"))],
+        )
+        == []
+    )
+
+
+def test_campaign_override_takes_precedence_over_profile_override():
+    rule = default_rule("high_acos")
+    rule.profile_overrides = {"p1": 0.6}
+    rule.campaign_overrides = {"c1": 0.4}
+    check = compile_rule(rule)
+
+    row = check(make_record(acos=Decimal("0.45")), None)
+    assert row["threshold_value"] == Decimal("0.4")
+    assert "exceeding threshold of 40.00%" in row["message"]
+
+    # Other campaigns of the profile use the profile override
+    assert check(make_record(campaign_id="c2", acos=Decimal("0.45")), None) is None
+    assert check(make_record(campaign_id="c2", acos=Decimal("0.65")), None) is not None
+
+
+def test_none_override_disables_rule():
+    rule = default_rule("high_acos")
+    rule.profile_overrides = {"p1": None}
+    rule.campaign_overrides = {"c2": 0.3}
+    check = compile_rule(rule)
+
+    assert check(make_record(acos=Decimal("0.9")), None) is None
+    # A campaign override re-enables the rule inside a disabled profile
+    assert check(make_record(campaign_id="c2", acos=Decimal("0.9")), None) is not None
+
+
+def test_severity_bands_are_strict_and_ordered():
+    rule = AlertRule(
+        alert_type="high_cpc",
+        metric="cpc",
+        comparison="gte",
+        threshold=1.0,
+        severity="low",
+        severity_bands=[(3.0, "high"), (2.0, "medium")],
+        message="CPC is {value:.2f}",
+    )
+    check = compile_rule(rule)
+
+    def severity(cpc):
+        row = check(make_record(cpc=Decimal(cpc)), None)
+        return row and row["severity"]
+
+    assert severity("0.99") is None
+    assert severity("1.00") == "low"
+    assert severity("2.00") == "low"
+    assert severity("2.01") == "medium"
+    assert severity("3.00") == "medium"
+    assert severity("3.01") == "high"
+
+
+def test_severity_bands_follow_lower_comparisons():
+    rule = AlertRule(
+        alert_type="low_ctr",
+        metric="ctr",
+        comparison="lt",
+        threshold=0.01,
+        severity_bands=[(0.005, "high")],
+        message="CTR is {value:.2%}",
+    )
+    check = compile_rule(rule)
+
+    assert check(make_record(ctr=Decimal("0.0100")), None) is None
+    assert check(make_record(ctr=Decimal("0.0050")), None)["severity"] == "medium"
+    assert check(make_record(ctr=Decimal("0.0049")), None)["severity"] == "high"
+
+
+@pytest.mark.parametrize(
+    "changes, error",
+    [
+        ({"metric": "nope"}, "Unknown metric"),
+        ({"comparison": "eq"}, "Unknown comparison"),
+        ({"baseline": "previous"}, "not available for metric"),
+        ({"baseline": "rolling"}, "not available for metric"),
+    ],
+)
+def test_compile_rule_rejects_invalid_rules(changes, error):
+    values = {
+        "alert_type": "bad",
+        "metric": "acos",
+        "comparison": "gte",
+        "threshold": 0.3,
+        "message": "",
+    }
+    values.update(changes)
+
+    with pytest.raises(ValueError, match=error):
+        compile_rule(AlertRule(**values))
+
+
+def test_engine_cooldowns_and_baseline_needs(monkeypatch):
+    monkeypatch.setattr(settings, "alert_cooldown_minutes", 60)
+    rules = default_rules()
+    rules[0].cooldown_minutes = 0
+
+    engine = AlertRuleEngine(rules)
+
+    assert engine.needs_baselines
+    assert engine.cooldowns["ctr_drop"].total_seconds() == 0
+    assert engine.cooldowns["high_acos"].total_seconds() == 3600
+    assert not AlertRuleEngine([default_rule("high_acos")]).needs_baselines
+
+
+def test_load_rules_without_file_returns_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "alert_rules_path", None)
+
+    assert load_rules() == default_rules()
+
+
+def test_load_rules_replaces_and_adds_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json_codec.dumps(
+            [
+                {
+                    "alert_type": "high_acos",
+                    "metric": "acos",
+                    "comparison": "gte",
+                    "threshold": 0.4,
+                    "severity_bands": [[0.8, "high"]],
+                    "campaign_overrides": {"c1": None},
+                    "message": "ACOS {value:.2%}",
+                },
+                {
+                    "alert_type": "high_cpc",
+                    "metric": "cpc",
+                    "comparison": "gt",
+                    "threshold": 2.5,
+                    "cooldown_minutes": 30,
+                    "message": "CPC {value:.2f}",
+                },
+            ]
+        )
+    )
+
+    rules = {rule.alert_type: rule for rule in load_rules(str(path))}
+
+    assert set(rules) == {"ctr_drop", "spend_spike", "high_acos", "low_roas", "high_cpc"}
+    assert rules["high_acos"].threshold == 0.4
+    assert rules["high_acos"].severity_bands == [(0.8, "high")]
+    assert rules["high_acos"].campaign_overrides == {"c1": None}
+    assert rules["high_cpc"].cooldown_minutes == 30
+
+    rows = AlertRuleEngine(list(rules.values())).evaluate(
+        [
+            make_record(acos=Decimal("0.9")),
+            make_record(campaign_id="c2", acos=Decimal("0.9"), cpc=Decimal("3")),
+        ]
+    )
+    assert [(row["campaign_id"], row["alert_type"], row["severity"]) for row in rows] == [
+        ("c2", "high_acos", "high"),
+        ("c2", "high_cpc", "medium"),
+    ]
@@ -0,0 +1,151 @@
+"""Tests for in-process alert suppression."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import alert_suppressor as alert_suppressor_module
+from app.services.alert_suppressor import AlertSuppressor
+
+COOLDOWNS = {"high_acos": timedelta(hours=1), "ctr_drop": timedelta(minutes=10)}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for datetime.utcnow."""
+    now = [datetime(2026, 1, 1, 12, 0)]
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return now[0]
+
+    monkeypatch.setattr(alert_suppressor_module, "datetime", FakeDatetime)
+    return now
+
+
+class FakeSession:
+    """Returns fixed (campaign_id, alert_type, severity, created_at) rows."""
+
+    def __init__(self, rows, on_query=None):
+        self.rows = rows
+        self.on_query = on_query
+
+    def execute(self, statement):
+        if self.on_query:
+            self.on_query()
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def alert(campaign_id="c1", alert_type="high_acos", severity="medium"):
+    return {"campaign_id": campaign_id, "alert_type": alert_type, "severity": severity}
+
+
+def test_repeats_are_suppressed_within_cooldown(clock):
+    suppressor = AlertSuppressor()
+
+    assert suppressor.admit([alert()], COOLDOWNS) == [alert()]
+    clock[0] += timedelta(minutes=59)
+    assert suppressor.admit([alert()], COOLDOWNS) == []
+    # Other campaigns and alert types have their own keys
+    assert suppressor.admit([alert("c2"), alert(alert_type="ctr_drop")], COOLDOWNS) == [
+        alert("c2"),
+        alert(alert_type="ctr_drop"),
+    ]
+
+    clock[0] += timedelta(minutes=1)
+    assert suppressor.admit([alert()], COOLDOWNS) == [alert()]
+    assert suppressor.stats() == {"keys": 3, "admitted": 4, "suppressed": 1}
+
+
+def test_escalation_is_admitted_within_cooldown(clock):
+    suppressor = AlertSuppressor()
+    suppressor.admit([alert(severity="medium")], COOLDOWNS)
+
+    assert suppressor.admit([alert(severity="low")], COOLDOWNS) == []
+    assert suppressor.admit([alert(severity="medium")], COOLDOWNS) == []
+    assert suppressor.admit([alert(severity="high")], COOLDOWNS) == [alert(severity="high")]
+    assert suppressor.admit([alert(severity="high")], COOLDOWNS) == []
+
+
+def test_batch_keeps_most_severe_alert_per_key(clock):
+    suppressor = AlertSuppressor()
+    rows = [alert(severity="medium"), alert(severity="high"), alert(severity="low")]
+
+    assert suppressor.admit(rows, COOLDOWNS) == [alert(severity="high")]
+    assert suppressor.stats()["suppressed"] == 2
+
+
+def test_zero_cooldown_never_suppresses(clock):
+    suppressor = AlertSuppressor()
+    cooldowns = {"high_acos": timedelta(0)}
+
+    assert suppressor.admit([alert()], cooldowns) == [alert()]
+    assert suppressor.admit([alert()], cooldowns) == [alert()]
+
+
+def test_release_drops_reservation(clock):
+    suppressor = AlertSuppressor()
+    rows = suppressor.admit([alert()], COOLDOWNS)
+
+    suppressor.release(rows)
+
+    assert suppressor.admit([alert()], COOLDOWNS) == [alert()]
+
+
+def test_load_indexes_alerts_still_in_cooldown(clock):
+    now = clock[0]
+    db = FakeSession(
+        [
+            ("c1", "high_acos", "medium", now - timedelta(minutes=30)),
+            ("c2", "ctr_drop", "medium", now - timedelta(minutes=30)),
+            ("c3", "high_acos", "medium", now - timedelta(minutes=5)),
+            ("c3", "high_acos", "high", now - timedelta(minutes=2)),
+        ]
+    )
+    suppressor = AlertSuppressor()
+
+    # c2's ctr_drop cooldown of 10 minutes has passed
+    assert suppressor.load(db, COOLDOWNS) == 2
+    assert suppressor.admit([alert("c1"), alert("c2", "ctr_drop")], COOLDOWNS) == [
+        alert("c2", "ctr_drop")
+    ]
+    # The latest alert for a key sets the severity to beat
+    assert suppressor.admit([alert("c3", severity="high")], COOLDOWNS) == []
+
+
+def test_load_keeps_reservations_made_during_refresh(clock):
+    suppressor = AlertSuppressor()
+
+    def admit_during_query():
+        clock[0] += timedelta(seconds=1)
+        suppressor.admit([alert("c9")], COOLDOWNS)
+
+    suppressor.load(FakeSession([], on_query=admit_during_query), COOLDOWNS)
+
+    assert suppressor.admit([alert("c9")], COOLDOWNS) == []
+
+
+def test_load_drops_keys_without_unacknowledged_alerts(clock):
+    suppressor = AlertSuppressor()
+    suppressor.admit([alert("c1")], COOLDOWNS)
+    clock[0] += timedelta(minutes=5)
+
+    # The alert was acknowledged, so the query no longer returns it
+    suppressor.load(FakeSession([]), COOLDOWNS)
+
+    assert suppressor.admit([alert("c1")], COOLDOWNS) == [alert("c1")]
+
+
+def test_load_keeps_later_live_entry(clock):
+    suppressor = AlertSuppressor()
+    now = clock[0]
+    suppressor.admit([alert("c1", severity="high")], COOLDOWNS)
+
+    suppressor.load(
+        FakeSession([("c1", "high_acos", "low", now - timedelta(minutes=10))]), COOLDOWNS
+    )
+
+    assert suppressor.admit([alert("c1", severity="medium")], COOLDOWNS) == []
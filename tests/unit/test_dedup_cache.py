@@ -0,0 +1,78 @@
+"""Tests for the in-memory dedup cache."""
+import pytest
+
+from app.utils import dedup_cache as dedup_cache_module
+from app.utils.dedup_cache import DedupCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic."""
+    now = [1000.0]
+    monkeypatch.setattr(dedup_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_filter_seen_returns_only_cached_ids(clock):
+    cache = DedupCache()
+    cache.add_many(["a", "b"])
+
+    assert cache.filter_seen(["a", "c", "b"]) == ["a", "b"]
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = DedupCache(ttl_seconds=60)
+    cache.add_many(["a"])
+
+    clock[0] += 59
+    assert cache.filter_seen(["a"]) == ["a"]
+    clock[0] += 1
+    assert cache.filter_seen(["a"]) == []
+
+
+def test_expired_entries_are_evicted_on_add(clock):
+    cache = DedupCache(ttl_seconds=60)
+    cache.add_many(["a", "b"])
+
+    clock[0] += 61
+    cache.add_many(["c"])
+
+    assert cache.stats()["size"] == 1
+
+
+def test_evicts_least_recently_used_beyond_max_size(clock):
+    cache = DedupCache(max_size=2)
+    cache.add_many(["a", "b"])
+    # A hit refreshes recency, so "b" is now the oldest entry
+    cache.filter_seen(["a"])
+    cache.add_many(["c"])
+
+    assert cache.filter_seen(["a", "b", "c"]) == ["a", "c"]
+    assert cache.stats()["size"] == 2
+
+
+def test_re_adding_refreshes_recency(clock):
+    cache = DedupCache(max_size=2)
+    cache.add_many(["a", "b"])
+    cache.add_many(["a"])
+    cache.add_many(["c"])
+
+    assert cache.filter_seen(["a", "b", "c"]) == ["a", "c"]
+
+
+def test_counters(clock):
+    cache = DedupCache(max_size=10)
+    cache.add_many(["a"])
+    cache.filter_seen(["a", "b", "c"])
+    cache.record_conflicts(2)
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["conflicts"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+    assert stats["max_size"] == 10
+
+
+def test_hit_rate_is_zero_without_lookups():
+    assert DedupCache().stats()["hit_rate"] == 0.0
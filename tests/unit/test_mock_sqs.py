@@ -0,0 +1,38 @@
+"""Tests for the in-memory mock SQS client."""
+from app.clients.mock_sqs import MockSQSClient
+
+
+def test_released_messages_are_redelivered():
+    client = MockSQSClient()
+    client.add_sample_message({"campaign_id": "c1"})
+
+    [message] = client.receive_messages(wait_time_seconds=0)
+    client.change_message_visibility_batch([message["receipt_handle"]], 0)
+
+    [redelivered] = client.receive_messages(wait_time_seconds=0)
+    assert redelivered["body"] == {"campaign_id": "c1"}
+    assert redelivered["receipt_handle"] != message["receipt_handle"]
+
+
+def test_extended_messages_stay_in_flight():
+    client = MockSQSClient()
+    client.add_sample_message({"campaign_id": "c1"})
+
+    [message] = client.receive_messages(wait_time_seconds=0)
+    assert client.change_message_visibility_batch([message["receipt_handle"]], 60) == []
+
+    assert client.receive_messages(wait_time_seconds=0) == []
+    assert client.get_queue_depth() == 0
+
+
+def test_deleted_messages_are_not_redelivered():
+    client = MockSQSClient()
+    client.add_sample_message({"campaign_id": "c1"})
+
+    [message] = client.receive_messages(wait_time_seconds=0)
+    client.delete_message_batch([message["receipt_handle"]])
+
+    assert client.change_message_visibility_batch([message["receipt_handle"]], 0) == [
+        message["receipt_handle"]
+    ]
+    assert client.get_queue_depth() == 0
@@ -0,0 +1,117 @@
+"""Tests for batched SQS acknowledgements."""
+import time
+
+from app.clients import sqs_client as sqs_client_module
+from app.clients.sqs_client import SQSAckBuffer, batch_failures
+
+
+class FakeClient:
+    """Records DeleteMessageBatch calls and fails handles on request."""
+
+    def __init__(self, failures=None, invalid=()):
+        self.calls = []
+        # receipt handle -> number of calls it still fails
+        self.failures = dict(failures or {})
+        # receipt handles that can never be deleted
+        self.invalid = set(invalid)
+
+    def delete_message_batch(self, receipt_handles):
+        self.calls.append(list(receipt_handles))
+        failed, dropped = [], []
+        for handle in receipt_handles:
+            if handle in self.invalid:
+                dropped.append(handle)
+            elif self.failures.get(handle, 0) > 0:
+                self.failures[handle] -= 1
+                failed.append(handle)
+        return failed, dropped
+
+
+def test_full_batch_is_flushed_immediately():
+    client = FakeClient()
+    buffer = SQSAckBuffer(client, flush_interval_seconds=60)
+    try:
+        for i in range(25):
+            buffer.add(f"h{i}")
+
+        assert [len(call) for call in client.calls] == [10, 10]
+        assert buffer.stats()["pending"] == 5
+    finally:
+        buffer.close()
+
+    assert [len(call) for call in client.calls] == [10, 10, 5]
+    assert buffer.stats()["acked"] == 25
+
+
+def test_partial_batch_is_flushed_by_timer():
+    client = FakeClient()
+    buffer = SQSAckBuffer(client, flush_interval_seconds=0.1)
+    try:
+        buffer.add("h1")
+        buffer.add("h2")
+
+        deadline = time.monotonic() + 2
+        while not client.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert client.calls == [["h1", "h2"]]
+        assert buffer.stats()["pending"] == 0
+    finally:
+        buffer.close()
+
+
+def test_only_failed_entries_are_retried(monkeypatch):
+    monkeypatch.setattr(sqs_client_module.time, "sleep", lambda seconds: None)
+    client = FakeClient(failures={"h2": 1})
+    buffer = SQSAckBuffer(client, flush_interval_seconds=60, max_retries=3)
+
+    buffer.add("h1")
+    buffer.add("h2")
+    buffer.close()
+
+    assert client.calls == [["h1", "h2"], ["h2"]]
+    stats = buffer.stats()
+    assert stats["acked"] == 2
+    assert stats["retried"] == 1
+    assert stats["failed"] == 0
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(sqs_client_module.time, "sleep", lambda seconds: None)
+    client = FakeClient(failures={"h1": 10})
+    buffer = SQSAckBuffer(client, flush_interval_seconds=60, max_retries=2)
+
+    buffer.add("h1")
+    buffer.close()
+
+    assert len(client.calls) == 3
+    stats = buffer.stats()
+    assert stats["acked"] == 0
+    assert stats["failed"] == 1
+
+
+def test_sender_faults_are_not_retried():
+    response = {
+        "Failed": [
+            {"Id": "0", "Code": "ReceiptHandleIsInvalid", "SenderFault": True},
+            {"Id": "1", "Code": "InternalError", "SenderFault": False},
+        ]
+    }
+
+    assert batch_failures(response, ["h0", "h1", "h2"]) == (["h1"], ["h0"])
+
+
+def test_sender_faults_count_as_failed(monkeypatch):
+    monkeypatch.setattr(sqs_client_module.time, "sleep", lambda seconds: None)
+    client = FakeClient(failures={"h2": 1}, invalid={"h1"})
+    buffer = SQSAckBuffer(client, flush_interval_seconds=60, max_retries=3)
+
+    for handle in ("h1", "h2", "h3"):
+        buffer.add(handle)
+    buffer.close()
+
+    assert client.calls == [["h1", "h2", "h3"], ["h2"]]
+    stats = buffer.stats()
+    assert stats["acked"] == 2
+    assert stats["failed"] == 1
+    assert stats["retried"] == 1